@@ -0,0 +1,21 @@
+"""
+    Benchmarks of the calibration loop's overhead, see the Benchmarks section of the README.
+"""
+import pytest
+
+try:
+    import pytest_benchmark # type: ignore
+except ImportError:
+    # benchmarks require the `benchmark` extra
+    collect_ignore_glob = ["test_*.py"]
+    pytest_benchmark = None
+
+#reuse the test suite's model and calibration fixtures
+from tests.conftest import *
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    #save results as json by default so regressions can be tracked release over release
+    if pytest_benchmark is not None and not (config.getoption("benchmark_json") or config.getoption("benchmark_autosave")):
+        config.option.benchmark_autosave = True
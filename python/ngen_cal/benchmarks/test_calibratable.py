@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ngen.cal.calibration_cathment import CalibrationCatchment
+    from ngen.cal.meta import JobMeta
+
+"""
+    Benchmarks of check pointing the calibration state each iteration
+"""
+
+@pytest.mark.parametrize("iterations", [10, 1_000])
+def test_check_point(benchmark, catchment: 'CalibrationCatchment', meta: 'JobMeta', iterations: int) -> None:
+    """
+        Check point with the parameter values of `iterations` previous iterations
+    """
+    df = catchment.df
+    history = pd.concat({str(i): df['0'] for i in range(1, iterations + 1)}, axis=1)
+    catchment._df = pd.concat([df, history], axis=1)
+    benchmark(catchment.check_point, iterations, meta)
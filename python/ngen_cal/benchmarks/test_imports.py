@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+"""
+    Benchmarks of interpreter startup, paid by every worker process and short lived tool
+"""
+
+@pytest.mark.parametrize("statement", ["import ngen.cal", "import ngen.cal.search"])
+def test_import(benchmark, statement: str):
+    benchmark.pedantic(subprocess.run, args=([sys.executable, "-c", statement],), kwargs={"check": True}, rounds=5)
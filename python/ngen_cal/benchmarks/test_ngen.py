@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import json
+from copy import deepcopy
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from ngen.cal.ngen import NgenBase
+from ngen.config.realization import NgenRealization
+
+from tests.utils import catchment, global_config, time
+
+"""
+    Benchmarks of writing the realization config each iteration
+"""
+
+@pytest.fixture(scope="module", params=[10, 1_000, 10_000])
+def ngen_model(request, tmp_path_factory) -> NgenBase:
+    formulation = deepcopy(catchment["tst-1"])
+    formulation.pop("calibration")
+    catchments = {f"cat-{i}": formulation for i in range(1, request.param + 1)}
+    path = tmp_path_factory.mktemp("realization") / "realization.json"
+    with open(path, "w") as fp:
+        json.dump({**global_config, **time, "catchments": catchments}, fp)
+    base = NgenBase.construct()
+    base.realization = path
+    base.ngen_realization = NgenRealization.parse_file(path)
+    return base
+
+
+@pytest.fixture
+def params() -> pd.DataFrame:
+    return pd.DataFrame({"param": ["maxsmc", "satdk"], "model": "CFE", "1": [0.3, 0.001]})
+
+
+@pytest.mark.parametrize("id", [None, "cat-1"], ids=["global", "catchment"])
+def test_update_config(benchmark, ngen_model: NgenBase, params: pd.DataFrame, id: str | None, tmp_path: Path):
+    benchmark(ngen_model.update_config, 1, params, id, path=tmp_path)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+from ngen.cal.ngen import NgenBase
+from ngen.cal.ngen_hooks.ngen_output import TrouteOutput
+from ngen.cal.standin import FORMATS, hydrograph, write_output
+from ngen.config.realization import NgenRealization
+
+"""
+    Benchmarks of reading t-route output, each reader parses the whole file for every evaluation
+"""
+
+data_dir = pathlib.Path(__file__).parent.parent / "tests/data/troute_output/"
+suffixes = {"csv": ".csv", "stream_v1": ".csv", "stream_v2": ".csv", "parquet": ".parquet", "netcdf": ".nc"}
+
+
+@pytest.fixture(scope="module")
+def ngen_cal_model_config() -> NgenBase:
+    realization = NgenRealization.parse_file(
+        data_dir / "example_realization_config.json"
+    )
+    base = NgenBase.construct()
+    base.ngen_realization = realization
+    return base
+
+
+@pytest.fixture(scope="module", params=[1_000, 10_000, 100_000])
+def segments(request) -> int:
+    return request.param
+
+
+@pytest.fixture(scope="module", params=FORMATS)
+def output_file(request, segments: int, ngen_cal_model_config: NgenBase, tmp_path_factory) -> pathlib.Path:
+    format = request.param
+    time = ngen_cal_model_config.ngen_realization.time
+    steps = len(pd.date_range(time.start_time, time.end_time, freq=f"{time.output_interval}s", inclusive="right"))
+    ids = np.arange(1, segments + 1)
+    flow = hydrograph([{"a": float(i)} for i in ids], steps, time.output_interval)
+    path = tmp_path_factory.mktemp(f"{format}_{segments}") / f"flowveldepth_Ngen{suffixes[format]}"
+    # t-route writes 12 routing steps per hour, one is used so 100k segment flowveldepth files stay manageable
+    write_output(path, format, ids, flow, pd.Timestamp(time.start_time), time.output_interval)
+    return path
+
+
+def test_troute_output(benchmark, output_file: pathlib.Path, ngen_cal_model_config: NgenBase):
+    output = TrouteOutput(output_file)
+    output.ngen_cal_model_configure(config=ngen_cal_model_config)
+
+    df = benchmark(output.get_output, id="wb-1")
+    assert len(df) == 24
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from typing import TYPE_CHECKING
+
+from ngen.cal import objectives
+from ngen.cal.search import _objective_func, dds
+
+if TYPE_CHECKING:
+    from ngen.cal.calibration_cathment import CalibrationCatchment
+    from ngen.cal.agent import Agent
+
+"""
+    Benchmarks of calibration search overhead
+"""
+
+@pytest.mark.usefixtures("catchment", "agent")
+def test_dds_iteration(benchmark, catchment: 'CalibrationCatchment', agent: 'Agent') -> None:
+    """
+        Two DDS iterations with a no-op model (`echo`), output reading is mocked
+    """
+    benchmark(dds, 1, 2, catchment, agent)
+
+@pytest.fixture(scope="module")
+def ten_year_hourly() -> tuple[pd.Series, pd.Series]:
+    index = pd.date_range("2010-10-01", periods=10*365*24, freq="H")
+    rng = np.random.default_rng(0)
+    observed = pd.Series(rng.gamma(2.0, 5.0, len(index)), index=index, name="obs_flow")
+    simulated = pd.Series(observed.values*rng.normal(1.0, 0.1, len(index)), index=index, name="sim_flow")
+    return simulated, observed
+
+@pytest.mark.parametrize("objective", [objectives.custom, objectives.nash_sutcliffe, objectives.kge])
+def test_objective_func(benchmark, ten_year_hourly, objective) -> None:
+    """
+        Objective function evaluation, including alignment of simulated and observed series
+    """
+    simulated, observed = ten_year_hourly
+    benchmark(_objective_func, simulated, observed, objective)
@@ -15,4 +15,5 @@ from .configuration import General, Model
 from .calibratable import Calibratable, Adjustable, Evaluatable
 from .calibration_set import CalibrationSet, UniformCalibrationSet
 from .meta import JobMeta
+from .calibration import Calibration, Domain
 from .plot import *
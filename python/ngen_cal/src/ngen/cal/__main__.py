@@ -4,128 +4,60 @@ from __future__ import annotations
 import yaml
 from os import chdir
 from pathlib import Path
-from ngen.cal.configuration import General, Model
-from ngen.cal.ngen import Ngen
-from ngen.cal.search import dds, dds_set, pso_search
-from ngen.cal.strategy import Algorithm
-from ngen.cal.agent import Agent
-from ngen.cal._plugin_system import setup_plugin_manager
+from ngen.cal.calibration import Calibration, Domain
+from ngen.cal.configuration import General
+from ngen.cal import estimate
 
-from typing import cast, Callable, List, Union, TYPE_CHECKING
-from types import ModuleType
+from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from typing import Mapping, Any
-    from pluggy import PluginManager
-
-def _loaded_plugins(pm: PluginManager) -> str:
-    from .utils import type_as_import_string
-
-    plugins: list[str] = []
-    for (name, plugin) in pm.list_name_plugin():
-        if not name:
-            continue
-        # case for a class based plugin. name in this case is the python ref id.
-        if name[0].isdigit():
-            qualified_name = type_as_import_string(plugin.__class__)
-            name = f"{qualified_name} ({name})"
-
-        plugins.append(name)
-
-    return f"Plugins Loaded: {', '.join(plugins)}"
 
 
 def main(general: General, model_conf: Mapping[str, Any]):
-    #seed the random number generators if requested
-    if general.random_seed is not None:
-        import random
-        random.seed(general.random_seed)
-        import numpy as np
-        np.random.seed(general.random_seed)
-
-    # model scope plugins setup in constructor
-    model = Model(model=model_conf)
-
-    # NOTE: if support for new models is added, this will need to be modified
-    assert isinstance(model.model, Ngen), f"ngen.cal.ngen.Ngen expected, got {type(model.model)}"
-    model_inner = model.model.unwrap()
+    # relative paths of the model configuration are relative to the workdir, the current working directory
+    Calibration(Domain(model_conf), general).run()
 
-    plugins = cast(List[Union[Callable, ModuleType]], general.plugins)
-    plugin_manager = setup_plugin_manager(plugins)
 
-    print(_loaded_plugins(plugin_manager))
+def dry_run(general: General, model_conf: Mapping[str, Any], samples: int | None = None):
+    """Print the estimated resources of the calibration without running it
 
-    # setup plugins
-    plugin_manager.hook.ngen_cal_configure(config=general)
-
-    print("Starting calib")
-
-    """
-    TODO calibrate each "catcment" independely, but there may be something interesting in grouping various formulation params
-    into a single variable vector and calibrating a set of heterogenous formultions...
+    Args:
+        samples (int | None, optional): number of sample iterations to time.  Defaults to None, estimating from
+                                        the model runs of previous calibrations in the workdir.
     """
-    start_iteration = 0
-
-    # Initialize the starting agent
-    agent = Agent(model, general.workdir, general.log, general.restart, general.strategy.parameters)
-
-    # Agent mutates the model config, so `ngen_cal_model_configure` is called afterwards
-    model_inner._plugin_manager.hook.ngen_cal_model_configure(config=model_inner)
-
-    if general.strategy.algorithm == Algorithm.dds:
-        func = dds_set #FIXME what about explicit/dds
-        start_iteration = general.start_iteration
-        if general.restart:
-            start_iteration = agent.restart()
-    elif general.strategy.algorithm == Algorithm.pso: #TODO how to restart PSO?
-        if agent.model.strategy != "uniform":
-            print("Can only use PSO with the uniform model strategy")
+    domain = Domain(model_conf)
+    if samples is None:
+        result = estimate.history(domain, general)
+        if result is None:
+            print(f"No previous calibration in {general.workdir} logged a model run, use --estimate to time sample iterations")
             return
-        if general.restart:
-            print("Restart not supported for PSO search, starting at 0")
-        func = pso_search
-
-    print(f"Starting Iteration: {start_iteration}")
-    # print("Starting Best param: {}".format(meta.best_params))
-    # print("Starting Best score: {}".format(meta.best_score))
-    print("Starting calibration loop")
-
-    # call `ngen_cal_start` plugin hook functions
-    plugin_manager.hook.ngen_cal_start()
-
-    try:
-        #NOTE this assumes we calibrate each catchment independently, it may be possible to design an "aggregate" calibration
-        #that works in a more sophisticated manner.
-        if agent.model.strategy == 'explicit': #FIXME this needs a refactor...should be able to use a calibration_set with explicit loading
-            for catchment in agent.model.adjustables:
-                dds(start_iteration, general.iterations, catchment, agent)
-
-        elif agent.model.strategy == 'independent':
-            #for catchment_set in agent.model.adjustables:
-            func(start_iteration, general.iterations, agent)
-
-        elif agent.model.strategy == 'uniform':
-            #for catchment_set in agent.model.adjustables:
-            #    func(start_iteration, general.iterations, catchment_set, agent)
-            func(start_iteration, general.iterations, agent)
-    # call `ngen_cal_finish` plugin hook functions
-    except Exception as e:
-        plugin_manager.hook.ngen_cal_finish(exception=e)
-        raise e
     else:
-        plugin_manager.hook.ngen_cal_finish(exception=None)
+        result = estimate.sample(domain, general, samples)
+    print(result)
 
 
 if __name__ == "__main__":
 
 
     import argparse
+    import logging
+
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s,%(msecs)d %(levelname)s: %(message)s",
+        datefmt="%H:%M:%S")
 
     # get the command line parser
     parser = argparse.ArgumentParser(
         description='Calibrate catchments in NGEN NWM architecture.')
     parser.add_argument('config_file', type=Path,
                         help='The configuration yaml file for catchments to be operated on')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--dry-run', action='store_true',
+                      help='Build the model and estimate the calibration from previous runs in the workdir, without calibrating')
+    mode.add_argument('--estimate', type=int, nargs='?', const=2, metavar='N',
+                      help='Estimate the calibration from N (default 2) timed sample iterations, without calibrating')
 
     args = parser.parse_args()
 
@@ -137,4 +69,7 @@ if __name__ == "__main__":
     chdir(general.workdir)
 
     #model = Model(model=conf['model']).model
-    main(general, conf['model'])
+    if args.dry_run or args.estimate is not None:
+        dry_run(general, conf['model'], args.estimate)
+    else:
+        main(general, conf['model'])
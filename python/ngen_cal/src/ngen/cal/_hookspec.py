@@ -8,6 +8,8 @@ from ngen.cal import PROJECT_SLUG
 
 if TYPE_CHECKING:
     from datetime import datetime
+    from pathlib import Path
+    from typing import Mapping
 
     import pandas as pd
     from hypy.nexus import Nexus
@@ -15,6 +17,7 @@ if TYPE_CHECKING:
     from ngen.cal.configuration import General
     from ngen.cal.model import ModelExec
     from ngen.cal.meta import JobMeta
+    from ngen.cal.resources import RunResources
 
 hookspec = pluggy.HookspecMarker(PROJECT_SLUG)
 
@@ -51,6 +54,49 @@ def ngen_cal_finish(exception: Exception | None) -> None:
     """
 
 
+@hookspec
+def ngen_cal_iteration_start(iteration: int) -> None:
+    """
+    Called at the start of each calibration iteration, before the parameters
+    of the iteration are chosen and the model is run.
+    """
+
+
+@hookspec
+def ngen_cal_iteration_finish(iteration: int, score: float | None, best_score: float, best_iteration: int) -> None:
+    """
+    Called after each calibration iteration is check pointed, after its
+    `ngen_cal_iteration_timing` and `ngen_cal_model_run` calls.
+    `score` is the score of the iteration, None if it was not scored (e.g. it
+    was screened out by a low fidelity run).  `best_score` is the best score
+    of the calibration so far, found at iteration `best_iteration`.
+    For searches which run several models per iteration (e.g. PSO), `score` is
+    the score of the last model evaluated.
+    """
+
+
+@hookspec
+def ngen_cal_iteration_timing(iteration: int, timings: Mapping[str, float]) -> None:
+    """
+    Called after each calibration iteration with the wall clock time, in
+    seconds, spent in each phase of the iteration.
+    Phases are keyed by name, see `ngen.cal.timing.PHASES`.
+    Phases not run during an iteration (e.g. `output` for a timed out model
+    run) are omitted.
+    For searches which run several models per iteration (e.g. PSO), timings
+    are the sum over each run.
+    """
+
+
+@hookspec
+def ngen_cal_model_run(iteration: int, run: RunResources) -> None:
+    """
+    Called after each calibration iteration, once for each model run of the
+    iteration, with the resources used by that run (wall and CPU time, peak
+    memory and bytes written).
+    """
+
+
 class ModelHooks:
     @hookspec
     def ngen_cal_model_configure(self, config: ModelExec) -> None:
@@ -86,18 +132,27 @@ class ModelHooks:
         """
 
     @hookspec(firstresult=True)
-    def ngen_cal_model_output(self, id: str | None) -> pd.Series:
+    def ngen_cal_model_output(self, id: str | None, workdir: Path | None) -> pd.Series:
         """
         Called during each calibration iteration to provide the model output in
         the form of a pandas Series, indexed by time.
         Output series should be in units of cubic meters per second.
+
+        `id`: feature id of the output
+        `workdir`: directory the model was executed in. Relative output paths
+                   should be resolved against `workdir`, not the current working
+                   directory, so that evaluations can run concurrently.
+                   `None` if unknown.
         """
 
     @hookspec
-    def ngen_cal_model_iteration_finish(self, iteration: int, info: JobMeta) -> None:
+    def ngen_cal_model_iteration_finish(self, iteration: int, info: JobMeta, score: float | None) -> None:
         """
         Called after each model iteration is completed and evaluated.
         And before the next iteration is configured and started.
         Currently called at the end of an Adjustable's check_point function
         which writes out calibration/parameter state data each iteration.
+
+        `score`: objective score of the iteration, `None` if the iteration was
+                 not scored (e.g. screened out by a low fidelity run)
         """
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import json
+import os
 from abc import ABC, abstractmethod
+import numpy as np
 from ngen.cal.meta import JobMeta
 from ngen.cal.configuration import Model, NoModel
-from ngen.cal.utils import pushd
+from ngen.cal.timing import PhaseTimer
 from pathlib import Path
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from typing import Sequence, Mapping, Any
     from pandas import DataFrame
     from pathlib import Path
+    from pluggy import HookRelay
     from ngen.cal.calibratable import Adjustable
+    from ngen.cal.resources import RunResources
+
+#state of an agent's random number generator, written to the job workdir at each check point
+RNG_STATE = "rng_state.json"
 
 class BaseAgent(ABC):
 
@@ -19,10 +27,9 @@ class BaseAgent(ABC):
         return self.model.adjustables
 
     def restart(self) -> int:
-        with pushd(self.job.workdir):
-            starts = []
-            for adjustable in self.adjustables:
-                starts.append(adjustable.restart())
+        starts = []
+        for adjustable in self.adjustables:
+            starts.append(adjustable.restart(self.job.workdir))
         if all( x == starts[0] for x in starts):
             #if everyone agress on the iteration...
             return starts[0]
@@ -51,7 +58,7 @@ class BaseAgent(ABC):
             params: pandas.DataFrame
                 DataFrame containing the parameter name in `param` and value in `i` columns
         """
-        return self.model.update_config(i, params, id, path=self.job.workdir)
+        return self.model.update_config(i, params, id, path=self.job.run_dir)
 
     @property
     def best_params(self) -> str:
@@ -59,8 +66,14 @@ class BaseAgent(ABC):
 
 class Agent(BaseAgent):
 
-    def __init__(self, model: Model, workdir: Path, log: bool=False, restart: bool=False, parameters: Mapping[str, Any] | None = {}):
+    def __init__(self, model: Model, workdir: Path, log: bool=False, restart: bool=False, parameters: Mapping[str, Any] | None = {}, hooks: HookRelay | None = None, scratch_dir: Path | None = None, seed: int | np.random.SeedSequence | None = None):
         self._workdir = workdir
+        self._scratch_dir = scratch_dir
+        #each agent draws from its own random stream, duplicated agents get independent child streams
+        self._seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self._rng = np.random.default_rng(self._seed)
+        #global plugin hooks, e.g. `ngen_cal_iteration_timing`
+        self._hooks = hooks
         self._job = None
         assert not isinstance(model.model, NoModel), "invariant"
         # NOTE: if support for new models is added, support for other model
@@ -81,19 +94,86 @@ class Agent(BaseAgent):
             if len(workdirs) > 1:
                 print("More than one existing workdir, cannot restart")
             elif len(workdirs) == 1:
-                self._job = JobMeta(ngen_model.type, workdir, workdirs[0], log=log)
+                self._job = JobMeta(ngen_model.type, workdir, workdirs[0], log=log, scratch_dir=scratch_dir)
 
         if self._job is None:
-            self._job = JobMeta(ngen_model.type, workdir, log=log)
+            self._job = JobMeta(ngen_model.type, workdir, log=log, scratch_dir=scratch_dir)
         ngen_model.workdir = self.job.workdir
         self._model.model.resolve_paths(self.job.workdir)
+        if restart:
+            self._load_rng_state()
 
         self._params = parameters
+        self._run_durations = []
+        self._timer = PhaseTimer()
+        self._runs = []
+
+    def __getstate__(self) -> dict[str, Any]:
+        #hooks are only called from the calibration process, don't send them to worker processes
+        state = self.__dict__.copy()
+        state['_hooks'] = None
+        return state
 
     @property
     def parameters(self) -> Mapping[str, Any]:
         return self._params
 
+    @property
+    def rng(self) -> np.random.Generator:
+        """
+            Random number generator of the search, check pointed by `save_rng_state`
+        """
+        return self._rng
+
+    def save_rng_state(self) -> None:
+        """
+            Write the state of the agent's random number generator to the job workdir,
+            so a restarted calibration continues the same random stream
+        """
+        path = self.job.workdir/RNG_STATE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'w') as fp:
+            #the number of child streams spawned, so agents duplicated after a restart get new streams
+            json.dump({"entropy": self._seed.entropy, "spawn_key": self._seed.spawn_key,
+                       "n_children_spawned": self._seed.n_children_spawned, "state": self._rng.bit_generator.state}, fp)
+        os.replace(tmp, path)
+
+    def _load_rng_state(self) -> None:
+        path = self.job.workdir/RNG_STATE
+        if not path.exists():
+            return
+        with open(path) as fp:
+            data = json.load(fp)
+        self._seed = np.random.SeedSequence(data["entropy"], spawn_key=data["spawn_key"],
+                                            n_children_spawned=data.get("n_children_spawned", 0))
+        self._rng = np.random.default_rng(self._seed)
+        self._rng.bit_generator.state = data["state"]
+
+    @property
+    def run_durations(self) -> list[float]:
+        """
+            Wall clock durations, in seconds, of the model runs completed by this agent
+        """
+        return self._run_durations
+
+    @property
+    def timer(self) -> PhaseTimer:
+        """
+            Times the phases of the current calibration iteration
+        """
+        return self._timer
+
+    @property
+    def runs(self) -> list[RunResources]:
+        """
+            Resources used by the model runs of the current calibration iteration
+        """
+        return self._runs
+
+    @property
+    def hooks(self) -> HookRelay | None:
+        return self._hooks
+
     @property
     def workdir(self) -> Path:
         return self._workdir
@@ -113,11 +193,18 @@ class Agent(BaseAgent):
         """
         return f"{self.model.get_binary()} {self.model.get_args()}"
 
+    @property
+    def routing_cmd(self) -> str | None:
+        """
+            Proxy method to build the command routing the model's saved outputs alone, None if not supported
+        """
+        return self.model.routing_cmd
+
     def duplicate(self) -> Agent:
         #serialize a copy of the model
         #FIXME ??? if you do self.model.resolve_paths() here, the duplicated agent
         #doesn't have fully qualified paths...but if you do it in constructor, it works fine...
-        data = self.model.__root__.copy(deep=True)
+        data = self._model.copy(deep=True)
         #return a new agent, which has a unique Model instance
         #and its own Job/workspace
-        return Agent(data, self._workdir)
+        return Agent(data, self._workdir, hooks=self._hooks, scratch_dir=self._scratch_dir, seed=self._seed.spawn(1)[0])
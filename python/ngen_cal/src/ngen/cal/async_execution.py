@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+from asyncio import subprocess
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import BinaryIO
+
+
+class RunResult(NamedTuple):
+    """
+        The outcome of a single model run
+    """
+    #exit status of the model, None if the run timed out
+    returncode: int | None
+    #wall clock duration of the run in seconds
+    duration: float
+    timed_out: bool
+
+
+class AsyncExecutor:
+    """
+        Supervises concurrent model runs from a single process using asyncio subprocesses.
+
+        Each run is started with an explicit working directory (the process working directory is
+        never changed) in its own process group, so that a run which exceeds its time limit can be
+        killed along with any children, e.g. mpirun ranks.  Output of each run is streamed into that
+        run's log file.
+
+        Commands are executed through a shell, like the model runs of DDS search.
+    """
+
+    def __init__(self, max_concurrent: int | None = None):
+        """
+        Args:
+            max_concurrent (int | None, optional): maximum number of models running at once. Defaults to no limit.
+        """
+        self._max_concurrent = max_concurrent
+        #semaphore of the event loop it was created in, e.g. each PSO generation runs its own loop with `asyncio.run`
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def run(self, cmd: str, workdir: Path, log_file: Path | None = None, timeout: float | None = None) -> RunResult:
+        """Run `cmd` in `workdir`, waiting for a free slot if `max_concurrent` runs are already active
+
+        Args:
+            cmd (str): command line to execute
+            workdir (Path): working directory of the run
+            log_file (Path | None, optional): file stdout and stderr are appended to. Defaults to discarding output.
+            timeout (float | None, optional): wall clock limit of the run in seconds. Defaults to no limit.
+
+        Returns:
+            RunResult: outcome of the run
+        """
+        if self._max_concurrent is None:
+            return await _run(cmd, workdir, log_file, timeout)
+        # create lazily, once per event loop, so the semaphore is bound to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+            self._loop = loop
+        async with self._semaphore:
+            return await _run(cmd, workdir, log_file, timeout)
+
+
+async def _stream(reader: asyncio.StreamReader, log: BinaryIO) -> None:
+    async for line in reader:
+        log.write(line)
+        log.flush()
+
+
+def _kill(process: subprocess.Process) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        #already exited
+        pass
+
+
+async def _run(cmd: str, workdir: Path, log_file: Path | None, timeout: float | None) -> RunResult:
+    start = perf_counter()
+    if log_file is None:
+        process = await asyncio.create_subprocess_shell(
+            cmd, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+        )
+        streams = []
+        log = None
+    else:
+        process = await asyncio.create_subprocess_shell(
+            cmd, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True
+        )
+        log = open(log_file, 'ab')
+        streams = [asyncio.ensure_future(_stream(process.stdout, log)), asyncio.ensure_future(_stream(process.stderr, log))]
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        _kill(process)
+        await process.wait()
+    except BaseException:
+        #cancelled, don't leave the model running
+        _kill(process)
+        raise
+    finally:
+        if streams:
+            await asyncio.gather(*streams, return_exceptions=True)
+        if log is not None:
+            log.close()
+
+    return RunResult(None if timed_out else process.returncode, perf_counter() - start, timed_out)
@@ -0,0 +1,259 @@
+"""
+    Nested multi-basin calibration.
+
+    Partitions the catchments of a hydrofabric into gaged basins, the catchments draining to a gage
+    without passing another gage, and calibrates each basin as a separate `ngen.cal` run.  Headwater
+    basins are calibrated concurrently; once all basins upstream of a basin are calibrated, their
+    calibrated parameters are frozen and the basin is calibrated with the upstream catchments simulated
+    with those parameters.  Independent branches of the basin tree run in parallel, up to `--workers`
+    basins at a time.
+
+        python -m ngen.cal.basins calibration.yaml --workers 8
+
+    The configuration is an ordinary `ngen.cal` configuration using the `independent` or `uniform` strategy.
+    Each basin is calibrated in `<workdir>/basins/<basin id>` and its calibrated parameters are written to
+    `BEST_PARAMS` there; basins with existing `BEST_PARAMS` are not re-calibrated.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from copy import deepcopy
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import pandas as pd
+import yaml
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Mapping, Sequence
+
+#calibrated parameters of a basin's catchments, written to the basin's workdir once it is calibrated
+BEST_PARAMS = "basin_params.json"
+#model configuration paths, resolved against the calibration workdir
+_PATH_KEYS = ("realization", "hydrofabric", "catchments", "nexus", "crosswalk")
+_CHECK_POINT_SUFFIX = "_parameter_df_state.parquet"
+
+
+class Basin(NamedTuple):
+    """
+        A gaged basin, the catchments draining to a gaged catchment without passing another gaged catchment
+    """
+    #the gaged catchment
+    id: str
+    #catchments calibrated with this basin, including the gaged catchment
+    catchments: list[str]
+    #basins immediately upstream of this basin
+    upstream: list[str]
+
+
+def gage_basins(downstream: Mapping[str, str | None], gaged: Iterable[str]) -> dict[str, Basin]:
+    """Partition catchments into nested gaged basins
+
+    Args:
+        downstream (Mapping[str, str | None]): the next catchment downstream of each catchment, None at an outlet
+        gaged (Iterable[str]): gaged catchments
+
+    Raises:
+        ValueError: the catchment network has a cycle
+
+    Returns:
+        dict[str, Basin]: basins keyed by the id of their gaged catchment.  Catchments which do not drain
+                          to a gaged catchment are not part of any basin.
+    """
+    gaged = set(gaged)
+    #the gaged catchment each catchment drains to, None if there is none
+    outlet: dict[str, str | None] = {id: id for id in gaged}
+
+    def resolve(id: str | None) -> str | None:
+        path = []
+        seen = set()
+        while id is not None and id not in outlet:
+            if id in seen:
+                raise ValueError(f"catchment network has a cycle at {id}")
+            seen.add(id)
+            path.append(id)
+            id = downstream.get(id)
+        target = None if id is None else outlet[id]
+        for p in path:
+            outlet[p] = target
+        return target
+
+    ids = list(downstream) + sorted(gaged - downstream.keys())
+    basins = {id: Basin(id, [], []) for id in ids if id in gaged}
+    for id in ids:
+        target = resolve(id)
+        if target is not None:
+            basins[target].catchments.append(id)
+    for id, basin in basins.items():
+        target = resolve(downstream.get(id))
+        if target is not None:
+            basins[target].upstream.append(id)
+    return basins
+
+
+def upstream_catchments(basins: Mapping[str, Basin], id: str) -> list[str]:
+    """All catchments of the basins upstream of basin `id`"""
+    catchments = []
+    stack = list(basins[id].upstream)
+    while stack:
+        basin = basins[stack.pop()]
+        catchments.extend(basin.catchments)
+        stack.extend(basin.upstream)
+    return catchments
+
+
+def schedule(basins: Mapping[str, Basin], run: Callable[[Basin], None], workers: int) -> None:
+    """Call `run` for each basin once all of its upstream basins have run, running up to `workers` basins concurrently
+
+    Raises:
+        Exception: the exception of the first basin to fail, once running basins finish.  Basins downstream
+                   of a failed basin are not run.
+    """
+    pending = dict(basins)
+    done: set[str] = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while pending or running:
+            ready = [id for id, basin in pending.items() if all(u in done for u in basin.upstream)]
+            for id in ready:
+                running[pool.submit(run, pending.pop(id))] = id
+            if not running:
+                raise ValueError(f"basins {', '.join(pending)} depend on basins which are not scheduled")
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                id = running.pop(future)
+                future.result()
+                done.add(id)
+
+
+def best_params(workdir: Path, catchments: Sequence[str]) -> dict[str, dict[str, dict[str, float]]]:
+    """The best calibrated parameters of each of `catchments` from the most recent calibration job in `workdir`
+
+    Returns:
+        dict[str, dict[str, dict[str, float]]]: parameter values keyed by catchment id, model name and parameter name,
+                                                the format of the model's `frozen` configuration
+    """
+    jobs = sorted(workdir.glob("*_worker"))
+    if not jobs:
+        raise FileNotFoundError(f"no calibration job found in {workdir}")
+    job = jobs[-1]
+    param_log = next(job.glob("*best_params.txt"))
+    with open(param_log) as fp:
+        fp.readline()
+        best = str(int(fp.readline()))
+
+    def values(df: pd.DataFrame) -> dict[str, dict[str, float]]:
+        return {model: dict(zip(group['param'], group[best].astype(float))) for model, group in df.groupby('model')}
+
+    check_points = list(job.glob("*" + _CHECK_POINT_SUFFIX))
+    if len(check_points) == 1 and check_points[0].name[:-len(_CHECK_POINT_SUFFIX)] not in catchments:
+        #uniform strategy, one parameter set for the whole basin
+        shared = values(pd.read_parquet(check_points[0]))
+        return {id: shared for id in catchments}
+    return {id: values(pd.read_parquet(job/f"{id}{_CHECK_POINT_SUFFIX}")) for id in catchments}
+
+
+def _resolve(path: str | Path, workdir: Path) -> str:
+    return str((workdir/path).resolve())
+
+
+def calibrate(config: Mapping[str, Any], workers: int = 1) -> dict[str, Basin]:
+    """Calibrate the nested gaged basins of the model's hydrofabric
+
+    Args:
+        config (Mapping[str, Any]): `ngen.cal` configuration, with `general` and `model` sections
+        workers (int, optional): maximum number of basins calibrated concurrently. Defaults to 1.
+
+    Returns:
+        dict[str, Basin]: the calibrated basins
+    """
+    from ngen.cal.ngen import NgenBase
+    from ngen.config.realization import NgenRealization
+
+    general = dict(config['general'])
+    model = dict(config['model'])
+    if model.get('strategy') not in ('independent', 'uniform'):
+        raise ValueError("basin calibration requires the `independent` or `uniform` model strategy")
+    workdir = Path(general.get('workdir', './')).resolve()
+    for key in _PATH_KEYS:
+        if model.get(key) is not None:
+            model[key] = _resolve(model[key], workdir)
+    #each basin is only run on its own subset of the hydrofabric, domain partitions don't apply
+    model.pop('parallel', None)
+    model.pop('partitions', None)
+
+    fabric = NgenBase.construct(**{key: Path(model[key]) for key in _PATH_KEYS[1:] if model.get(key) is not None})
+    fabric.eval_feature = model.get('eval_feature')
+    fabric._read_hydrofabric()
+    gages = fabric._catchment_gages()
+    #catchment -> nexus -> waterbody -> catchment
+    downstream = gages['toid'].map(fabric._nexus_hydro_fabric['toid']).str.replace('wb', 'cat', regex=False)
+    downstream = downstream.where(downstream.isin(gages.index), None)
+    basins = gage_basins(downstream.to_dict(), fabric._eval_gages(gages).index)
+
+    with open(model['realization']) as fp:
+        realization = NgenRealization(**json.load(fp))
+    #paths relative to the calibration workdir remain valid from each basin's workdir
+    realization.resolve_paths(workdir)
+
+    root = workdir/"basins"
+    calibrated: dict[str, dict[str, dict[str, float]]] = {}
+
+    def run(basin: Basin) -> None:
+        basin_dir = root/basin.id
+        basin_dir.mkdir(parents=True, exist_ok=True)
+        result = basin_dir/BEST_PARAMS
+        if result.exists():
+            print(f"Basin {basin.id} already calibrated")
+            calibrated.update(json.loads(result.read_text()))
+            return
+        upstream = upstream_catchments(basins, basin.id)
+        print(f"Calibrating basin {basin.id}: {len(basin.catchments)} catchments, {len(upstream)} frozen upstream catchments")
+
+        realization_file = basin_dir/Path(model['realization']).name
+        realization_file.write_text(realization.json(by_alias=True, exclude_none=True, indent=4))
+        basin_model = deepcopy(model)
+        basin_model.update(
+            realization=str(realization_file),
+            eval_feature=basin.id.replace('cat', 'wb'),
+            subset=basin.catchments + upstream,
+            frozen={id: calibrated[id] for id in upstream},
+        )
+        basin_general = deepcopy(general)
+        basin_general.update(workdir=str(basin_dir), name=f"{general.get('name', 'ngen-calibration')}-{basin.id}")
+        config_file = basin_dir/"calibration.yaml"
+        with open(config_file, 'w') as fp:
+            yaml.safe_dump({'general': basin_general, 'model': basin_model}, fp)
+
+        with open(basin_dir/"ngen_cal.log", 'w') as log:
+            subprocess.run([sys.executable, "-m", "ngen.cal", str(config_file)], stdout=log, stderr=subprocess.STDOUT, check=True)
+
+        params = best_params(basin_dir, basin.catchments)
+        result.write_text(json.dumps(params, indent=4))
+        calibrated.update(params)
+        print(f"Basin {basin.id} calibrated")
+
+    print(f"Calibrating {len(basins)} basins with up to {workers} concurrent basins")
+    schedule(basins, run, workers)
+    return basins
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the nested gaged basins of a hydrofabric.")
+    parser.add_argument('config_file', type=Path, help='The configuration yaml file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='maximum number of basins calibrated concurrently, defaults to the number of cores')
+    args = parser.parse_args(argv)
+
+    with open(args.config_file) as file:
+        conf = yaml.safe_load(file)
+    calibrate(conf, args.workers)
+
+
+if __name__ == "__main__":
+    main()
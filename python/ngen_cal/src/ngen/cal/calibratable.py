@@ -96,8 +96,8 @@ class Adjustable(ABC):
         """
         self._df = read_parquet(path/self.check_point_file)
 
-    def restart(self) -> None:
-            self.load_df('./')
+    def restart(self, workdir: Path | None = None) -> None:
+            self.load_df(Path('./') if workdir is None else workdir)
 
 class Evaluatable(ABC):
     """
@@ -123,6 +123,16 @@ class Evaluatable(ABC):
         """
         pass
 
+    def get_output(self, workdir: Path | None = None) -> DataFrame:
+        """
+            The output data for the calibrated object produced by a model run in `workdir`.
+            Implementations should read output relative to `workdir`, not the current working directory,
+            so that objects can be evaluated concurrently.
+
+            Defaults to the `output` property.
+        """
+        return self.output
+
     @property
     @abstractmethod
     def observed(self) -> DataFrame:
@@ -151,7 +161,7 @@ class Evaluatable(ABC):
         """
         return self.eval_params.objective
 
-    def update(self, i: int, score: float, log: bool) -> None:
+    def update(self, i: int, score: float, log: bool, workdir: Path | None = None) -> None:
         """
            Update the meta state for iteration `i` having score `score`
            logs objective information if log=True
@@ -161,8 +171,9 @@ class Evaluatable(ABC):
             i (int): iteration index to set score at
             score (float): score value to save
             log (bool): writes objective information to log file if True
+            workdir (Path | None): directory log files are written to, defaults to the current working directory
         """
-        self.eval_params.update(i, score, log)
+        self.eval_params.update(i, score, log, workdir)
 
     @property
     def best_params(self) -> str:
@@ -184,8 +195,8 @@ class Evaluatable(ABC):
         """
         return self.eval_params.best_score
 
-    def restart(self) -> int:
-        return self.eval_params.restart()
+    def restart(self, workdir: Path | None = None) -> int:
+        return self.eval_params.restart(workdir)
 
 class Calibratable(Adjustable, Evaluatable):
     """
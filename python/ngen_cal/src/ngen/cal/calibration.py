@@ -0,0 +1,288 @@
+"""
+    Programmatic calibration API.
+
+    A `Domain` reads a hydrofabric and realization once, and caches the observations of its gages, so
+    that many calibrations of the same domain, e.g. with different objectives, parameters or evaluation
+    windows, can run in the same process without re-reading them.
+
+        domain = Domain(conf['model'], workdir)
+        for objective in ('kling_gupta', 'nnse'):
+            general = General(**conf['general'])
+            Calibration(domain, general, {'eval_params': {'objective': objective}}).run()
+
+    Relative paths are resolved against the domain's and the calibration's workdir.  A calibration runs its
+    models in, reads their outputs from and writes its logs to its job directory, so it neither changes nor
+    depends on the current working directory.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Callable, List, Union, cast
+
+import numpy as np
+from ngen.config.realization import NgenRealization
+
+from ngen.cal import hookimpl
+from ngen.cal._plugin_system import setup_plugin_manager
+from ngen.cal.agent import Agent
+from ngen.cal.configuration import Model
+from ngen.cal.events import EventStream
+from ngen.cal.metrics import PrometheusExporter
+from ngen.cal.profiling import Profiler
+from ngen.cal.ngen import NgenBase
+from ngen.cal.resources import ResourceSummary
+from ngen.cal.search import dds, dds_set, pso_search
+from ngen.cal.strategy import Algorithm
+from ngen.cal.timing import TimingSummary
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from typing import Any, Mapping, Sequence
+
+    import pandas as pd
+    from hypy.nexus import Nexus
+    from pluggy import PluginManager
+
+    from ngen.cal.configuration import General
+
+#model configuration paths, resolved against the domain's workdir
+_PATH_KEYS = ("realization", "hydrofabric", "catchments", "nexus", "crosswalk", "partitions")
+#model configuration keys defining the domain, which calibrations of the domain cannot override
+_DOMAIN_KEYS = ("type", "realization", "hydrofabric", "catchments", "nexus", "crosswalk", "workdir")
+#hydrofabric data read by `NgenBase._read_hydrofabric`
+_HYDROFABRIC = ("_catchment_hydro_fabric", "_nexus_hydro_fabric", "_flowpath_hydro_fabric", "_x_walk")
+
+
+def _loaded_plugins(pm: PluginManager) -> str:
+    from .utils import type_as_import_string
+
+    plugins: list[str] = []
+    for (name, plugin) in pm.list_name_plugin():
+        if not name:
+            continue
+        # case for a class based plugin. name in this case is the python ref id.
+        if name[0].isdigit():
+            qualified_name = type_as_import_string(plugin.__class__)
+            name = f"{qualified_name} ({name})"
+
+        plugins.append(name)
+
+    return f"Plugins Loaded: {', '.join(plugins)}"
+
+
+class ObservationCache:
+    """
+        Model plugin returning the observations of a gage retrieved by a previous model of the same `Domain`,
+        observations are only retrieved, by the model's other plugins, the first time they are requested
+    """
+
+    def __init__(self, observations: dict[tuple, pd.Series], plugin_manager: PluginManager):
+        self._observations = observations
+        self._plugin_manager = plugin_manager
+
+    @hookimpl(tryfirst=True)
+    def ngen_cal_model_observations(
+        self,
+        nexus: Nexus,
+        start_time: datetime,
+        end_time: datetime,
+        simulation_interval: pd.Timedelta,
+    ) -> pd.Series | None:
+        location = nexus._hydro_location
+        key = (nexus.id, getattr(location, "station_id", None), start_time, end_time, simulation_interval)
+        if key not in self._observations:
+            retrieve = self._plugin_manager.subset_hook_caller("ngen_cal_model_observations", remove_plugins=[self])
+            obs = retrieve(nexus=nexus, start_time=start_time, end_time=end_time, simulation_interval=simulation_interval)
+            if obs is None:
+                return None
+            self._observations[key] = obs
+        # callers may modify the returned series, e.g. rename it
+        return self._observations[key].copy()
+
+
+class Domain:
+    """
+        A loaded ngen domain, the hydrofabric, realization and observations shared by `Calibration`s of the domain
+    """
+
+    def __init__(self, model: Mapping[str, Any], workdir: Path = Path("./")):
+        """
+        Args:
+            model (Mapping[str, Any]): `model` configuration of an `ngen.cal` configuration, calibrations of the domain
+                                       use it as their model configuration unless they override it
+            workdir (Path, optional): directory relative paths of `model` are resolved against. Defaults to the current
+                                      working directory.
+
+        Raises:
+            ValueError: `model` is not an ngen model configuration
+        """
+        if model.get("type") != "ngen":
+            raise ValueError(f"domains require an ngen model configuration, got type {model.get('type')}")
+        self._workdir = Path(workdir).resolve()
+        self._model = dict(model)
+        for key in _PATH_KEYS:
+            if self._model.get(key) is not None:
+                self._model[key] = str(self._workdir/self._model[key])
+        self._model["workdir"] = str(self._workdir/self._model.get("workdir", "./"))
+
+        self._fabric = NgenBase.construct(**{key: Path(self._model[key]) for key in _PATH_KEYS[1:5] if self._model.get(key) is not None})
+        self._fabric._read_hydrofabric()
+        with open(self._model["realization"]) as fp:
+            self._realization = NgenRealization(**json.load(fp))
+        self._observations: dict[tuple, pd.Series] = {}
+
+    @property
+    def workdir(self) -> Path:
+        return self._workdir
+
+    @property
+    def model(self) -> dict[str, Any]:
+        """
+            The domain's model configuration, with resolved paths
+        """
+        return dict(self._model)
+
+    @property
+    def realization(self) -> NgenRealization:
+        return self._realization
+
+    def share(self, model: NgenBase) -> None:
+        """Give `model` the domain's hydrofabric and cached observations, and a copy of its realization
+
+        The hydrofabric is shared, not copied, and must not be modified by `model`.
+        """
+        for name in _HYDROFABRIC:
+            if hasattr(self._fabric, name):
+                setattr(model, name, getattr(self._fabric, name))
+        model.ngen_realization = self._realization.copy(deep=True)
+        model._plugin_manager.register(ObservationCache(self._observations, model._plugin_manager))
+
+
+class Calibration:
+    """
+        A calibration of a `Domain`, the programmatic equivalent of `python -m ngen.cal`
+    """
+
+    def __init__(self, domain: Domain, general: General, model: Mapping[str, Any] | None = None):
+        """
+        Args:
+            domain (Domain): the domain to calibrate
+            general (General): general configuration of the calibration, a relative `workdir`
+                               is resolved against the current working directory
+            model (Mapping[str, Any], optional): model configuration overriding the domain's,
+                                                 e.g. `strategy`, `params` or `eval_params`
+
+        Raises:
+            ValueError: `model` overrides a key defining the domain
+        """
+        model = dict(model or {})
+        overridden = [key for key in _DOMAIN_KEYS if key in model]
+        if overridden:
+            raise ValueError(f"calibrations cannot override the domain's {', '.join(overridden)}")
+        if model.get("partitions") is not None:
+            model["partitions"] = str(domain.workdir/model["partitions"])
+        self._domain = domain
+        self._model = {**domain.model, **model}
+        self._general = general.copy(update={"workdir": general.workdir.resolve()})
+
+    @property
+    def general(self) -> General:
+        return self._general
+
+    def run(self, plugins: Sequence[object] = ()) -> Agent | None:
+        """Run the calibration
+
+        Args:
+            plugins (Sequence[object], optional): plugin instances registered, in addition to the configured
+                                                  plugins, for this run only, e.g. to collect its progress
+
+        Returns:
+            Agent | None: the agent of the calibration, holding its job and calibrated model,
+                          None if the search does not support the model strategy
+        """
+        general = self._general
+        #seed the global random number generators if requested, used by third party search algorithms (e.g. pyswarms)
+        #other searches draw from the agent's own generator, seeded with `random_seed`
+        if general.random_seed is not None:
+            import random
+            random.seed(general.random_seed)
+            np.random.seed(general.random_seed)
+
+        # model scope plugins setup in constructor
+        model = Model(model={**self._model, "domain": self._domain})
+        model_inner = model.model.unwrap()
+
+        plugin_manager = setup_plugin_manager(cast(List[Union[Callable, ModuleType]], general.plugins))
+        for plugin in plugins:
+            plugin_manager.register(plugin)
+        # built-in plugins summarizing where iteration time is spent and the resources used by model runs
+        plugin_manager.register(TimingSummary())
+        plugin_manager.register(ResourceSummary())
+        # built-in plugins streaming progress events and exporting metrics, if configured
+        plugin_manager.register(EventStream())
+        plugin_manager.register(PrometheusExporter())
+        # built-in plugin profiling the calibration loop, if configured
+        plugin_manager.register(Profiler())
+
+        print(_loaded_plugins(plugin_manager))
+
+        # setup plugins
+        plugin_manager.hook.ngen_cal_configure(config=general)
+
+        print("Starting calib")
+
+        """
+        TODO calibrate each "catcment" independely, but there may be something interesting in grouping various formulation params
+        into a single variable vector and calibrating a set of heterogenous formultions...
+        """
+        start_iteration = 0
+
+        # Initialize the starting agent
+        agent = Agent(model, general.workdir, general.log, general.restart, general.strategy.parameters, plugin_manager.hook, general.scratch_dir, general.random_seed)
+
+        # Agent mutates the model config, so `ngen_cal_model_configure` is called afterwards
+        model_inner._plugin_manager.hook.ngen_cal_model_configure(config=model_inner)
+
+        if general.strategy.algorithm == Algorithm.dds:
+            func = dds_set #FIXME what about explicit/dds
+            start_iteration = general.start_iteration
+            if general.restart:
+                start_iteration = agent.restart()
+        elif general.strategy.algorithm == Algorithm.pso: #TODO how to restart PSO?
+            if agent.model.strategy != "uniform":
+                print("Can only use PSO with the uniform model strategy")
+                return None
+            if general.restart:
+                print("Restart not supported for PSO search, starting at 0")
+            func = pso_search
+
+        print(f"Starting Iteration: {start_iteration}")
+        print("Starting calibration loop")
+
+        # call `ngen_cal_start` plugin hook functions
+        plugin_manager.hook.ngen_cal_start()
+
+        try:
+            #NOTE this assumes we calibrate each catchment independently, it may be possible to design an "aggregate" calibration
+            #that works in a more sophisticated manner.
+            if agent.model.strategy == 'explicit': #FIXME this needs a refactor...should be able to use a calibration_set with explicit loading
+                for catchment in agent.model.adjustables:
+                    dds(start_iteration, general.iterations, catchment, agent)
+
+            elif agent.model.strategy == 'independent':
+                func(start_iteration, general.iterations, agent)
+
+            elif agent.model.strategy == 'uniform':
+                func(start_iteration, general.iterations, agent)
+        # call `ngen_cal_finish` plugin hook functions
+        except Exception as e:
+            agent.job.close()
+            plugin_manager.hook.ngen_cal_finish(exception=e)
+            raise e
+        else:
+            # move the outputs of the last model run from the scratch directory to the workdir
+            agent.job.close()
+            plugin_manager.hook.ngen_cal_finish(exception=None)
+        return agent
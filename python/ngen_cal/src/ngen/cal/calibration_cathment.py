@@ -91,9 +91,16 @@ class EvaluatableCatchment(Evaluatable):
             This re-reads the output file each call, as the output for given calibration catchment changes
             for each calibration iteration.  If it doesn't exist, should return None
         """
+        return self.get_output()
+
+    def get_output(self, workdir: Path | None = None) -> pd.DataFrame:
+        """
+            The model output hydrograph for this catchment produced by a model run in `workdir`
+        """
+        output_file = self._output_file if workdir is None else workdir/self._output_file.name
         try:
             #FIXME get the output variable from config
-            self._output = pd.read_csv(self._output_file, usecols=["Time", self._output_var], parse_dates=['Time'], index_col='Time', dtype={self._output_var: 'float64'})
+            self._output = pd.read_csv(output_file, usecols=["Time", self._output_var], parse_dates=['Time'], index_col='Time', dtype={self._output_var: 'float64'})
             self._output.rename(columns={self._output_var:'sim_flow'}, inplace=True)
             #FIXME make sure units are correct here...
             #Assumes model catchment outputs are in m/hr, convert to m^3/s
@@ -133,12 +140,12 @@ class CalibrationCatchment(AdjustableCatchment, EvaluatableCatchment):
         EvaluatableCatchment.__init__(self, nexus, start_time, end_time, fabric, output_var, eval_params)
         AdjustableCatchment.__init__(self,  workdir, id, nexus, params)
 
-    def restart(self) -> int:
+    def restart(self, workdir: Path | None = None) -> int:
         #TODO validate the dataframe
         restart_iteration = 0
         try:
-            super(AdjustableCatchment, self).load_df(self._workdir)
-            restart_iteration = super(EvaluatableCatchment, self).restart()
+            super(AdjustableCatchment, self).load_df(self._workdir if workdir is None else workdir)
+            restart_iteration = super(EvaluatableCatchment, self).restart(workdir)
         except FileNotFoundError:
             pass
         return restart_iteration
@@ -21,23 +21,37 @@ class CalibrationSet(Evaluatable):
         A HY_Features based catchment with additional calibration information/functionality
     """
 
-    def __init__(self, adjustables: Sequence[Adjustable], eval_nexus: Nexus, hooks: ModelHooks, start_time: datetime, end_time: datetime, eval_params: EvaluationOptions):
+    def __init__(self, adjustables: Sequence[Adjustable], eval_nexus: Nexus | Sequence[Nexus], hooks: ModelHooks, start_time: datetime, end_time: datetime, eval_params: EvaluationOptions):
+        """
+        Args:
+            eval_nexus (Nexus | Sequence[Nexus]): the gaged nexus to evaluate. When several are given, the
+                output of each is evaluated against its observations and the scores are aggregated, see
+                `EvaluationOptions.aggregate`
+        """
         super().__init__(eval_params)
-        self._eval_nexus = eval_nexus
+        if isinstance(eval_nexus, Nexus):
+            eval_nexus = [eval_nexus]
+        assert eval_nexus, "at least one evaluation nexus is required"
+        self._gages = {_gage_id(nexus): nexus for nexus in eval_nexus}
+        # the first gage identifies the set, e.g. in check point file names
+        self._eval_nexus = eval_nexus[0]
         self._adjustables = adjustables
         # record the hooks needed for output and checkpointing
         self._hooks = hooks
 
         # TODO: derive this from realization config
         simulation_interval: pd.Timedelta = pd.Timedelta(3600, unit="s")
-        obs = self._hooks.ngen_cal_model_observations(
-            nexus=self._eval_nexus,
-            start_time=start_time,
-            end_time=end_time,
-            simulation_interval=simulation_interval,
-        )
-        obs.rename("obs_flow", inplace=True)
-        self._observed = obs
+        observed = {}
+        for id, nexus in self._gages.items():
+            obs = self._hooks.ngen_cal_model_observations(
+                nexus=nexus,
+                start_time=start_time,
+                end_time=end_time,
+                simulation_interval=simulation_interval,
+            )
+            obs.rename("obs_flow", inplace=True)
+            observed[id] = obs
+        self._observed = observed if len(observed) > 1 else obs
 
         self._output = None
         self._eval_range = self.eval_params._eval_range
@@ -57,16 +71,27 @@ class CalibrationSet(Evaluatable):
             This re-reads the output file each call, as the output for given calibration catchment changes
             for each calibration iteration. If it doesn't exist, should return None
         """
-        # TODO should contributing_catchments be singular??? assuming it is for now...
+        return self.get_output()
+
+    def get_output(self, workdir: Path | None = None) -> DataFrame | dict[str, DataFrame]:
+        """
+            The model output hydrograph for this catchment produced by a model run in `workdir`
+
+            If several gages are evaluated, the output of each gage keyed by its waterbody id,
+            None if the output of any gage is missing.
+        """
         # Call output hooks, take first non-none result provided from hooks (called in LIFO order of registration)
-        cat_id = self._eval_nexus.contributing_catchments[0].id
-        assert cat_id.startswith("cat"), f"expected catchment id to start with 'cat': {cat_id}"
-        cat_id = cat_id.replace("cat", "wb")
-        df = self._hooks.ngen_cal_model_output(id=cat_id)
-        if df is None:
-            # list of results is empty
-            print("No suitable output found from output hooks...")
-        return df
+        output = {}
+        for id in self._gages:
+            df = self._hooks.ngen_cal_model_output(id=id, workdir=workdir)
+            if df is None:
+                # list of results is empty
+                print("No suitable output found from output hooks...")
+                return None
+            output[id] = df
+        if len(output) == 1:
+            return df
+        return output
 
     # TODO should we still allow a setter here given the output hook used for this property?
     @output.setter
@@ -77,6 +102,7 @@ class CalibrationSet(Evaluatable):
     def observed(self) -> DataFrame:
         """
             The observed hydrograph for this catchment FIXME move output/observed to calibratable?
+            If several gages are evaluated, the observations of each gage keyed by its waterbody id
         """
         hydrograph = self._observed
         if hydrograph is None:
@@ -94,22 +120,29 @@ class CalibrationSet(Evaluatable):
         for adjustable in self.adjustables:
             adjustable.df.to_parquet(info.workdir/adjustable.check_point_file)
         # call any model post hooks
-        self._hooks.ngen_cal_model_iteration_finish(iteration = iteration, info = info)
+        self._hooks.ngen_cal_model_iteration_finish(iteration = iteration, info = info, score = self.eval_params.score(iteration))
 
-    def restart(self) -> int:
+    def restart(self, workdir: Path | None = None) -> int:
         try:
             for adjustable in self.adjustables:
-                adjustable.restart()
+                adjustable.restart(workdir)
         except FileNotFoundError:
             return 0
-        return super().restart()
+        return super().restart(workdir)
+
+def _gage_id(nexus: Nexus) -> str:
+    """The waterbody id whose output is evaluated for the gaged `nexus`"""
+    # TODO should contributing_catchments be singular??? assuming it is for now...
+    cat_id = nexus.contributing_catchments[0].id
+    assert cat_id.startswith("cat"), f"expected catchment id to start with 'cat': {cat_id}"
+    return cat_id.replace("cat", "wb")
 
 class UniformCalibrationSet(CalibrationSet, Adjustable):
     """
         A HY_Features based catchment with additional calibration information/functionality
     """
 
-    def __init__(self, eval_nexus: Nexus, hooks: ModelHooks, start_time: str, end_time: str, eval_params: EvaluationOptions, params: dict = {}):
+    def __init__(self, eval_nexus: Nexus | Sequence[Nexus], hooks: ModelHooks, start_time: str, end_time: str, eval_params: EvaluationOptions, params: dict = {}):
         """
 
         """
@@ -137,11 +170,11 @@ class UniformCalibrationSet(CalibrationSet, Adjustable):
     def check_point_file(self) -> Path:
         return Path(f'{self._eval_nexus.id}_parameter_df_state.parquet')
 
-    def restart(self):
+    def restart(self, workdir: Path | None = None):
         try:
             #reload the param space for the adjustable
-            Adjustable.restart(self)
+            Adjustable.restart(self, workdir)
         except FileNotFoundError:
             return 0
         #Reload the evaluation information
-        return Evaluatable.restart(self)
+        return Evaluatable.restart(self, workdir)
@@ -1,9 +1,7 @@
 from __future__ import annotations #for pydnaitc
 
-import logging
-
 #Typing, datamodel
-from pydantic import BaseModel, Field, DirectoryPath
+from pydantic import BaseModel, Field, DirectoryPath, validator
 from pathlib import Path
 from typing_extensions import Literal
 from typing import Any, Dict, Optional, List, Union
@@ -12,15 +10,10 @@ from types import ModuleType, FunctionType
 #local components for composing configuration
 from .strategy import Estimation, Sensitivity
 from .model import PosInt
+from .profiling import ProfileOptions
 from .ngen import Ngen
 from .utils import PyObjectOrModule, type_as_import_string
 
-import logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s,%(msecs)d %(levelname)s: %(message)s",
-    datefmt="%H:%M:%S")
-
 class General(BaseModel):
     """
         General ngen-cal configuration requirements
@@ -38,6 +31,11 @@ class General(BaseModel):
     parameter_log_file: Optional[Path]
     objective_log_file: Optional[Path]
     random_seed: Optional[int]
+    #directory, e.g. node local storage or /dev/shm, the model runs in rather than the workdir
+    #checkpoints, logs and saved outputs are still written to the workdir
+    scratch_dir: Optional[DirectoryPath]
+    #profile the calibration loop, `true` for the default options
+    profile: Optional[ProfileOptions]
     plugins: List[PyObjectOrModule] = Field(default_factory=list)
     plugin_settings: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
@@ -49,6 +47,12 @@ class General(BaseModel):
             FunctionType: type_as_import_string,
         }
 
+    @validator("profile", pre=True)
+    def _profile_flag(cls, value: Any) -> Any:
+        if isinstance(value, bool):
+            return {} if value else None
+        return value
+
 class NoModel(BaseModel):
     """
         A simple empty model data class for testing
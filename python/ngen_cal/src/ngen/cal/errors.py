@@ -1 +1,2 @@
 class UnsupportedFeatureError(ValueError): ...
+class ModelTimeoutError(RuntimeError): ...
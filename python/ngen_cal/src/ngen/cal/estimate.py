@@ -0,0 +1,247 @@
+"""
+    Estimate the wall time, disk usage and model run concurrency of a calibration before running it.
+
+        python -m ngen.cal calibration.yaml --estimate 3   # time 3 sample iterations
+        python -m ngen.cal calibration.yaml --dry-run      # build the model, use the run logs of previous calibrations
+
+    Sample iterations are run in a temporary directory of the workdir, which is removed afterwards.
+"""
+from __future__ import annotations
+
+import math
+import os
+import shutil
+from datetime import timedelta
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import pandas as pd
+
+from ngen.cal import hookimpl
+from ngen.cal.resources import RUN_LOG
+from ngen.cal.strategy import Algorithm
+
+if TYPE_CHECKING:
+    from typing import Mapping
+
+    from ngen.cal.calibration import Domain
+    from ngen.cal.configuration import General
+
+#plugin settings not applied to sample iterations, so that estimating doesn't publish progress or metrics
+_MONITORING = ("event_stream", "prometheus")
+
+
+class Estimate(NamedTuple):
+    """
+        Estimated resources of a calibration
+    """
+    #calibration iterations and model runs
+    iterations: int
+    runs: int
+    #mean wall clock seconds of a model run
+    run_time: float
+    #wall clock seconds of the calibration's own work (updating configs, reading output, scoring) per iteration,
+    #None if unknown
+    overhead: Optional[float]
+    #cores used by a model run and its peak resident set size, in bytes, None if unknown
+    cores: Optional[float]
+    max_rss: Optional[int]
+    #concurrent model runs the estimate assumes
+    pool: int
+    #total wall clock seconds, and bytes written to the workdir
+    wall_time: float
+    disk: int
+    #model runs the estimate is extrapolated from, and their source: `sample` or `history`
+    samples: int
+    source: str
+
+    def __str__(self) -> str:
+        cores = "unknown" if self.cores is None else f"{self.cores:.1f}"
+        memory = "unknown" if self.max_rss is None else _size(self.max_rss)
+        overhead = "unknown" if self.overhead is None else f"{self.overhead:.2f} s"
+        return "\n".join([
+            f"Estimate from {self.samples} timed model runs ({self.source})",
+            f"  iterations:    {self.iterations} ({self.runs} model runs)",
+            f"  model run:     {self.run_time:.2f} s, {cores} cores, {memory} peak memory",
+            f"  overhead:      {overhead} per iteration",
+            f"  pool:          {self.pool} concurrent model runs",
+            f"  wall time:     {timedelta(seconds=round(self.wall_time))}",
+            f"  disk usage:    {_size(self.disk)}",
+        ])
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(n) < 1024 or unit == "TiB":
+            return f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def _cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        #not available on macOS
+        return os.cpu_count() or 1
+
+
+def _memory() -> int | None:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def tree_size(path: Path) -> int:
+    """Total size, in bytes, of the files under `path`"""
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                pass
+    return size
+
+
+def run_logs(workdir: Path) -> pd.DataFrame | None:
+    """The model run logs of the calibration jobs in `workdir`, with a `job` column naming the job
+
+    Returns:
+        pd.DataFrame | None: None if no job in `workdir` logged a model run
+    """
+    logs = []
+    for log in sorted(Path(workdir).glob(f"*_worker/{RUN_LOG}")):
+        df = pd.read_csv(log)
+        df["job"] = log.parent.name
+        logs.append(df)
+    if not logs:
+        return None
+    runs = pd.concat(logs, ignore_index=True)
+    return runs if not runs.empty else None
+
+
+def extrapolate(runs: pd.DataFrame, disk: int, iterations: int, algorithm: Algorithm, parameters: Mapping,
+                overhead: float | None, source: str, cpus: int | None = None, memory: int | None = None) -> Estimate:
+    """Extrapolate the resources of a calibration of `iterations` iterations from the model runs of sample iterations
+
+    Args:
+        runs (pd.DataFrame): model run log of the sample iterations, see `run_logs`
+        disk (int): bytes written to the workdir by the sample iterations
+        iterations (int): iterations of the calibration
+        algorithm (Algorithm): search algorithm of the calibration
+        parameters (Mapping): search algorithm parameters, e.g. the PSO `particles` and `pool`
+        overhead (float | None): wall clock seconds of the calibration's own work per iteration, None if unknown
+        source (str): source of `runs`, reported with the estimate
+        cpus (int, optional): cores available to model runs. Defaults to the cores available to this process.
+        memory (int, optional): bytes of memory available to model runs. Defaults to the physical memory.
+
+    Returns:
+        Estimate: estimated resources.  PSO calibrations are estimated with the largest pool, up to one
+                  model run per particle, that the cores and memory of the machine can run concurrently.
+    """
+    cpus = _cpus() if cpus is None else cpus
+    memory = _memory() if memory is None else memory
+    #a job runs one model per iteration, PSO particles each have their own job
+    job_iterations = len(runs[["job", "iteration"]].drop_duplicates())
+    run_time = float(runs["wall_time"].mean())
+    runs_per_iteration = len(runs) / job_iterations
+    cpu = (runs["user_time"] + runs["system_time"]) / runs["wall_time"]
+    cores = float(cpu.mean()) if cpu.notna().any() else None
+    max_rss = int(runs["max_rss"].max()) if runs["max_rss"].notna().any() else None
+
+    if algorithm == Algorithm.pso:
+        particles = parameters.get("particles", 4)
+        pool = cpus // max(1, math.ceil(cores or 1))
+        if max_rss and memory:
+            pool = min(pool, memory // max_rss)
+        pool = max(1, min(particles, pool))
+        jobs = particles
+        total_iterations = iterations
+        model_time = math.ceil(particles / pool) * runs_per_iteration * run_time
+    else:
+        pool = 1
+        jobs = 1
+        #the initial iteration 0 produces the baseline
+        total_iterations = iterations + 1
+        model_time = runs_per_iteration * run_time
+    return Estimate(
+        iterations=total_iterations,
+        runs=round(total_iterations * jobs * runs_per_iteration),
+        run_time=run_time,
+        overhead=overhead,
+        cores=cores,
+        max_rss=max_rss,
+        pool=pool,
+        wall_time=total_iterations * (model_time + (overhead or 0.0)),
+        disk=round(disk / job_iterations * total_iterations * jobs),
+        samples=len(runs),
+        source=source,
+    )
+
+
+class _IterationTimings:
+    """
+        Plugin collecting the phase timings of the sample iterations
+    """
+
+    def __init__(self):
+        self.timings: list[dict[str, float]] = []
+
+    @hookimpl
+    def ngen_cal_iteration_timing(self, iteration: int, timings: Mapping[str, float]) -> None:
+        self.timings.append(dict(timings))
+
+    def overhead(self) -> float | None:
+        """Mean wall clock seconds per iteration spent outside of model runs"""
+        if not self.timings:
+            return None
+        return sum(sum(s for phase, s in t.items() if phase != "model_run") for t in self.timings) / len(self.timings)
+
+
+def sample(domain: Domain, general: General, iterations: int = 2) -> Estimate:
+    """Estimate the calibration of `domain` configured by `general` from `iterations` timed sample iterations
+
+    Sample iterations, plus the initial iteration of a DDS search, are run in a temporary directory of the workdir
+    which is removed afterwards.
+
+    Raises:
+        RuntimeError: the sample iterations did not run a model
+    """
+    from ngen.cal.calibration import Calibration
+
+    workdir = Path(mkdtemp(dir=general.workdir, prefix="estimate_"))
+    settings = {k: v for k, v in general.plugin_settings.items() if k not in _MONITORING}
+    #DDS requires at least 2 iterations
+    sample_general = general.copy(update={"workdir": workdir, "iterations": max(2, iterations), "restart": False,
+                                          "start_iteration": 0, "profile": None, "plugin_settings": settings})
+    timings = _IterationTimings()
+    try:
+        Calibration(domain, sample_general).run(plugins=[timings])
+        runs = run_logs(workdir)
+        disk = tree_size(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if runs is None:
+        raise RuntimeError("sample iterations did not run a model, cannot estimate")
+    return extrapolate(runs, disk, general.iterations, general.strategy.algorithm, general.strategy.parameters or {},
+                       timings.overhead(), "sample")
+
+
+def history(domain: Domain, general: General) -> Estimate | None:
+    """Build the model of `domain`, and estimate its calibration from the run logs of previous calibrations in the workdir
+
+    Returns:
+        Estimate | None: None if no previous calibration logged a model run
+    """
+    from ngen.cal.configuration import Model
+
+    #building the model validates the configuration and retrieves the observations
+    Model(model={**domain.model, "domain": domain})
+    runs = run_logs(general.workdir)
+    if runs is None:
+        return None
+    disk = sum(tree_size(Path(general.workdir)/job) for job in runs["job"].unique())
+    return extrapolate(runs, disk, general.iterations, general.strategy.algorithm, general.strategy.parameters or {},
+                       None, "history")
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import socket
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ngen.cal import hookimpl
+
+if TYPE_CHECKING:
+    from typing import Any, Mapping, TextIO
+
+    from ngen.cal.configuration import General
+    from ngen.cal.resources import RunResources
+
+
+class EventStream:
+    """
+        Built-in plugin writing the progress of a calibration as a stream of JSON lines, one event per line,
+        to a file or a unix domain socket.
+
+        Configured with the `event_stream` plugin settings, e.g.
+
+            general:
+                plugin_settings:
+                    event_stream:
+                        path: events.jsonl # appended to, relative to the workdir
+                        # or
+                        socket: /run/ngen-cal/events.sock # connected to as a SOCK_STREAM client
+
+        Events are written when the calibration starts (`start`), when each iteration starts (`iteration_start`)
+        and finishes (`iteration_finish`, with its score, the best score so far, phase timings and model runs),
+        and when the calibration finishes (`finish`).  Every event has the `event` name, the `time` it was written,
+        the calibration `name` and the `worker` (host and process id) running it.
+        Nothing is written unless `path` or `socket` is configured.
+    """
+    settings = "event_stream"
+
+    def __init__(self):
+        self._fp: TextIO | None = None
+        self._socket: socket.socket | None = None
+        self._name: str | None = None
+        self._worker = f"{socket.gethostname()}:{os.getpid()}"
+        self._timings: Mapping[str, float] = {}
+        self._runs: list[RunResources] = []
+
+    @hookimpl
+    def ngen_cal_configure(self, config: General) -> None:
+        settings = config.plugin_settings.get(self.settings, {})
+        self._name = config.name
+        if settings.get("path") is not None:
+            # line buffered, so each event is visible to readers once written
+            self._fp = open(Path(config.workdir)/settings["path"], "a", buffering=1)
+        elif settings.get("socket") is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(settings["socket"])
+
+    @hookimpl
+    def ngen_cal_start(self) -> None:
+        self.write("start")
+
+    @hookimpl
+    def ngen_cal_iteration_start(self, iteration: int) -> None:
+        self.write("iteration_start", iteration=iteration)
+
+    @hookimpl
+    def ngen_cal_iteration_timing(self, iteration: int, timings: Mapping[str, float]) -> None:
+        self._timings = dict(timings)
+
+    @hookimpl
+    def ngen_cal_model_run(self, iteration: int, run: RunResources) -> None:
+        self._runs.append(run)
+
+    @hookimpl
+    def ngen_cal_iteration_finish(self, iteration: int, score: float | None, best_score: float, best_iteration: int) -> None:
+        self.write("iteration_finish", iteration=iteration, score=score, best_score=best_score, best_iteration=best_iteration,
+                   timings=self._timings, model_runs=[dict(run._asdict()) for run in self._runs])
+        self._timings = {}
+        self._runs = []
+
+    @hookimpl
+    def ngen_cal_finish(self, exception: Exception | None) -> None:
+        self.write("finish", status="ok" if exception is None else "error",
+                   error=None if exception is None else repr(exception))
+        self.close()
+
+    def write(self, event: str, **data: Any) -> None:
+        """Write `event`, with `data`, to the stream"""
+        if self._fp is None and self._socket is None:
+            return
+        record = {"event": event, "time": datetime.now(timezone.utc).isoformat(), "name": self._name, "worker": self._worker}
+        record.update(data)
+        line = json.dumps(_finite(record), default=str) + "\n"
+        if self._fp is not None:
+            self._fp.write(line)
+            return
+        try:
+            self._socket.sendall(line.encode())
+        except OSError as e:
+            # losing the monitor must not stop the calibration
+            warnings.warn(f"event stream socket closed, no longer writing events: {e}")
+            self.close()
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+def _finite(value: Any) -> Any:
+    """`value` with non-finite floats, e.g. penalty scores, replaced by None, which JSON can represent"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_finite(v) for v in value]
+    return value
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import shutil
 from pathlib import Path
 from tempfile import mkdtemp
 from datetime import datetime
@@ -13,7 +14,7 @@ class JobMeta:
         Structure for holding model job meta data
     """
 
-    def __init__(self, name: str, parent_workdir: Path, workdir: Path=None, log=False):
+    def __init__(self, name: str, parent_workdir: Path, workdir: Path=None, log=False, scratch_dir: Path=None):
         """Create a job meta data structure
 
         Args:
@@ -21,12 +22,18 @@ class JobMeta:
             workdir (Path): working directory to stage the job under.  If workdir is None, a temporary directory following the pattern
                             YYYYMMDDHHmm_name_worker is created.  Once created, it is left to the user to cleanup if needed.
             log (bool, optional): Whether or not to create a log file for the job. Defaults to False.
+            scratch_dir (Path, optional): directory, e.g. node local storage, to run the model in.  A run directory is
+                                          created under it and removed by `close`.  Defaults to running in `workdir`.
         """
         if workdir is None:
             self._workdir = Path( mkdtemp(dir=parent_workdir, prefix=f"{datetime.now().strftime('%Y%m%d%H%M')}_{name}_", suffix="_worker") ).resolve()
         else:
             self._workdir = workdir
 
+        self._run_dir = None
+        if scratch_dir is not None:
+            self._run_dir = Path( mkdtemp(dir=scratch_dir, prefix=f"{self._workdir.name}_") ).resolve()
+
         self._log_file = None
         if log:
             self._log_file = self._workdir/Path(name+".log")
@@ -41,6 +48,30 @@ class JobMeta:
         if self._log_file is not None:
             self._log_file = self._workdir/Path(self._log_file.name)
 
+    @property
+    def run_dir(self) -> Path:
+        """
+            Directory the model runs in, and its outputs are read from.  The `workdir` unless a scratch directory is used.
+        """
+        return self._workdir if self._run_dir is None else self._run_dir
+
+    def close(self) -> None:
+        """
+            Move anything left in the scratch run directory, e.g. the outputs of the last model run, to the workdir
+            and remove the run directory
+        """
+        if self._run_dir is None:
+            return
+        for path in self._run_dir.iterdir():
+            target = self._workdir/path.name
+            if target.is_dir():
+                shutil.rmtree(target)
+            elif target.exists():
+                target.unlink()
+            shutil.move(str(path), target)
+        self._run_dir.rmdir()
+        self._run_dir = None
+
     @property
     def log_file(self) -> Path:
         """
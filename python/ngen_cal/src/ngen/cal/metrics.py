@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import math
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ngen.cal import hookimpl
+
+if TYPE_CHECKING:
+    from typing import Iterable, Mapping, Sequence
+
+    from ngen.cal.configuration import General
+    from ngen.cal.resources import RunResources
+
+#histogram buckets, in seconds, of model run and iteration phase durations
+DURATION_BUCKETS = (0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, 1800, 3600, 7200)
+
+
+def _value(value: float) -> str:
+    """A sample value in the prometheus text format"""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"') for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class Histogram:
+    """
+        Cumulative histogram of observed values, in the prometheus histogram format
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = sorted(buckets)
+        self._counts = [0]*(len(self._buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self._sum += value
+
+    def samples(self, name: str, labels: Mapping[str, str]) -> Iterable[str]:
+        """Sample lines of the histogram as metric `name` with `labels`"""
+        total = 0
+        for bound, count in zip(self._buckets + [math.inf], self._counts):
+            total += count
+            yield f"{name}_bucket{_labels({**labels, 'le': _value(bound)})} {total}"
+        yield f"{name}_sum{_labels(labels)} {_value(self._sum)}"
+        yield f"{name}_count{_labels(labels)} {total}"
+
+
+class PrometheusExporter:
+    """
+        Built-in plugin writing calibration throughput and latency metrics, in the prometheus text exposition format,
+        to a file read by node_exporter's textfile collector.
+
+        Configured with the `prometheus` plugin settings, e.g.
+
+            general:
+                plugin_settings:
+                    prometheus:
+                        # relative to the workdir, use a distinct file for each concurrent calibration
+                        path: /var/lib/node_exporter/textfile/ngen_cal_basin_1.prom
+                        # optional labels added to every metric, in addition to the calibration `name`
+                        labels:
+                            basin: "01123000"
+                        # optional histogram buckets, in seconds
+                        buckets: [1, 10, 60, 600]
+
+        The file is replaced, atomically, after each iteration and when the calibration finishes.
+        The rate at which runs reuse saved outputs is, e.g.
+            sum(rate(ngen_cal_model_runs_total{kind!="model"}[5m])) / sum(rate(ngen_cal_model_runs_total[5m]))
+        Nothing is written unless `path` is configured.
+    """
+    settings = "prometheus"
+
+    def __init__(self):
+        self._path: Path | None = None
+        self._labels: dict[str, str] = {}
+        self._buckets: Sequence[float] = DURATION_BUCKETS
+        self._iterations = 0
+        self._unscored = 0
+        self._errors = 0
+        self._runs: dict[str, int] = {}
+        self._timeouts = 0
+        self._run_duration = Histogram(self._buckets)
+        self._phase_duration: dict[str, Histogram] = {}
+        self._iteration: int | None = None
+        self._score = math.nan
+        self._best_score = math.nan
+
+    @hookimpl
+    def ngen_cal_configure(self, config: General) -> None:
+        settings = config.plugin_settings.get(self.settings, {})
+        if settings.get("path") is None:
+            return
+        self._path = Path(config.workdir)/settings["path"]
+        self._labels = {"name": config.name, **{str(k): str(v) for k, v in settings.get("labels", {}).items()}}
+        self._buckets = settings.get("buckets", DURATION_BUCKETS)
+        self._run_duration = Histogram(self._buckets)
+
+    @hookimpl
+    def ngen_cal_iteration_timing(self, iteration: int, timings: Mapping[str, float]) -> None:
+        for phase, seconds in timings.items():
+            if phase not in self._phase_duration:
+                self._phase_duration[phase] = Histogram(self._buckets)
+            self._phase_duration[phase].observe(seconds)
+
+    @hookimpl
+    def ngen_cal_model_run(self, iteration: int, run: RunResources) -> None:
+        self._runs[run.kind] = self._runs.get(run.kind, 0) + 1
+        self._timeouts += run.timed_out
+        self._run_duration.observe(run.wall_time)
+
+    @hookimpl
+    def ngen_cal_iteration_finish(self, iteration: int, score: float | None, best_score: float, best_iteration: int) -> None:
+        self._iterations += 1
+        self._iteration = iteration
+        if score is None:
+            self._unscored += 1
+        else:
+            self._score = score
+        self._best_score = best_score
+        self.write()
+
+    @hookimpl
+    def ngen_cal_finish(self, exception: Exception | None) -> None:
+        self._errors += exception is not None
+        self.write()
+
+    def exposition(self) -> str:
+        """The metrics in the prometheus text exposition format"""
+        labels = self._labels
+        lines = []
+
+        def metric(name: str, type: str, help: str, samples: Iterable[str]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            lines.extend(samples)
+
+        metric("ngen_cal_iterations_total", "counter", "Calibration iterations completed",
+               [f"ngen_cal_iterations_total{_labels(labels)} {self._iterations}"])
+        metric("ngen_cal_unscored_iterations_total", "counter", "Calibration iterations completed without a score, e.g. screened out",
+               [f"ngen_cal_unscored_iterations_total{_labels(labels)} {self._unscored}"])
+        metric("ngen_cal_model_runs_total", "counter", "Model runs, by kind: model, partial or routing, the latter two reuse saved outputs",
+               [f"ngen_cal_model_runs_total{_labels({**labels, 'kind': kind})} {count}" for kind, count in sorted(self._runs.items())])
+        metric("ngen_cal_model_run_timeouts_total", "counter", "Model runs which timed out",
+               [f"ngen_cal_model_run_timeouts_total{_labels(labels)} {self._timeouts}"])
+        metric("ngen_cal_errors_total", "counter", "Calibrations which finished with an error",
+               [f"ngen_cal_errors_total{_labels(labels)} {self._errors}"])
+        metric("ngen_cal_model_run_duration_seconds", "histogram", "Wall clock duration of model runs",
+               self._run_duration.samples("ngen_cal_model_run_duration_seconds", labels))
+        metric("ngen_cal_phase_duration_seconds", "histogram", "Wall clock duration of each phase of an iteration, e.g. output parsing",
+               [line for phase, h in sorted(self._phase_duration.items())
+                for line in h.samples("ngen_cal_phase_duration_seconds", {**labels, "phase": phase})])
+        if self._iteration is not None:
+            metric("ngen_cal_iteration", "gauge", "Last completed calibration iteration",
+                   [f"ngen_cal_iteration{_labels(labels)} {self._iteration}"])
+        metric("ngen_cal_score", "gauge", "Objective score of the last scored iteration",
+               [f"ngen_cal_score{_labels(labels)} {_value(self._score)}"])
+        metric("ngen_cal_best_score", "gauge", "Best objective score of the calibration",
+               [f"ngen_cal_best_score{_labels(labels)} {_value(self._best_score)}"])
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Atomically replace the metrics file, so the textfile collector never reads a partial file"""
+        if self._path is None:
+            return
+        tmp = self._path.with_name(f".{self._path.name}.{os.getpid()}")
+        tmp.write_text(self.exposition())
+        os.replace(tmp, self._path)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, DirectoryPath, conint, PyObject, validator, Field, root_validator
-from typing import Any, cast, Callable, Dict, List, Optional, Tuple, Union
+from pydantic import BaseModel, DirectoryPath, conint, PyObject, validator, Field, root_validator, PositiveFloat, PositiveInt
+from typing import Any, cast, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 from types import ModuleType, FunctionType
 try: #to get literal in python 3.7, it was added to typing in 3.8
     from typing import Literal
@@ -9,6 +9,7 @@ except ImportError:
     from typing_extensions import Literal
 from datetime import datetime
 from pathlib import Path
+from statistics import median
 from abc import ABC, abstractmethod
 from .strategy import Objective
 from ngen.cal._plugin_system import setup_scoped_plugin_manager
@@ -59,8 +60,20 @@ class EvaluationOptions(BaseModel):
     """
     objective: Optional[Union[Objective, PyObject]] = Objective.custom
     target: Union[Literal['min'], Literal['max'], float] = 'min'
+    """
+        Aggregation of the objective scores of each gage, when several gages are evaluated
+        mean:   weighted mean, see `weights`
+        min:    smallest gage score
+        max:    largest gage score
+        median: median gage score
+    """
+    aggregation: Literal['mean', 'min', 'max', 'median'] = 'mean'
+    #Optional weight of each gage, keyed by the gaged waterbody id (e.g. wb-1), gages not listed have a weight of 1
+    weights: Optional[Dict[str, float]]
     _best_score: float
     _best_params_iteration: str = '0'
+    #score of each iteration evaluated by this calibration
+    _scores: Dict[int, float]
     id: Optional[str]
     _param_log_file: Path
     _objective_log_file: Path
@@ -87,8 +100,9 @@ class EvaluationOptions(BaseModel):
         else: #must be min or value, either way this works
             self._best_score = float('inf')
         self._best_params_iteration = '0' #String representation of interger iteration
+        self._scores = {}
 
-    def update(self, i: int, score: float, log: bool) -> None:
+    def update(self, i: int, score: float, log: bool, workdir: Path | None = None) -> None:
         """Update the meta state for iteration `i` having score `score`
            logs objective information if log=True
 
@@ -96,31 +110,83 @@ class EvaluationOptions(BaseModel):
             i (int): iteration index to set score at
             score (float): score value to save
             log (bool): writes objective information to log file if True
+            workdir (Path | None): directory log files are written to, defaults to the current working directory
+        """
+        self._scores[i] = score
+        if self.improves(score, self._best_score):
+            self._best_params_iteration = str(i)
+            self._best_score = score
+        if log:
+            self.write_param_log_file(i, workdir)
+            self.write_objective_log_file(i, score, workdir)
+
+    def improves(self, score: float, reference: float) -> bool:
+        """Whether `score` is at least as good as `reference` with respect to the objective target
+
+        Args:
+            score (float): candidate score
+            reference (float): score to compare against, e.g. the current best score
+
+        Returns:
+            bool: True if `score` is as good or better than `reference`
+        """
+        return self.rank(score) <= self.rank(reference)
+
+    def rank(self, score: float) -> float:
+        """Rank of `score` with respect to the objective target, better scores have a lower rank
+
+        Args:
+            score (float): score to rank
+
+        Returns:
+            float: rank of `score`
         """
-        #TODO store current_score and current_iteration?
         if self.target == 'min':
-            if score <= self._best_score:
-                self._best_params_iteration = str(i)
-                self._best_score = score
+            return score
         elif self.target == 'max':
-            if score >= self._best_score:
-                self._best_params_iteration = str(i)
-                self._best_score = score
+            return -score
         else: #target is a specific value
-            if abs( score - self.target ) <= abs(self._best_score - self.target):
-                self._best_params_iteration = str(i)
-                self._best_score = score
-        if log:
-            self.write_param_log_file(i)
-            self.write_objective_log_file(i, score)
+            return abs( score - self.target )
+
+    def score(self, i: int) -> float | None:
+        """The score of iteration `i`, None if iteration `i` was not scored, e.g. it was screened out
+
+        Args:
+            i (int): iteration
+
+        Returns:
+            float | None: score of iteration `i`
+        """
+        return self._scores.get(i)
 
-    def write_objective_log_file(self, i, score):
-        with open(self.objective_log_file, 'a+') as log_file:
+    def aggregate(self, scores: Mapping[str, float]) -> float:
+        """Aggregate the objective scores of several gages into a single score
+
+        Args:
+            scores (Mapping[str, float]): objective score of each gage, keyed by gaged waterbody id
+
+        Returns:
+            float: aggregate score
+        """
+        if self.aggregation == 'min':
+            return min(scores.values())
+        elif self.aggregation == 'max':
+            return max(scores.values())
+        elif self.aggregation == 'median':
+            return median(scores.values())
+        weights = self.weights or {}
+        total = sum(weights.get(id, 1.0) for id in scores)
+        return sum(weights.get(id, 1.0) * score for id, score in scores.items()) / total
+
+    def write_objective_log_file(self, i, score, workdir: Path | None = None):
+        path = self.objective_log_file if workdir is None else workdir/self.objective_log_file
+        with open(path, 'a+') as log_file:
             log_file.write(f'{i}, ')
             log_file.write(f'{score}\n')
 
-    def write_param_log_file(self, i):
-        with open(self.param_log_file, 'w+') as log_file:
+    def write_param_log_file(self, i, workdir: Path | None = None):
+        path = self.param_log_file if workdir is None else workdir/self.param_log_file
+        with open(path, 'w+') as log_file:
             log_file.write(f'{i}\n')
             log_file.write(f'{self.best_params}\n')
             log_file.write(f'{self.best_score}\n')
@@ -182,16 +248,18 @@ class EvaluationOptions(BaseModel):
             value = Objective.custom
         return value
 
-    def read_param_log_file(self):
-        with open(self.param_log_file) as log_file:
+    def read_param_log_file(self, workdir: Path | None = None):
+        path = self.param_log_file if workdir is None else workdir/self.param_log_file
+        with open(path) as log_file:
             iteration = int(log_file.readline())
             best_params = int(log_file.readline())
             best_score = float(log_file.readline())
         return iteration, best_params, best_score
 
-    def restart(self) -> int:
+    def restart(self, workdir: Path | None = None) -> int:
         """
-            Attempt to restart a calibration from a previous state.
+            Attempt to restart a calibration from a previous state saved in `workdir`,
+            defaults to the current working directory.
             If no previous state is available, start from 0
 
             Returns
@@ -199,7 +267,7 @@ class EvaluationOptions(BaseModel):
             int iteration to start calibration at
         """
         try:
-            last_iteration, best_params, best_score = self.read_param_log_file()
+            last_iteration, best_params, best_score = self.read_param_log_file(workdir)
             self._best_params_iteration = str(best_params)
             self._best_score = best_score
             start_iteration = last_iteration + 1
@@ -212,6 +280,56 @@ class EvaluationOptions(BaseModel):
 
         return start_iteration
 
+class ExecutionOptions(BaseModel):
+    """
+        A data class holding model execution parameters
+    """
+    #Optional wall clock limit, in seconds, of a single model run
+    timeout: Optional[PositiveFloat]
+    #Optional adaptive limit, a run is timed out after `timeout_factor` times the median duration of previous runs
+    #`timeout` (if set) still bounds the adaptive limit
+    timeout_factor: Optional[PositiveFloat]
+    #Number of completed runs required before the adaptive limit is used
+    timeout_samples: PositiveInt = 3
+    """
+        Policy applied to a run that exceeds its time limit
+        abort:   raise an error, stopping the calibration
+        retry:   re-run the model up to `retries` times, then abort
+        penalty: skip evaluation and assign the `penalty` score to the iteration
+    """
+    on_timeout: Literal['abort', 'retry', 'penalty'] = 'abort'
+    retries: PosInt = 1
+    #Score assigned to timed out runs with the penalty policy, defaults to the worst possible score
+    penalty: Optional[float]
+
+    def timeout_for(self, durations: Sequence[float]) -> float | None:
+        """The time limit of the next model run
+
+        Args:
+            durations (Sequence[float]): wall clock durations, in seconds, of previously completed runs
+
+        Returns:
+            float | None: time limit in seconds, or None if runs are not limited
+        """
+        timeout = self.timeout
+        if self.timeout_factor is not None and len(durations) >= self.timeout_samples:
+            adaptive = self.timeout_factor * median(durations)
+            timeout = adaptive if timeout is None else min(timeout, adaptive)
+        return timeout
+
+    def penalty_score(self, target: Union[Literal['min'], Literal['max'], float]) -> float:
+        """The score assigned to a timed out run
+
+        Args:
+            target: the evaluation target of the objective function
+
+        Returns:
+            float: configured `penalty`, otherwise the worst score possible for `target`
+        """
+        if self.penalty is not None:
+            return self.penalty
+        return float('-inf') if target == 'max' else float('inf')
+
 class ModelExec(BaseModel, Configurable):
     """
         The data class for a given model, which must also be Configurable
@@ -220,6 +338,7 @@ class ModelExec(BaseModel, Configurable):
     args: Optional[str]
     workdir: DirectoryPath = Path("./") #FIXME test the various workdirs
     eval_params: Optional[EvaluationOptions] = Field(default_factory=EvaluationOptions)
+    exec_params: Optional[ExecutionOptions] = Field(default_factory=ExecutionOptions)
     plugins: List[PyObjectOrModule] = Field(default_factory=list)
     plugin_settings: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
@@ -1,21 +1,22 @@
 from __future__ import annotations
 
 from pydantic import FilePath, root_validator, BaseModel, Field
-from typing import Optional, Sequence, Mapping, Union
+from typing import Dict, List, Optional, Sequence, Mapping, Tuple, Union, TYPE_CHECKING
 try: #to get literal in python 3.7, it was added to typing in 3.8
     from typing import Literal
 except ImportError:
     from typing_extensions import Literal
 from pathlib import Path
 import logging
+import os
 import warnings
 #supress geopandas debug logs
 logging.disable(logging.DEBUG)
 import json
 json.encoder.FLOAT_REPR = str #lambda x: format(x, '%.09f')
-import geopandas as gpd
 import pandas as pd
 import shutil
+import yaml
 from enum import Enum
 import re
 from ngen.config.realization import NgenRealization, Realization, CatchmentRealization
@@ -24,11 +25,20 @@ from .model import ModelExec, PosInt, Configurable
 from .parameter import Parameter, Parameters
 from .calibration_cathment import CalibrationCatchment, AdjustableCatchment
 from .calibration_set import CalibrationSet, UniformCalibrationSet
+from .utils import scan_files
 #HyFeatures components
-from hypy.hydrolocation import NWISLocation
 from hypy.nexus import Nexus
 from hypy.catchment import Catchment
 
+if TYPE_CHECKING:
+    from datetime import datetime
+    import geopandas as gpd
+    from .calibration import Domain
+
+#model name of t-route parameters in `params`, calibrated by the uniform strategy
+ROUTING = "t-route"
+#t-route configuration written with the calibrated routing parameters of each iteration
+ROUTING_CONFIG = "troute_config.yaml"
 
 class NgenStrategy(str, Enum):
     """
@@ -66,6 +76,100 @@ def _map_params_to_realization(params: Mapping[str, Parameters], realization: Re
     else:
         return _params_as_df(params, module.model_name)
 
+def _set_model_params(realization: Realization, params: pd.DataFrame, column: str) -> None:
+    """Set the `model_params` of `realization`'s formulation from the `column` values of `params`
+
+    Args:
+        realization (Realization): global or catchment realization to update
+        params (pd.DataFrame): parameter frame with `param` and `model` columns
+        column (str): column of `params` holding the values to set
+    """
+    module = realization.formulations[0].params
+    groups = params.set_index('param').groupby('model')
+    if isinstance(module, MultiBMI):
+        for m in module.modules:
+            name = m.params.model_name
+            if name in groups.groups:
+                p = groups.get_group(name)
+                m.params.model_params = p[column].to_dict()
+    else:
+        p = groups.get_group(module.model_name)
+        module.model_params = p[column].to_dict()
+
+def _write_routing_config(config: Path, params: pd.DataFrame | None, column: str, path: Path, scale: float = 1.0) -> Path:
+    """Write a copy of the t-route `config` to `path` with the `ROUTING` parameters of `params` set to their `column` values
+
+    Routing parameters are named by their dotted key in the t-route configuration,
+    e.g. `compute_parameters.data_assimilation_parameters.qc_threshold`
+
+    Args:
+        scale (float, optional): fraction of the configured routing time steps (`nts`) to route, for
+                                 simulations of a leading part of the configured simulation period
+
+    Returns:
+        Path: the written configuration
+    """
+    with open(config) as fp:
+        data = yaml.safe_load(fp)
+    if params is not None:
+        for name, value in params.loc[params['model'] == ROUTING].set_index('param')[column].items():
+            *sections, key = name.split('.')
+            section = data
+            for s in sections:
+                section = section.setdefault(s, {})
+            section[key] = float(value)
+    forcing = data.get('compute_parameters', {}).get('forcing_parameters', {})
+    if scale != 1.0 and 'nts' in forcing:
+        forcing['nts'] = max(1, round(forcing['nts'] * scale))
+    with open(path, 'w') as fp:
+        yaml.safe_dump(data, fp, sort_keys=False)
+    return path
+
+def _ngen_args(catchments: Path, nexus: Path, realization: Path, catchment_ids: str = "all", nexus_ids: str = "all") -> str:
+    """ngen's positional arguments simulating the `catchment_ids` and `nexus_ids` subsets, comma separated or "all" """
+    return f'{catchments.resolve()} "{catchment_ids}" {nexus.resolve()} "{nexus_ids}" {realization.name}'
+
+def _forcing_index(path: Path, pattern: str, ids: Sequence[str]) -> dict[str, Path]:
+    """Resolve the forcing file of each catchment in `ids` with a single scan of `path`
+
+    A file belongs to catchment `id` if its name matches `pattern`, with `{{id}}` and `{{ID}}`
+    replaced by `id`, from the start of the name.  Rather than testing every file against every
+    catchment, each file is only tested against the catchment ids that appear in its name.
+    If several files match a catchment, the last one listed wins.
+
+    Args:
+        path (Path): forcing directory
+        pattern (str): forcing `file_pattern` regular expression
+        ids (Sequence[str]): catchment ids
+
+    Returns:
+        dict[str, Path]: resolved forcing file of each catchment with a matching file
+    """
+    names = [entry.name for entry in os.scandir(path)]
+    index = {}
+    if "{{id}}" not in pattern and "{{ID}}" not in pattern:
+        #every catchment shares the same forcing file
+        regex = re.compile(pattern)
+        matches = [n for n in names if regex.match(n)]
+        if matches:
+            f = (path/matches[-1]).resolve()
+            index = {id: f for id in ids}
+        return index
+
+    known = set(ids)
+    lengths = sorted({len(id) for id in known})
+    compiled = {}
+    for name in names:
+        #ids occurring as a substring of the file name
+        candidates = {name[i:i+n] for n in lengths for i in range(len(name) - n + 1)} & known
+        for id in candidates:
+            regex = compiled.get(id)
+            if regex is None:
+                regex = compiled[id] = re.compile(pattern.replace("{{id}}", id).replace("{{ID}}", id))
+            if regex.match(name):
+                index[id] = name
+    return {id: (path/name).resolve() for id, name in index.items()}
+
 
 class NgenBase(ModelExec):
     """
@@ -81,12 +185,18 @@ class NgenBase(ModelExec):
     # but we should probably take a closer look at this in the near future
     realization: FilePath
     hydrofabric: Optional[FilePath]
-    eval_feature: Optional[str]
+    #gaged waterbody (flowpath) id(s) to evaluate, defaults to every gaged waterbody in the hydrofabric
+    eval_feature: Optional[Union[str, List[str]]]
     catchments: Optional[FilePath]
     nexus: Optional[FilePath]
     crosswalk: Optional[FilePath]
     ngen_realization: Optional[NgenRealization]
     routing_output: Path = Path("flowveldepth_Ngen.csv")
+    #catchments to simulate and calibrate, defaults to every catchment of the hydrofabric
+    subset: Optional[List[str]]
+    #catchments simulated with fixed parameter values rather than calibrated (independent and uniform strategies)
+    #values are keyed by catchment id, then model name, then parameter name
+    frozen: Dict[str, Dict[str, Dict[str, float]]] = Field(default_factory=dict)
     #optional fields
     partitions: Optional[FilePath]
     parallel: Optional[PosInt]
@@ -94,6 +204,10 @@ class NgenBase(ModelExec):
     #dependent fields
     binary: str = 'ngen'
     args: Optional[str]
+    #command running t-route alone, given the t-route configuration as its last argument,
+    #e.g. `python -m nwm_routing -V4 -f`.  Iterations which only change `t-route` parameters then
+    #re-route the saved catchment outputs of the best iteration rather than re-running ngen
+    routing_binary: Optional[str]
 
     #private, not validated
     _catchments: Sequence[CalibrationCatchment] = []
@@ -101,6 +215,10 @@ class NgenBase(ModelExec):
     _nexus_hydro_fabric: gpd.GeoDataFrame
     _flowpath_hydro_fabric: gpd.GeoDataFrame
     _x_walk: pd.Series
+    #t-route configuration the calibrated routing configurations are derived from
+    _routing_config: Optional[Path] = None
+    #configured simulation window, once `set_simulation_window` has changed it
+    _full_window: Optional[Tuple[datetime, datetime]] = None
 
     class Config:
         """Override configuration for pydantic BaseModel
@@ -109,7 +227,12 @@ class NgenBase(ModelExec):
         use_enum_values = True
         smart_union = True
 
-    def __init__(self, **kwargs):
+    def __init__(self, domain: Domain | None = None, **kwargs):
+        """
+        Args:
+            domain (Domain, optional): a loaded domain whose hydrofabric, realization and observations
+                                       are reused rather than read from the configured files
+        """
         #Let pydantic work its magic
         super().__init__(**kwargs)
         #now we work ours
@@ -118,19 +241,16 @@ class NgenBase(ModelExec):
 
         self._register_default_ngen_plugins()
 
-        # Read the catchment hydrofabric data
-        if self.hydrofabric is not None:
-            if self._is_legacy_gpkg_hydrofabric(self.hydrofabric):
-                self._read_legacy_gpkg_hydrofabric()
-            else:
-                self._read_gpkg_hydrofabric()
+        if domain is None:
+            self._read_hydrofabric()
+            #Read the calibration specific info
+            with open(self.realization) as fp:
+                data = json.load(fp)
+            self.ngen_realization = NgenRealization(**data)
         else:
-            self._read_legacy_geojson_hydrofabric()
-
-        #Read the calibration specific info
-        with open(self.realization) as fp:
-            data = json.load(fp)
-        self.ngen_realization = NgenRealization(**data)
+            domain.share(self)
+        if self.subset is not None:
+            self._catchment_hydro_fabric = self._catchment_hydro_fabric.loc[self.subset]
 
     def _register_default_ngen_plugins(self):
         from .ngen_hooks.ngen_output import TrouteOutput
@@ -141,6 +261,16 @@ class NgenBase(ModelExec):
         # observations
         self._plugin_manager.register(UsgsObservations())
 
+    def _read_hydrofabric(self) -> None:
+        """Read the catchment hydrofabric data"""
+        if self.hydrofabric is not None:
+            if self._is_legacy_gpkg_hydrofabric(self.hydrofabric):
+                self._read_legacy_gpkg_hydrofabric()
+            else:
+                self._read_gpkg_hydrofabric()
+        else:
+            self._read_legacy_geojson_hydrofabric()
+
     @staticmethod
     def _is_legacy_gpkg_hydrofabric(hydrofabric: Path) -> bool:
         """Return True if legacy (<=v2.1) gpkg hydrofabric."""
@@ -157,6 +287,7 @@ class NgenBase(ModelExec):
         return value is not None
 
     def _read_gpkg_hydrofabric(self) -> None:
+        import geopandas as gpd
         # Read geopackage hydrofabric
         self._catchment_hydro_fabric = gpd.read_file(self.hydrofabric, layer='divides')
         self._catchment_hydro_fabric.set_index('divide_id', inplace=True)
@@ -175,6 +306,7 @@ class NgenBase(ModelExec):
         self._x_walk = pd.Series( attributes[ ~ attributes['rl_gages'].isna() ]['rl_gages'] )
 
     def _read_legacy_gpkg_hydrofabric(self) -> None:
+        import geopandas as gpd
         # Read geopackage hydrofabric
         self._catchment_hydro_fabric = gpd.read_file(self.hydrofabric, layer='divides')
         self._catchment_hydro_fabric.set_index('divide_id', inplace=True)
@@ -193,6 +325,7 @@ class NgenBase(ModelExec):
         self._x_walk = pd.Series( attributes[ ~ attributes['rl_gages'].isna() ]['rl_gages'] )
 
     def _read_legacy_geojson_hydrofabric(self) -> None:
+        import geopandas as gpd
         # Legacy geojson support
         assert self.catchments is not None, "missing geojson catchments file"
         assert self.nexus is not None, "missing geojson nexus file"
@@ -215,6 +348,106 @@ class NgenBase(ModelExec):
                     if gage != "":
                         self._x_walk[id] = gage
 
+    def _catchment_realizations(self, ids: Sequence[str]) -> dict[str, CatchmentRealization]:
+        """Copy the global configuration into a catchment configuration for each catchment in `ids`
+
+        Args:
+            ids (Sequence[str]): catchment ids
+
+        Returns:
+            dict[str, CatchmentRealization]: catchment configuration of each catchment
+        """
+        catchment_realizations = {}
+        g_conf = self.ngen_realization.global_config.copy(deep=True).dict(by_alias=True)
+        #Need to fix the forcing definition or ngen will not work
+        #for individual catchment configs, it doesn't apply pattern resolution
+        #and will read the directory `path` key as the file key and will segfault
+        forcing = self.ngen_realization.global_config.forcing
+        forcing_files = None
+        if forcing.file_pattern is not None:
+            #relative forcing paths are relative to the model workdir, not the current working directory
+            forcing_files = _forcing_index(self.workdir/forcing.path, forcing.file_pattern, ids)
+        missing = []
+        for id in ids:
+            catchment_realizations[id] = CatchmentRealization(**g_conf)
+            catchment_realizations[id].forcing.file_pattern = None
+            # case when we have a pattern
+            if forcing_files is not None:
+                try:
+                    catchment_realizations[id].forcing.path = forcing_files[id]
+                except KeyError:
+                    missing.append(id)
+        if missing:
+            shown = ", ".join(missing[:5]) + (", ..." if len(missing) > 5 else "")
+            warnings.warn(f"No forcing file in {forcing.path} matches pattern {forcing.file_pattern} for {len(missing)} catchments: {shown}")
+        return catchment_realizations
+
+    def _freeze(self, catchment_realizations: Mapping[str, CatchmentRealization]) -> None:
+        """Set the `frozen` parameter values of each frozen catchment in `catchment_realizations`
+
+        Raises:
+            RuntimeError: a frozen catchment is not a simulated catchment
+        """
+        for id, models in self.frozen.items():
+            if id not in catchment_realizations:
+                raise(RuntimeError(f"Frozen catchment {id} is not simulated"))
+            params = pd.DataFrame(
+                [(model, param, value) for model, values in models.items() for param, value in values.items()],
+                columns=['model', 'param', 'value']
+            )
+            _set_model_params(catchment_realizations[id], params, 'value')
+
+    def _catchment_gages(self) -> pd.DataFrame:
+        """Resolve the downstream nexus and crosswalked gage of every catchment
+
+        Catchment -> toid -> nexus -> gage resolution is done with vectorized lookups
+        rather than per catchment lookups into the hydrofabric.
+
+        Raises:
+            RuntimeError: a catchment's toid is not a nexus of the hydrofabric
+
+        Returns:
+            pd.DataFrame: indexed by catchment id, with `toid` and `gage` columns, `gage` is NaN for ungaged catchments
+        """
+        toid = self._catchment_hydro_fabric['toid']
+        missing = ~toid.isin(self._nexus_hydro_fabric.index)
+        if missing.any():
+            raise(RuntimeError(f"No suitable nexus found for catchment {toid.index[missing][0]}"))
+        ids = self._catchment_hydro_fabric.index.to_series()
+        x_walk = self._x_walk[ ~self._x_walk.index.duplicated() ]
+        #the crosswalk is keyed by the catchment's waterbody id, or the catchment id itself
+        gage = ids.str.replace('cat', 'wb', regex=False).map(x_walk).fillna(ids.map(x_walk))
+        return pd.DataFrame({'toid': toid, 'gage': gage})
+
+    def _eval_gages(self, gages: pd.DataFrame) -> pd.DataFrame:
+        """The gaged catchments to evaluate
+
+        If `eval_feature` is set, only the gaged catchments whose waterbody is an `eval_feature`,
+        or whose nexus receives an `eval_feature` flowpath, are evaluated.
+
+        Args:
+            gages (pd.DataFrame): resolved catchment gages, see `_catchment_gages`
+
+        Raises:
+            RuntimeError: no gaged catchment to evaluate
+
+        Returns:
+            pd.DataFrame: the rows of `gages` to evaluate
+        """
+        gaged = gages[ gages['gage'].notna() ]
+        if self.eval_feature:
+            features = [self.eval_feature] if isinstance(self.eval_feature, str) else self.eval_feature
+            #toid index, the first flowpath flowing into each nexus
+            flowpaths = self._flowpath_hydro_fabric['toid']
+            by_toid = pd.Series(flowpaths.index, index=flowpaths.values)
+            by_toid = by_toid[ ~by_toid.index.duplicated() ]
+            own = gaged.index.str.replace('cat', 'wb', regex=False).isin(features)
+            gaged = gaged[ own | gaged['toid'].map(by_toid).isin(features) ]
+            gaged = gaged[ ~gaged['toid'].duplicated() ]
+        if gaged.empty:
+            raise RuntimeError( "No gaged nexus found in the hydrofabric, check the crosswalk and the eval_feature key.")
+        return gaged
+
     @property
     def config_file(self) -> Path:
         """Path to the configuration file for this calibration
@@ -235,6 +468,60 @@ class NgenBase(ModelExec):
         """
         return self._catchments
 
+    @property
+    def simulation_window(self) -> tuple[datetime, datetime]:
+        """The (start_time, end_time) simulated by ngen, as written to the realization config
+
+        Returns:
+            tuple[datetime, datetime]: inclusive simulation time range
+        """
+        time = self.ngen_realization.time
+        return (time.start_time, time.end_time)
+
+    def set_simulation_window(self, start_time: datetime, end_time: datetime) -> None:
+        """Change the simulation time range written by subsequent calls to `update_config`
+
+        The number of time steps routed by t-route, if the realization has a routing block, is scaled to the
+        new time range, which must start at the configured start time.
+
+        Args:
+            start_time (datetime): simulation start time
+            end_time (datetime): simulation end time
+
+        Raises:
+            ValueError: the realization has a routing block and `start_time` is not the configured start time
+        """
+        if self._full_window is None:
+            self._full_window = self.simulation_window
+        if self.ngen_realization.routing is not None and start_time != self._full_window[0]:
+            raise ValueError(f"t-route simulations must start at the configured start time {self._full_window[0]}, got {start_time}")
+        self.ngen_realization.time.start_time = start_time
+        self.ngen_realization.time.end_time = end_time
+
+    @property
+    def routing_cmd(self) -> str | None:
+        """Command routing the catchment outputs in the workdir with t-route alone
+
+        Returns:
+            str | None: None if `routing_binary` is not configured or the realization has no routing
+        """
+        routing = self.ngen_realization.routing
+        if self.routing_binary is None or routing is None:
+            return None
+        return f"{self.routing_binary} {routing.config}"
+
+    def partial_run(self, changed: Sequence[str]) -> tuple[str, set[str]] | None:
+        """Command re-simulating only the `changed` catchments, supported by the independent strategy
+
+        Args:
+            changed (Sequence[str]): catchments whose parameters changed
+
+        Returns:
+            tuple[str, set[str]] | None: the command and the ids of the catchments and nexus it simulates,
+                                         None if the whole domain has to be simulated
+        """
+        return None
+
     @root_validator
     def set_defaults(cls, values: dict):
         """Compose default values
@@ -260,13 +547,16 @@ class NgenBase(ModelExec):
         nexus = values.get('nexus')
         realization = values.get('realization')
         hydrofabric = values.get('hydrofabric')
+        subset = values.get('subset')
 
         custom_args = False
         if args is None:
+            #only simulate the subset of catchments, if given
+            ids = "all" if subset is None else ",".join(subset)
             if hydrofabric is not None:
-                args = f'{hydrofabric.resolve()} "all" {hydrofabric.resolve()} "all" {realization.name}'
+                args = _ngen_args(hydrofabric, hydrofabric, realization, ids)
             else:
-                args = f'{catchments.resolve()} "all" {nexus.resolve()} "all" {realization.name}'
+                args = _ngen_args(catchments, nexus, realization, ids)
             values['args'] = args
         else:
             custom_args = True
@@ -368,28 +658,36 @@ class NgenBase(ModelExec):
             id (str): _description_
         """
 
+        routed = id is None and (params['model'] == ROUTING).any()
         if id is None: #Update global
-            module = self.ngen_realization.global_config.formulations[0].params
+            realization = self.ngen_realization.global_config
         else: #update specific catchment
-            module = self.ngen_realization.catchments[id].formulations[0].params
-
-        groups = params.set_index('param').groupby('model')
-        if isinstance(module, MultiBMI):
-            for m in module.modules:
-                name = m.params.model_name
-                if name in groups.groups:
-                    p = groups.get_group(name)
-                    m.params.model_params = p[str(i)].to_dict()
-        else:
-            p = groups.get_group(module.model_name)
-            module.model_params = p[str(i)].to_dict()
+            realization = self.ngen_realization.catchments[id]
+        if routed or (self._full_window is not None and self.ngen_realization.routing is not None):
+            self._update_routing_config(params if routed else None, str(i), Path(path))
+        _set_model_params(realization, params, str(i))
         with open(path/self.realization.name, 'w') as fp:
                 fp.write( self.ngen_realization.json(by_alias=True, exclude_none=True, indent=4))
         # Cleanup any t-route parquet files between runs
         # TODO this may not be _the_ best place to do this, but for now,
         # it works, so here it be...
-        for file in Path(path).glob("*NEXOUT.parquet"):
-            file.unlink()
+        for name in scan_files(Path(path), {"nexout": "*NEXOUT.parquet"})["nexout"]:
+            (Path(path)/name).unlink()
+
+    def _update_routing_config(self, params: pd.DataFrame | None, column: str, path: Path) -> None:
+        """Route subsequent runs with a t-route configuration, written to `path`, using the `ROUTING` parameters of `params`
+        over the simulation window"""
+        routing = self.ngen_realization.routing
+        if routing is None:
+            raise RuntimeError(f"`{ROUTING}` parameters require a routing block in the ngen realization")
+        if self._routing_config is None:
+            self._routing_config = routing.config
+        scale = 1.0
+        if self._full_window is not None:
+            start, end = self.simulation_window
+            full_start, full_end = self._full_window
+            scale = (end - start) / (full_end - full_start)
+        routing.config = _write_routing_config(self._routing_config, params, column, path/ROUTING_CONFIG, scale)
 
 class NgenExplicit(NgenBase):
 
@@ -398,6 +696,8 @@ class NgenExplicit(NgenBase):
     def __init__(self, **kwargs):
         #Let pydantic work its magic
         super().__init__(**kwargs)
+        # hydro locations import the nwis client, only import them when needed
+        from hypy.hydrolocation import NWISLocation
         #now we work ours
         start_t = self.ngen_realization.time.start_time
         end_t = self.ngen_realization.time.end_time
@@ -448,84 +748,57 @@ class NgenIndependent(NgenBase):
     # TODO Error if not routing block in ngen_realization
     strategy: Literal[NgenStrategy.independent] = NgenStrategy.independent
     params: Mapping[str, Parameters] #required in this case...
+    #only re-simulate the catchments perturbed by an iteration, reusing the outputs of the
+    #other catchments saved by `NgenSaveOutput` for the best iteration
+    incremental: bool = False
 
     def __init__(self, **kwargs):
         #Let pydantic work its magic
         super().__init__(**kwargs)
+        # hydro locations import the nwis client, only import them when needed
+        from hypy.hydrolocation import NWISLocation
         # FIXME cannot strip all global params cause things like sloth depend on them
         # but the global params may have defaults in place that are not the same as the requested
         # calibration params.  This shouldn't be an issue since each catchment overrides the global config
         # and it won't actually be used, but the global config definition may not be correct.
         #self._strip_global_params()
+        if ROUTING in self.params:
+            raise RuntimeError(f"`{ROUTING}` parameters are only supported by the uniform strategy")
         #now we work ours
         start_t = self.ngen_realization.time.start_time
         end_t = self.ngen_realization.time.end_time
         #Setup each calibration catchment
         catchments = []
         eval_nexus = []
-        catchment_realizations = {}
-        g_conf = self.ngen_realization.global_config.copy(deep=True).dict(by_alias=True)
-        for id in self._catchment_hydro_fabric.index:
-            #Copy the global configuration into each catchment
-            catchment_realizations[id] = CatchmentRealization(**g_conf)
-            #Need to fix the forcing definition or ngen will not work
-            #for individual catchment configs, it doesn't apply pattern resolution
-            #and will read the directory `path` key as the file key and will segfault
-            path = catchment_realizations[id].forcing.path
-            pattern = catchment_realizations[id].forcing.file_pattern
-            catchment_realizations[id].forcing.file_pattern = None
-            # case when we have a pattern
-            if pattern is not None:
-                pattern = pattern.replace("{{id}}", id)
-                pattern = re.compile(pattern.replace("{{ID}}", id))
-                for f in path.iterdir():
-                    if pattern.match(f.name):
-                        catchment_realizations[id].forcing.path = f.resolve()
-
+        #Copy the global configuration into each catchment
+        catchment_realizations = self._catchment_realizations(list(self._catchment_hydro_fabric.index))
+        self._freeze(catchment_realizations)
         self.ngen_realization.catchments = catchment_realizations
 
-        for id, catchment in self.ngen_realization.catchments.items():#data['catchments'].items():
-            try:
-                fabric = self._catchment_hydro_fabric.loc[id]
-            except KeyError: # This probaly isn't strictly required since we built these from the index
-                continue
-            try:
-                nexus_data = self._nexus_hydro_fabric.loc[fabric['toid']]
-            except KeyError:
-                raise(RuntimeError(f"No suitable nexus found for catchment {id}"))
-            nwis = None
-            try:
-                nwis = self._x_walk.loc[id.replace('cat', 'wb')]
-            except KeyError:
-                try:
-                    nwis = self._x_walk.loc[id]
-                except KeyError:
-                    nwis = None
-            if nwis is not None:
+        gages = self._catchment_gages()
+        eval_ids = set(self._eval_gages(gages).index)
+        nexus_geometry = self._nexus_hydro_fabric.geometry
+        #every catchment is a copy of the global configuration, so they share a parameter space
+        params = _map_params_to_realization(self.params, self.ngen_realization.global_config)
+        for id, toid, gage in gages.itertuples():
+            if pd.notna(gage):
                 #establish the hydro location for the observation nexus associated with this catchment
-                location = NWISLocation(nwis, nexus_data.name, nexus_data.geometry)
-                nexus = Nexus(nexus_data.name, location, (), Catchment(id, {}))
-                eval_nexus.append( nexus ) # FIXME why did I make this a tuple???
+                location = NWISLocation(gage, toid, nexus_geometry.loc[toid])
             else:
                 #in this case, we don't care if all nexus are observable, just need one downstream
                 #FIXME use the graph to work backwards from an observable nexus to all upstream catchments
                 #and create independent "sets"
-                nexus = Nexus(nexus_data.name, None, (), Catchment(id, {}))
+                location = None
+            nexus = Nexus(toid, location, (), Catchment(id, {}))
+            if id in eval_ids:
+                eval_nexus.append( nexus )
+            if id in self.frozen:
+                #simulated, but not calibrated
+                continue
             #FIXME pick up params per catchmment somehow???
-            params = _map_params_to_realization(self.params, catchment)
-            catchments.append(AdjustableCatchment(self.workdir, id, nexus, params))
+            catchments.append(AdjustableCatchment(self.workdir, id, nexus, params.copy()))
 
-        if self.eval_feature:
-            for n in eval_nexus:
-                wb = self._flowpath_hydro_fabric[ self._flowpath_hydro_fabric['toid'] == n.id ]
-                key = wb.iloc[0].name
-                if key == self.eval_feature:
-                    eval_nexus = [n]
-                    break
-
-        if len(eval_nexus) != 1:
-            raise RuntimeError( "Currently only a single nexus in the hydrfabric can be gaged, set the eval_feature key to pick one.")
-        self._catchments.append(CalibrationSet(catchments, eval_nexus[0], self._plugin_manager.hook, start_t, end_t, self.eval_params))
+        self._catchments.append(CalibrationSet(catchments, eval_nexus, self._plugin_manager.hook, start_t, end_t, self.eval_params))
 
     def _strip_global_params(self) -> None:
         module = self.ngen_realization.global_config.formulations[0].params
@@ -536,6 +809,34 @@ class NgenIndependent(NgenBase):
             module.model_params = None
 
 
+    def partial_run(self, changed: Sequence[str]) -> tuple[str, set[str]] | None:
+        """Command re-simulating only the `changed` catchments
+
+        Each nexus output is either entirely reused or entirely re-simulated, so catchments flowing
+        to the same nexus as a changed catchment are re-simulated as well.  Runs with custom `args`
+        or domain `partitions` always simulate the whole domain.
+
+        Args:
+            changed (Sequence[str]): catchments whose parameters changed
+
+        Returns:
+            tuple[str, set[str]] | None: the command and the ids of the catchments and nexus it simulates,
+                                         None if the whole domain has to be simulated
+        """
+        if not self.incremental or self.partitions is not None or not changed:
+            return None
+        catchments, nexus = (self.hydrofabric, self.hydrofabric) if self.hydrofabric is not None else (self.catchments, self.nexus)
+        ids = "all" if self.subset is None else ",".join(self.subset)
+        if self.args != _ngen_args(catchments, nexus, self.realization, ids):
+            return None
+        toid = self._catchment_hydro_fabric['toid']
+        nexus_ids = set(toid.loc[list(changed)])
+        catchment_ids = list(toid.index[toid.isin(nexus_ids)])
+        if len(catchment_ids) == len(toid):
+            return None
+        args = _ngen_args(catchments, nexus, self.realization, ",".join(catchment_ids), ",".join(sorted(nexus_ids)))
+        return f"{self.binary} {args}", set(catchment_ids) | nexus_ids
+
 class NgenUniform(NgenBase):
     """
         Uses a global ngen configuration and permutes just this global parameter space
@@ -548,41 +849,29 @@ class NgenUniform(NgenBase):
     def __init__(self, **kwargs):
         #Let pydantic work its magic
         super().__init__(**kwargs)
+        # hydro locations import the nwis client, only import them when needed
+        from hypy.hydrolocation import NWISLocation
         #now we work ours
         start_t = self.ngen_realization.time.start_time
         end_t = self.ngen_realization.time.end_time
         eval_nexus = []
 
-        for id, toid in self._catchment_hydro_fabric['toid'].items():
-            assert isinstance(id, str), f"id expected to be str subtype. is type: {type(id)}"
-            #look for an observable nexus
-            nexus_data = self._nexus_hydro_fabric.loc[toid]
-            nwis = None
-            try:
-                nwis = self._x_walk.loc[id.replace('cat', 'wb')]
-            except KeyError:
-                try:
-                    nwis = self._x_walk.loc[id]
-                except KeyError:
-                    #not an observable nexus, try the next one
-                    continue
-                #establish the hydro location for the observation nexus associated with this catchment
-            location = NWISLocation(nwis, nexus_data.name, nexus_data.geometry)
-            nexus = Nexus(nexus_data.name, location, (), Catchment(id, {}))
+        if self.frozen:
+            #frozen catchments override the calibrated global configuration
+            frozen = self._catchment_realizations(list(self.frozen))
+            self._freeze(frozen)
+            self.ngen_realization.catchments = {**(self.ngen_realization.catchments or {}), **frozen}
+
+        nexus_geometry = self._nexus_hydro_fabric.geometry
+        #look for observable nexus
+        for id, toid, gage in self._eval_gages(self._catchment_gages()).itertuples():
+            #establish the hydro location for the observation nexus associated with this catchment
+            location = NWISLocation(gage, toid, nexus_geometry.loc[toid])
+            nexus = Nexus(toid, location, (), Catchment(id, {}))
             eval_nexus.append( nexus )
 
-        if self.eval_feature:
-            for n in eval_nexus:
-                wb = self._flowpath_hydro_fabric[ self._flowpath_hydro_fabric['toid'] == n.id ]
-                key = wb.iloc[0].name
-                if key == self.eval_feature:
-                    eval_nexus = [n]
-                    break
-
-        if len(eval_nexus) != 1:
-            raise RuntimeError( "Currently only a single nexus in the hydrfabric can be gaged, set the eval_feature key to pick one.")
         params = _params_as_df(self.params)
-        self._catchments.append(UniformCalibrationSet(eval_nexus=eval_nexus[0], hooks=self._plugin_manager.hook, start_time=start_t, end_time=end_t, eval_params=self.eval_params, params=params))
+        self._catchments.append(UniformCalibrationSet(eval_nexus=eval_nexus, hooks=self._plugin_manager.hook, start_time=start_t, end_time=end_t, eval_params=self.eval_params, params=params))
 
 class Ngen(BaseModel, Configurable, smart_union=True):
     __root__: Union[NgenExplicit, NgenIndependent, NgenUniform] = Field(discriminator="strategy")
@@ -595,6 +884,20 @@ class Ngen(BaseModel, Configurable, smart_union=True):
     def update_config(self, *args, **kwargs):
         return self.__root__.update_config(*args, **kwargs)
 
+    @property
+    def simulation_window(self) -> tuple[datetime, datetime]:
+        return self.__root__.simulation_window
+
+    def set_simulation_window(self, start_time: datetime, end_time: datetime) -> None:
+        self.__root__.set_simulation_window(start_time, end_time)
+
+    @property
+    def routing_cmd(self) -> str | None:
+        return self.__root__.routing_cmd
+
+    def partial_run(self, changed: Sequence[str]) -> tuple[str, set[str]] | None:
+        return self.__root__.partial_run(changed)
+
     def unwrap(self) -> NgenBase:
         """convenience method that returns the underlying __root__ instance"""
         return self.__root__
@@ -608,10 +911,10 @@ class Ngen(BaseModel, Configurable, smart_union=True):
     def strategy(self):
         return self.__root__.strategy
 
-    def restart(self) -> int:
+    def restart(self, workdir: Path | None = None) -> int:
         starts = []
         for catchment in self.adjustables:
-            starts.append(catchment.restart())
+            starts.append(catchment.restart(workdir))
         if starts and all( x == starts[0] for x in starts):
             #if everyone agress on the iteration...
             return starts[0]
@@ -632,3 +935,7 @@ class Ngen(BaseModel, Configurable, smart_union=True):
     @property
     def best_params(self):
         return self.__root__.eval_params.best_params
+
+    @property
+    def exec_params(self):
+        return self.__root__.exec_params
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import datetime
+import shutil
 import typing
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import pandas as pd
+from pydantic import BaseModel, PositiveInt
 from ngen.cal import hookimpl
+from ngen.cal.utils import move_files, scan_files
 
 if TYPE_CHECKING:
+    from typing import Sequence
     from ngen.cal.meta import JobMeta
-    from ngen.cal.model import ModelExec
+    from ngen.cal.model import EvaluationOptions, ModelExec
     from ngen.config.realization import NgenRealization
 
 
@@ -23,6 +27,8 @@ class TrouteOutput:
     def __init__(self, filepath: Path) -> None:
         self._output_file = filepath
         self._ngen_realization: NgenRealization | None = None
+        # parsed output of each output file, keyed by the file's path, see `_reader`
+        self._parsed: dict[Path, tuple[tuple[int, int, int], _NgenCalModelOutputFn]] = {}
 
     @hookimpl
     def ngen_cal_model_configure(self, config: ModelExec) -> None:
@@ -36,33 +42,20 @@ class TrouteOutput:
     # Try external provided output hooks, if those fail, try this one
     # this will only execute if all other hooks return None (or they don't exist)
     @hookimpl(specname="ngen_cal_model_output", trylast=True)
-    def get_output(self, id: str) -> pd.Series | None:
+    # NOTE: pluggy does not pass arguments with defaults to hook implementations, `workdir` must not have one
+    def get_output(self, id: str, workdir: Path | None) -> pd.Series | None:
         assert (
             self._ngen_realization is not None
         ), "ngen realization required; ensure `ngen_cal_model_configure` was called and the plugin was properly configured"
 
-        if not self._output_file.exists():
-            print(
-                f"{self._output_file} not found. Current working directory is {Path.cwd()!s}"
-            )
+        # resolve relative to the model's workdir rather than the current working directory
+        output_file = self._output_file if workdir is None else workdir / self._output_file
+        if not output_file.exists():
+            print(f"{output_file} not found.")
             print("Setting output to None")
             return None
 
-        filetype = self._output_file.suffix.lower()
-        if filetype == ".csv":
-            fn = self._factory_handler_csv(self._output_file)
-        # TODO: fix. dont know if this format still works
-        # elif filetype == ".hdf5":
-        #     fn = _model_output_legacy_hdf5(self._output_file)
-        elif filetype == ".nc":
-            fn = _stream_output_netcdf_v1(self._output_file)
-        elif filetype == ".parquet":
-            fn = _stream_output_parquet_v1(self._output_file)
-        else:
-            raise RuntimeError(
-                f"unsupported t-route output filetype: {self._output_file.suffix}"
-            )
-
+        fn = self._reader(output_file)
         ds = fn(id)
         ds.name = "sim_flow"
 
@@ -78,6 +71,40 @@ class TrouteOutput:
         ds = ds.resample("1h").first()
         return ds
 
+    @hookimpl
+    def ngen_cal_model_iteration_finish(self, iteration: int, info: JobMeta) -> None:
+        # the iteration's output is no longer evaluated, release it
+        self._parsed.pop(info.run_dir / self._output_file, None)
+
+    def _reader(self, output_file: Path) -> _NgenCalModelOutputFn:
+        """Parse `output_file`, reusing the parsed output until the file changes.
+
+        Evaluating several features, e.g. the gages of a multi-gage calibration set,
+        then only parses the routing output once per model run.
+        """
+        stat = output_file.stat()
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._parsed.get(output_file)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        filetype = output_file.suffix.lower()
+        if filetype == ".csv":
+            fn = self._factory_handler_csv(output_file)
+        # TODO: fix. dont know if this format still works
+        # elif filetype == ".hdf5":
+        #     fn = _model_output_legacy_hdf5(output_file)
+        elif filetype == ".nc":
+            fn = _stream_output_netcdf_v1(output_file)
+        elif filetype == ".parquet":
+            fn = _stream_output_parquet_v1(output_file)
+        else:
+            raise RuntimeError(
+                f"unsupported t-route output filetype: {output_file.suffix}"
+            )
+        self._parsed[output_file] = (key, fn)
+        return fn
+
     def _factory_handler_csv(self, filepath: Path) -> _NgenCalModelOutputFn:
         with filepath.open() as fp:
             header = fp.readline().strip()
@@ -95,32 +122,259 @@ class TrouteOutput:
         raise RuntimeError(f"could not parse t-route csv output file: {filepath!s}")
 
 
+class OutputRetention(BaseModel):
+    """
+    Iterations whose outputs `NgenSaveOutput` keeps, configured by the `ngen_save_output`
+    key of the model's `plugin_settings`.  An iteration is kept if any option keeps it, and
+    the best iteration is always kept.  Without any option, every iteration is kept.
+    """
+
+    # the iterations with the best `keep_best` scores
+    keep_best: Optional[PositiveInt]
+    # every `keep_every`th iteration
+    keep_every: Optional[PositiveInt]
+    # the latest `keep_last` iterations
+    keep_last: Optional[PositiveInt]
+
+    def retained(
+        self,
+        scores: typing.Mapping[int, float | None],
+        eval_params: EvaluationOptions | None,
+    ) -> set[int]:
+        """Iterations kept of the iterations with `scores`
+
+        Args:
+            scores (Mapping[int, float | None]): score of each saved iteration, None if not scored
+            eval_params (EvaluationOptions | None): ranks scores and knows the best iteration,
+                                                    scores are ranked lowest first if None
+        """
+        iterations = sorted(scores)
+        if self.keep_best is None and self.keep_every is None and self.keep_last is None:
+            return set(iterations)
+        keep = set()
+        if eval_params is not None:
+            keep.add(int(eval_params.best_params))
+        if self.keep_last is not None:
+            keep.update(iterations[-self.keep_last :])
+        if self.keep_every is not None:
+            keep.update(i for i in iterations if i % self.keep_every == 0)
+        if self.keep_best is not None:
+            rank = float if eval_params is None else eval_params.rank
+            scored = [i for i in iterations if scores[i] is not None]
+            keep.update(sorted(scored, key=lambda i: rank(scores[i]))[: self.keep_best])
+        return keep.intersection(iterations)
+
+
 class NgenSaveOutput:
     runoff_pattern = "cat-*.csv"
     lateral_pattern = "nex-*.csv"
     terminal_pattern = "tnx-*.csv"
     coastal_pattern = "cnx-*.csv"
     routing_output = "flowveldepth_Ngen.csv"
+    # key of the retention policy in the model's `plugin_settings`
+    settings = "ngen_save_output"
+
+    def __init__(self) -> None:
+        self._retention = OutputRetention()
+        self._eval_params: EvaluationOptions | None = None
+        # score of each iteration whose outputs are saved
+        self._saved: dict[int, float | None] = {}
+
+    @hookimpl
+    def ngen_cal_model_configure(self, config: ModelExec) -> None:
+        self._retention = OutputRetention(**config.plugin_settings.get(self.settings, {}))
+        self._eval_params = config.eval_params
+        # outputs saved before a restart are subject to the retention policy too
+        workdir = getattr(config, "workdir", None)
+        if workdir is not None:
+            scores = _read_objective_log(Path(workdir) / config.eval_params.objective_log_file)
+            self._saved = {i: scores.get(i) for i in self._saved_iterations(Path(workdir))}
 
     @hookimpl(trylast=True)
-    def ngen_cal_model_iteration_finish(self, iteration: int, info: JobMeta) -> None:
+    def ngen_cal_model_iteration_finish(
+        self, iteration: int, info: JobMeta, score: float | None
+    ) -> None:
+        """
+        After each iteration, save the outputs for possible future evaluation
+        and inspection if the retention policy keeps them, and delete the saved
+        outputs of iterations the policy no longer keeps.
         """
-        After each iteration, copy the old outputs for possible future
-        evaluation and inspection.
+        self._saved[iteration] = score
+        keep = self._retention.retained(self._saved, self._eval_params)
+        if iteration in keep:
+            self._save(iteration, info.run_dir, info.workdir)
+        else:
+            self._discard(info.run_dir)
+        for i in [i for i in self._saved if i not in keep]:
+            del self._saved[i]
+            if i != iteration:
+                self._remove(i, info.workdir)
+
+    @classmethod
+    def scan(cls, path: Path) -> dict[str, list[str]]:
+        """Names of the output files in `path`, from a single directory scan
+
+        Returns:
+            dict[str, list[str]]: file names keyed by output: `runoff`, `lateral`,
+                                  `terminal`, `coastal` and `routing`
         """
-        path = info.workdir
-        out_dir = path / f"output_{iteration}"
+        return scan_files(
+            path,
+            {
+                "runoff": cls.runoff_pattern,
+                "lateral": cls.lateral_pattern,
+                "terminal": cls.terminal_pattern,
+                "coastal": cls.coastal_pattern,
+                "routing": Path(cls.routing_output).name,
+            },
+        )
+
+    def _save(self, iteration: int, path: Path, workdir: Path) -> None:
+        """Move the outputs in `path` to `output_{iteration}` in `workdir`"""
+        out_dir = workdir / f"output_{iteration}"
         Path.mkdir(out_dir)
-        globs = []
-        globs.append(path.glob(self.runoff_pattern))
-        globs.append(path.glob(self.lateral_pattern))
-        globs.append(path.glob(self.terminal_pattern))
-        globs.append(path.glob(self.coastal_pattern))
-        for g in globs:
-            for f in g:
-                f.rename(out_dir / f.name)
-        rpath = path / Path(self.routing_output)
-        rpath.rename(out_dir / rpath.name)
+        move_files([n for names in self.scan(path).values() for n in names], path, out_dir)
+
+    def _discard(self, path: Path) -> None:
+        """Delete the outputs in `path` without saving them"""
+        for names in self.scan(path).values():
+            for name in names:
+                (path / name).unlink()
+
+    def _remove(self, iteration: int, workdir: Path) -> None:
+        """Delete the saved outputs of `iteration` from `workdir`"""
+        shutil.rmtree(workdir / f"output_{iteration}", ignore_errors=True)
+
+    def _saved_iterations(self, workdir: Path) -> list[int]:
+        """Iterations whose outputs are saved in `workdir`"""
+        return _iterations(workdir.glob("output_*"), "output_")
+
+    @staticmethod
+    def feature_id(name: str) -> str:
+        """Feature id of a saved output file, e.g. `nex-1` for `nex-1_output.csv`"""
+        return name.split(".")[0].split("_")[0]
+
+
+class NgenArchiveOutput(NgenSaveOutput):
+    """
+    Consolidate each iteration's catchment and nexus outputs into a single zstd compressed
+    parquet file, `output_archive/iteration={iteration}/outputs.parquet`, rather than saving
+    every output file.  The routing output is saved alongside it.
+
+    Rows hold the `id`, `variable`, `time` and `value` of each output, sorted by `id`, so
+    `read_archived_output` only reads the row groups of the requested features.
+    """
+
+    archive = "output_archive"
+    archive_file = "outputs.parquet"
+    row_group_size = 1_000_000
+
+    def _save(self, iteration: int, path: Path, workdir: Path) -> None:
+        """Archive the outputs in `path` to `output_archive/iteration={iteration}` in `workdir`"""
+        out_dir = self._archive_dir(iteration, workdir)
+        out_dir.mkdir(parents=True)
+        outputs = self.scan(path)
+        routing = outputs.pop("routing")
+        runoff = outputs.pop("runoff")
+        frames = [_read_catchment_output(path / n, self.feature_id(n)) for n in runoff]
+        nexus = [n for names in outputs.values() for n in names]
+        frames.extend(_read_nexus_output(path / n, self.feature_id(n)) for n in nexus)
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+            df["time"] = pd.to_datetime(df["time"])
+            df.sort_values("id", kind="stable", inplace=True)
+            df.to_parquet(
+                out_dir / self.archive_file,
+                compression="zstd",
+                index=False,
+                row_group_size=self.row_group_size,
+            )
+        for name in runoff + nexus:
+            (path / name).unlink()
+        move_files(routing, path, out_dir)
+
+    def _remove(self, iteration: int, workdir: Path) -> None:
+        shutil.rmtree(self._archive_dir(iteration, workdir), ignore_errors=True)
+
+    def _saved_iterations(self, workdir: Path) -> list[int]:
+        return _iterations((workdir / self.archive).glob("iteration=*"), "iteration=")
+
+    def _archive_dir(self, iteration: int, workdir: Path) -> Path:
+        return workdir / self.archive / f"iteration={iteration}"
+
+
+def _iterations(paths: typing.Iterable[Path], prefix: str) -> list[int]:
+    """Iterations of the saved output directories in `paths`, named `{prefix}{iteration}`"""
+    names = (p.name[len(prefix) :] for p in paths if p.is_dir())
+    return sorted(int(n) for n in names if n.isdigit())
+
+
+def _read_objective_log(filepath: Path) -> dict[int, float]:
+    """Score of each iteration in an objective log, lines of `iteration, score`"""
+    scores = {}
+    if not filepath.exists():
+        return scores
+    with filepath.open() as fp:
+        for line in fp:
+            iteration, _, score = line.partition(",")
+            try:
+                scores[int(iteration)] = float(score)
+            except ValueError:
+                continue
+    return scores
+
+
+def _read_nexus_output(filepath: Path, id: str) -> pd.DataFrame:
+    # headerless, row: "0, 2015-12-01 00:00:00, 0.0"
+    df = pd.read_csv(
+        filepath,
+        header=None,
+        names=["step", "time", "value"],
+        usecols=["time", "value"],
+        skipinitialspace=True,
+    )
+    df.insert(0, "variable", "flow")
+    df.insert(0, "id", id)
+    return df
+
+
+def _read_catchment_output(filepath: Path, id: str) -> pd.DataFrame:
+    # header: "Time Step,Time,RAIN_RATE,...,Q_OUT"
+    df = pd.read_csv(filepath, skipinitialspace=True)
+    index = [c for c in df.columns if c == "Time Step" or c.startswith("Unnamed")]
+    df = df.drop(columns=index).melt(id_vars="Time", var_name="variable")
+    df.rename(columns={"Time": "time"}, inplace=True)
+    df.insert(0, "id", id)
+    return df[["id", "variable", "time", "value"]]
+
+
+def read_archived_output(
+    workdir: Path, iteration: int | None = None, ids: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """Read outputs archived by `NgenArchiveOutput`
+
+    Args:
+        workdir (Path): calibration job workdir
+        iteration (int | None, optional): iteration to read. Defaults to every archived iteration.
+        ids (Sequence[str] | None, optional): feature ids to read. Defaults to every feature.
+
+    Returns:
+        pd.DataFrame: `id`, `variable`, `time`, `value` rows, with an `iteration` column when reading
+                      every iteration
+    """
+    archive = workdir / NgenArchiveOutput.archive
+    filters = None if ids is None else [("id", "in", list(ids))]
+    if iteration is not None:
+        return pd.read_parquet(archive / f"iteration={iteration}" / NgenArchiveOutput.archive_file, filters=filters)
+    # read each iteration's archive file, not the partitioned dataset, whose partitions also hold the routing output
+    frames = []
+    for path in archive.glob(f"iteration=*/{NgenArchiveOutput.archive_file}"):
+        df = pd.read_parquet(path, filters=filters)
+        df["iteration"] = int(path.parent.name.split("=", 1)[1])
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=["id", "variable", "time", "value", "iteration"])
+    return pd.concat(frames, ignore_index=True).sort_values(["iteration", "id"], kind="stable", ignore_index=True)
 
 
 def _read_csv_output_v1_no_time(filepath: Path) -> pd.DataFrame:
@@ -205,10 +459,7 @@ def _stream_output_csv_v1(p: Path) -> _NgenCalModelOutputFn:
     df["waterbody_code"] = df["waterbody_code"].map(lambda x: f"wb-{x}")
     df.set_index("value_time", inplace=True)
 
-    def get_output(id: str) -> pd.Series:
-        return df.loc[df["waterbody_code"] == id, "value"]
-
-    return get_output
+    return _feature_output(df, "waterbody_code")
 
 
 # change from v1-v2 introduced in https://github.com/NOAA-OWP/t-route/pull/818
@@ -221,10 +472,7 @@ def _stream_output_csv_v2(p: Path) -> _NgenCalModelOutputFn:
     df["waterbody_code"] = df["waterbody_code"].map(lambda x: f"wb-{x}")
     df.set_index("value_time", inplace=True)
 
-    def get_output(id: str) -> pd.Series:
-        return df.loc[df["waterbody_code"] == id, "value"]
-
-    return get_output
+    return _feature_output(df, "waterbody_code")
 
 
 # TODO: doc when change was made
@@ -262,10 +510,7 @@ def _stream_output_netcdf_v1(p: Path) -> _NgenCalModelOutputFn:
     df["waterbody_code"] = df["waterbody_code"].map(lambda x: f"wb-{x}")
     df.set_index("value_time", inplace=True)
 
-    def get_output(id: str) -> pd.Series:
-        return df.loc[df["waterbody_code"] == id, "value"]
-
-    return get_output
+    return _feature_output(df, "waterbody_code")
 
 
 def _stream_output_parquet_v1(p: Path) -> _NgenCalModelOutputFn:
@@ -274,11 +519,18 @@ def _stream_output_parquet_v1(p: Path) -> _NgenCalModelOutputFn:
     # 1  wb-2420800  0.0   2023-04-02 00:05:00  velocity      m/s   2023-04-02     None
     # 2  wb-2420800  0.0   2023-04-02 00:05:00  depth         m     2023-04-02     None
     df = pd.read_parquet(p)
+    df = df[df["variable_name"] == "streamflow"]
     df.set_index("value_time", inplace=True)
 
+    return _feature_output(df, "location_id")
+
+
+def _feature_output(df: pd.DataFrame, feature: str) -> _NgenCalModelOutputFn:
+    """Index the `value` rows of each `feature` id once, rather than masking `df` each lookup"""
+    rows = df.groupby(feature, sort=False).indices
+    values = df["value"]
+
     def get_output(id: str) -> pd.Series:
-        return df.loc[
-            (df["location_id"] == id) & (df["variable_name"] == "streamflow"), "value"
-        ]
+        return values.iloc[rows.get(id, [])]
 
     return get_output
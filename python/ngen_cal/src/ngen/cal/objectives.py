@@ -1,5 +1,18 @@
 #!/usr/bin/env python
-from hydrotools.metrics.metrics import *
+import importlib
+
+def __getattr__(name):
+    """
+        Provide the hydrotools metrics, e.g. `nash_sutcliffe_efficiency`, as attributes of this module.
+        hydrotools is slow to import, so it is imported on first use.
+    """
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    metrics = importlib.import_module("hydrotools.metrics.metrics")
+    try:
+        return getattr(metrics, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 weights = [0.4, 0.2, 0.4]
 
@@ -23,6 +36,7 @@ def inverted_nnse(observed, simulated):
     return 1 - nnse
 
 def kge(observed, simulated):
+    from hydrotools.metrics.metrics import kling_gupta_efficiency
     return 1 - kling_gupta_efficiency(observed, simulated)
 
 def peak_error_single(observed, simulated):
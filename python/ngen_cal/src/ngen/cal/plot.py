@@ -1,12 +1,9 @@
 from __future__ import annotations
 
-import geopandas as gpd
 import pandas as pd
 import json
-import matplotlib.pyplot as plt
 from typing import TYPE_CHECKING
 
-from hypy.hydrolocation import NWISLocation # type: ignore
 from hypy.nexus import Nexus # type: ignore
 
 from .calibration_cathment import CalibrationCatchment
@@ -19,11 +16,15 @@ def plot_objective(objective_log_file: Path):
         Plot the objective funtion
     """
 
+    import matplotlib.pyplot as plt
+
     data = pd.read_csv(objective_log_file, names=['iteration', 'objective'], index_col=0)
     plt.figure()
     data.plot()
 
 def plot_stuff(workdir, catchment_data, nexus_data, cross_walk, config_file):
+    import geopandas as gpd
+    from hypy.hydrolocation import NWISLocation # type: ignore
 
     catchments = []
     #Read the catchment hydrofabric data
@@ -75,6 +76,10 @@ def plot_stuff(workdir, catchment_data, nexus_data, cross_walk, config_file):
         catchment.output.plot(ax=ax2, label='simulated')
 
 def plot_obs(id, catchment_data, nexus_data, cross_walk):
+    import geopandas as gpd
+    import matplotlib.pyplot as plt
+    from hypy.hydrolocation import NWISLocation # type: ignore
+
     #Read the catchment hydrofabric data
     catchment_hydro_fabric = gpd.read_file(catchment_data)
     catchment_hydro_fabric.set_index('ID', inplace=True)
@@ -108,6 +113,8 @@ def plot_obs(id, catchment_data, nexus_data, cross_walk):
     obs.plot(title=f'Observation at USGS {nwis}')
 
 def plot_output(output_file: Path):
+    import matplotlib.pyplot as plt
+
     #output = pd.read_csv(output_file, usecols=["Time", "Flow"], parse_dates=['Time'], index_col='Time')
     #output.rename(columns={'Flow':'sim_flow'}, inplace=True)
     output = pd.read_csv(output_file, parse_dates=['Time'], index_col='Time')
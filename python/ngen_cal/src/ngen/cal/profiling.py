@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, PositiveInt
+
+from ngen.cal import hookimpl
+
+if TYPE_CHECKING:
+    from typing import Iterator
+
+    from ngen.cal.configuration import General
+
+#the profiler of the running calibration, paused while waiting for model runs
+_active: cProfile.Profile | None = None
+#number of model runs currently being waited for, several when runs are supervised concurrently
+_paused = 0
+
+
+@contextmanager
+def paused() -> Iterator[None]:
+    """Pause the calibration profiler, if any, in the enclosed block, e.g. while waiting for a model run"""
+    global _paused
+    if _active is None:
+        yield
+        return
+    if _paused == 0:
+        _active.disable()
+    _paused += 1
+    try:
+        yield
+    finally:
+        _paused -= 1
+        if _paused == 0 and _active is not None:
+            _active.enable()
+
+
+class ProfileOptions(BaseModel):
+    """
+        Options profiling the calibration process, see `Profiler`
+    """
+    #iterations profiled in each `.pstats` file
+    every: PositiveInt = 100
+    #number of functions reported when calibration finishes
+    top: PositiveInt = 25
+    #directory, relative to the workdir, the `.pstats` files are written to
+    path: Path = Path("profile")
+
+
+class Profiler:
+    """
+        Built-in plugin profiling the python side of the calibration loop with `cProfile`, enabled with the `profile` option, e.g.
+
+            general:
+                profile:
+                    every: 100
+
+        Time spent waiting for model runs is excluded.  The profile of every `every` iterations is written to
+        `<path>/iterations_<first>-<last>.pstats`, and the profile of the whole calibration to `<path>/total.pstats`.
+        When calibration finishes, the `top` functions by their own (excluding callees) time are printed.
+        Particles evaluated in PSO worker processes are not profiled.
+    """
+
+    def __init__(self):
+        self._options: ProfileOptions | None = None
+        self._path: Path | None = None
+        self._profile: cProfile.Profile | None = None
+        self._total: pstats.Stats | None = None
+        #first iteration of the current profile
+        self._first: int | None = None
+
+    @hookimpl
+    def ngen_cal_configure(self, config: General) -> None:
+        self._options = config.profile
+        if self._options is not None:
+            self._path = Path(config.workdir)/self._options.path
+            self._path.mkdir(parents=True, exist_ok=True)
+
+    @hookimpl
+    def ngen_cal_start(self) -> None:
+        if self._options is not None:
+            self._start()
+
+    @hookimpl
+    def ngen_cal_iteration_start(self, iteration: int) -> None:
+        if self._first is None:
+            self._first = iteration
+
+    @hookimpl
+    def ngen_cal_iteration_finish(self, iteration: int, score: float | None, best_score: float, best_iteration: int) -> None:
+        if self._profile is not None and self._first is not None and iteration - self._first + 1 >= self._options.every:
+            self._stop(f"iterations_{self._first:05d}-{iteration:05d}.pstats")
+            self._first = None
+            self._start()
+
+    @hookimpl
+    def ngen_cal_finish(self, exception: Exception | None) -> None:
+        if self._profile is None:
+            return
+        self._stop(None if self._first is None else f"iterations_{self._first:05d}-end.pstats")
+        if self._total is None:
+            return
+        self._total.dump_stats(self._path/"total.pstats")
+        print(f"Calibration profile, excluding model runs, written to {self._path}")
+        self._total.sort_stats(pstats.SortKey.TIME).print_stats(self._options.top)
+
+    def _start(self) -> None:
+        global _active
+        self._profile = _active = cProfile.Profile()
+        self._profile.enable()
+
+    def _stop(self, name: str | None) -> None:
+        """Stop profiling, writing the profile to `name` in the profile directory and adding it to the total"""
+        global _active
+        self._profile.disable()
+        profile, self._profile = self._profile, None
+        _active = None
+        try:
+            stats = pstats.Stats(profile)
+        except TypeError:
+            #nothing was profiled
+            return
+        if name is not None:
+            stats.dump_stats(self._path/name)
+        if self._total is None:
+            self._total = stats
+        else:
+            self._total.add(stats)
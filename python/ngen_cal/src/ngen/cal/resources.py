@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import csv
+import os
+import subprocess
+import sys
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import pandas as pd
+
+from ngen.cal import hookimpl
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from resource import struct_rusage
+    from typing import Iterable
+
+#log of the resources used by each model run, written to the job workdir alongside the objective log
+RUN_LOG = "model_runs.csv"
+
+
+class RunResources(NamedTuple):
+    """
+        Resources used by a single model run
+    """
+    wall_time: float
+    #CPU time and peak resident set size of the model and its (waited for) children
+    #None if unavailable, e.g. the run timed out or was supervised by `AsyncExecutor`
+    user_time: Optional[float]
+    system_time: Optional[float]
+    #bytes
+    max_rss: Optional[int]
+    #growth, in bytes, of the files directly in the run's workdir
+    bytes_written: int
+    timed_out: bool
+    #`model` for a run of the whole model, `partial` for a run re-simulating only the perturbed catchments
+    #and `routing` for a run routing saved outputs alone, the latter two reuse saved outputs
+    kind: str = "model"
+
+    @classmethod
+    def from_rusage(cls, wall_time: float, rusage: struct_rusage | None, bytes_written: int, kind: str = "model") -> RunResources:
+        if rusage is None:
+            return cls(wall_time, None, None, None, bytes_written, True, kind)
+        # ru_maxrss is reported in kilobytes on linux, bytes on macOS
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss*1024
+        return cls(wall_time, rusage.ru_utime, rusage.ru_stime, max_rss, bytes_written, False, kind)
+
+
+def wait(process: subprocess.Popen, timeout: float | None) -> struct_rusage:
+    """Wait for `process` to exit and return its resource usage
+
+    Reaps the process with `os.wait4`, setting `process.returncode`.
+
+    Raises:
+        subprocess.TimeoutExpired: `process` ran longer than `timeout` seconds
+    """
+    deadline = None if timeout is None else monotonic() + timeout
+    delay = 0.0005
+    while True:
+        pid, status, rusage = os.wait4(process.pid, 0 if deadline is None else os.WNOHANG)
+        if pid == process.pid:
+            process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            return rusage
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        # same back off as subprocess uses when polling
+        delay = min(delay*2, remaining, 0.05)
+        sleep(delay)
+
+
+def dir_size(path: Path) -> int:
+    """Total size, in bytes, of the files directly in `path`"""
+    size = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False):
+                size += entry.stat(follow_symlinks=False).st_size
+    return size
+
+
+def write_run_log(path: Path, iteration: int, runs: Iterable[RunResources]) -> None:
+    """Append the `runs` of `iteration` to the csv run log at `path`"""
+    exists = path.exists()
+    with open(path, "a", newline="") as log_file:
+        writer = csv.writer(log_file)
+        if not exists:
+            writer.writerow(("iteration",) + RunResources._fields)
+        for run in runs:
+            writer.writerow((iteration,) + tuple("" if v is None else v for v in run))
+
+
+class ResourceSummary:
+    """
+        Built-in plugin which collects the resources used by each model run and prints
+        aggregate statistics when calibration finishes
+    """
+
+    def __init__(self):
+        self._runs: list[RunResources] = []
+
+    @hookimpl
+    def ngen_cal_model_run(self, iteration: int, run: RunResources) -> None:
+        self._runs.append(run)
+
+    @hookimpl
+    def ngen_cal_finish(self, exception: Exception | None) -> None:
+        if self._runs:
+            timed_out = sum(run.timed_out for run in self._runs)
+            print(f"Model run resources over {len(self._runs)} runs ({timed_out} timed out)")
+            print(self.summary().to_string(float_format="{:.3f}".format))
+
+    def summary(self) -> pd.DataFrame:
+        """
+            Mean, max and total of each resource over all model runs
+        """
+        df = pd.DataFrame(self._runs, columns=RunResources._fields).drop(columns=["timed_out", "kind"]).astype(float)
+        summary = df.agg(["mean", "max", "sum"]).T
+        summary.columns = ["mean", "max", "total"]
+        summary.index.name = "resource"
+        return summary
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import shutil
+import signal
 import subprocess
 import pandas as pd # type: ignore
+from contextlib import contextmanager, nullcontext
 from math import log
+from time import perf_counter
 import numpy as np # type: ignore
 from typing import TYPE_CHECKING
 from functools import partial
 from multiprocessing import pool
-from ngen.cal.utils import pushd
+from ngen.cal.errors import ModelTimeoutError
+from ngen.cal.async_execution import AsyncExecutor
+from ngen.cal.timing import PhaseTimer, sum_timings
+from ngen.cal.profiling import paused
+from ngen.cal.resources import RUN_LOG, RunResources, dir_size, wait, write_run_log
+from ngen.cal.ngen_hooks.ngen_output import NgenSaveOutput
 if TYPE_CHECKING:
+    from typing import Mapping
+    from resource import struct_rusage
+    from typing import Container, Iterator, Sequence
+    from pathlib import Path
     from ngen.cal import Adjustable, Evaluatable
     from ngen.cal.agent import Agent
     from datetime import datetime
@@ -32,30 +47,333 @@ def _objective_func(simulated_hydrograph, observed_hydrograph, objective, eval_r
     #Evaluate custom objective function providing simulated, observed series
     return objective(df['obs_flow'], df['sim_flow'])
 
-def _execute(meta: Agent):
+def _score(calibration_object: Evaluatable, output, eval_range: tuple[datetime, datetime] | None = None) -> float:
     """
-        Execute a model run defined by the calibration meta cmd
+        Objective score of the `output` of `calibration_object`
+
+        Calibration objects evaluating several gages provide the output and observations of each gage keyed by gage,
+        each gage is scored and the scores are aggregated by `calibration_object.eval_params`.
     """
-    if meta.job.log_file is None:
-        subprocess.check_call(meta.cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, shell=True, cwd=meta.job.workdir)
-    else:
-        with open(meta.job.log_file, 'a+') as log_file:
-            subprocess.check_call(meta.cmd, stdout=log_file, stderr=log_file, shell=True, cwd=meta.job.workdir)
+    observed = calibration_object.observed
+    if isinstance(output, dict):
+        scores = {id: _objective_func(sim, observed[id], calibration_object.objective, eval_range) for id, sim in output.items()}
+        return calibration_object.eval_params.aggregate(scores)
+    return _objective_func(output, observed, calibration_object.objective, eval_range)
 
-def _evaluate(i: int, calibration_object: Evaluatable, info=False) -> float:
+def _kill(process: subprocess.Popen, grace: float = 10) -> None:
     """
-        Performs the evaluation logic of a calibration step
+        Terminate the process group of `process`, e.g. mpirun and all of its ranks
+    """
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+    except ProcessLookupError:
+        #already exited
+        pass
+
+def _run(cmd: str, workdir: Path, log_file: Path | None, timeout: float | None) -> struct_rusage | None:
+    """
+        Run `cmd` in its own process group, killing the group if it runs longer than `timeout` seconds
+
+        Returns:
+            struct_rusage | None: resource usage of the run, None if the run timed out
+    """
+    with open(log_file, 'a+') if log_file is not None else open(os.devnull, 'w') as output:
+        process = subprocess.Popen(cmd, stdout=output, stderr=output, shell=True, cwd=workdir, start_new_session=True)
+        try:
+            rusage = wait(process, timeout)
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            return None
+        except BaseException:
+            #the model runs in its own session, so it won't see signals sent to this process (e.g. ctrl-c)
+            _kill(process)
+            raise
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd)
+    return rusage
+
+def _execute(meta: Agent, cmd: str | None = None, kind: str = "model") -> bool:
+    """
+        Execute a model run defined by the calibration meta cmd, or by `cmd` if given
+        The run's resources are recorded as a run of `kind`, see `RunResources.kind`
+
+        Returns:
+            bool: False if the run timed out and the `penalty` timeout policy applies, True otherwise
+    """
+    options = meta.model.exec_params
+    attempts = 1 + options.retries if options.on_timeout == 'retry' else 1
+    for attempt in range(attempts):
+        timeout = options.timeout_for(meta.run_durations)
+        size = dir_size(meta.job.run_dir)
+        start = perf_counter()
+        with meta.timer.phase('model_run'), paused():
+            rusage = _run(cmd or meta.cmd, meta.job.run_dir, meta.job.log_file, timeout)
+        duration = perf_counter() - start
+        meta.runs.append(RunResources.from_rusage(duration, rusage, dir_size(meta.job.run_dir) - size, kind))
+        if rusage is not None:
+            #only full model runs inform the adaptive timeout
+            if cmd is None:
+                meta.run_durations.append(duration)
+            return True
+        print(f"Model run timed out after {timeout} seconds (attempt {attempt + 1} of {attempts})")
+    if options.on_timeout == 'penalty':
+        return False
+    raise ModelTimeoutError(f"{cmd or meta.cmd} timed out after {timeout} seconds")
+
+async def _execute_async(meta: Agent, executor: AsyncExecutor) -> bool:
+    """
+        Execute a model run defined by the calibration meta cmd using `executor`
+        Applies the same time limits and timeout policy as `_execute`
+
+        Returns:
+            bool: False if the run timed out and the `penalty` timeout policy applies, True otherwise
+    """
+    options = meta.model.exec_params
+    attempts = 1 + options.retries if options.on_timeout == 'retry' else 1
+    for attempt in range(attempts):
+        timeout = options.timeout_for(meta.run_durations)
+        size = dir_size(meta.job.run_dir)
+        with meta.timer.phase('model_run'), paused():
+            result = await executor.run(meta.cmd, meta.job.run_dir, meta.job.log_file, timeout)
+        #asyncio reaps the model process itself, so cpu time and memory use are not available
+        meta.runs.append(RunResources(result.duration, None, None, None, dir_size(meta.job.run_dir) - size, result.timed_out))
+        if not result.timed_out:
+            if result.returncode:
+                raise subprocess.CalledProcessError(result.returncode, meta.cmd)
+            meta.run_durations.append(result.duration)
+            return True
+        print(f"Model run timed out after {timeout} seconds (attempt {attempt + 1} of {attempts})")
+    if options.on_timeout == 'penalty':
+        return False
+    raise ModelTimeoutError(f"{meta.cmd} timed out after {timeout} seconds")
+
+async def _execute_all(agents: Sequence[Agent], executor: AsyncExecutor) -> list[bool]:
+    """
+        Concurrently execute the model runs of each agent
+    """
+    return await asyncio.gather(*(_execute_async(agent, executor) for agent in agents))
+
+def _routing_only(iteration: int, adjustables: Sequence[Adjustable], agent: Agent) -> bool:
     """
+        True if the parameters of `iteration` only differ from the best iteration's in routing parameters
+        and the model can route outputs alone
+    """
+    # avoid importing the ngen model (and its hydrofabric dependencies) with the search algorithms
+    from ngen.cal.ngen import ROUTING
+    if agent.routing_cmd is None:
+        return False
+    best = agent.best_params
+    changed = pd.concat([a.df.loc[a.df[str(iteration)] != a.df[best], 'model'] for a in adjustables])
+    return not changed.empty and (changed == ROUTING).all()
+
+def _changed(iteration: int, adjustables: Sequence[Adjustable], agent: Agent) -> list[str]:
+    """
+        Ids of the `adjustables` whose parameters in `iteration` differ from the best iteration's
+    """
+    best = agent.best_params
+    return [a.id for a in adjustables if (a.df[str(iteration)] != a.df[best]).any()]
+
+def _reuse_outputs(iteration: str, workdir: Path, exclude: Container[str] = (), run_dir: Path | None = None) -> bool:
+    """
+        Link the catchment and nexus outputs of `iteration`, saved in `workdir` by `NgenSaveOutput`, back into
+        the model's `run_dir` (defaults to `workdir`).  Outputs of the features in `exclude` are not linked,
+        they are re-simulated.
+
+        Returns:
+            bool: False if the outputs of `iteration` were not saved
+    """
+    saved = workdir/f"output_{iteration}"
+    if not saved.is_dir():
+        return False
+    outputs = NgenSaveOutput.scan(saved)
+    if not outputs['lateral']:
+        return False
+    if run_dir is None:
+        run_dir = workdir
+    #never let the model write through a link into the saved outputs
+    stale = NgenSaveOutput.scan(run_dir)
+    for kind in ('runoff', 'lateral', 'terminal', 'coastal'):
+        for name in stale[kind]:
+            (run_dir/name).unlink()
+        for name in outputs[kind]:
+            if NgenSaveOutput.feature_id(name) in exclude:
+                continue
+            try:
+                os.link(saved/name, run_dir/name)
+            except OSError:
+                #e.g. the file system doesn't support hard links, or the run directory is on another device
+                shutil.copy2(saved/name, run_dir/name)
+    return True
+
+def _execute_iteration(i: int, adjustables: Sequence[Adjustable], agent: Agent, reuse: bool = True) -> bool:
+    """
+        Execute the model run of iteration `i`.  If `reuse` and only routing parameters changed from the best
+        iteration, the best iteration's saved catchment outputs are routed again rather than re-running the model.
+        Otherwise, if the model supports it, only the catchments perturbed by iteration `i` are re-simulated
+        and the best iteration's saved outputs of the other catchments are reused.
+    """
+    if reuse and _routing_only(i, adjustables, agent) and _reuse_outputs(agent.best_params, agent.job.workdir, run_dir=agent.job.run_dir):
+        print(f"Only routing parameters changed, running {agent.routing_cmd} for iteration {i}")
+        return _execute(agent, agent.routing_cmd, "routing")
+    partial = agent.model.partial_run(_changed(i, adjustables, agent)) if reuse else None
+    if partial is not None:
+        cmd, simulated = partial
+        if _reuse_outputs(agent.best_params, agent.job.workdir, exclude=simulated, run_dir=agent.job.run_dir):
+            print(f"Re-simulating {len(simulated)} perturbed features, running {cmd} for iteration {i}")
+            return _execute(agent, cmd, "partial")
+    print(f"Running {agent.cmd} for iteration {i}")
+    return _execute(agent)
+
+def _penalize(i: int, calibration_object: Evaluatable, agent: Agent) -> float:
+    """
+        Assign the timeout penalty score to iteration `i` in place of evaluating its output
+    """
+    score = agent.model.exec_params.penalty_score(calibration_object.eval_params.target)
+    print(f"Assigning penalty score {score} to iteration {i}")
+    calibration_object.update(i, score, log=True, workdir=agent.job.workdir)
+    return score
+
+def _evaluate(i: int, calibration_object: Evaluatable, info=False, workdir: Path | None = None, timer: PhaseTimer | None = None, run_dir: Path | None = None) -> float:
+    """
+        Performs the evaluation logic of a calibration step
 
+        Output is read from `run_dir`, defaulting to `workdir`, and log files are written to `workdir` (the current working directory if None).
+        The process working directory is never changed, so independent objects can be evaluated concurrently.
+        The output and objective phases are recorded by `timer` if provided.
+    """
+    if timer is None:
+        timer = PhaseTimer()
     #read output and calculate objective_func
-    score =  _objective_func(calibration_object.output, calibration_object.observed, calibration_object.objective, calibration_object.evaluation_range)
+    with timer.phase('output'):
+        output = calibration_object.get_output(workdir if run_dir is None else run_dir)
+    with timer.phase('objective'):
+        score =  _score(calibration_object, output, calibration_object.evaluation_range)
     #update meta info based on latest score and write some log files
-    calibration_object.update(i, score, log=True)
+    calibration_object.update(i, score, log=True, workdir=workdir)
     if info:
         print(f"Current score {score}\nBest score {calibration_object.best_score}")
         print(f"Best parameters at iteration {calibration_object.best_params}")
     return score
 
+def _check_point(i: int, calibration_object: Adjustable, agent: Agent) -> None:
+    """
+        Check point iteration `i` and report the instrumentation of the iteration to plugins
+    """
+    with agent.timer.phase('check_point'):
+        calibration_object.check_point(i, agent.job)
+        agent.save_rng_state()
+    _report(i, agent, calibration_object, *_finish_iteration(i, agent))
+
+def _finish_iteration(i: int, agent: Agent) -> tuple[dict[str, float], list[RunResources]]:
+    """
+        Collect the phase timings and model runs of iteration `i`, recording the runs in the job's run log
+    """
+    timings = agent.timer.pop()
+    runs = agent.runs.copy()
+    agent.runs.clear()
+    write_run_log(agent.job.workdir/RUN_LOG, i, runs)
+    return timings, runs
+
+def _start_iteration(i: int, agent: Agent) -> None:
+    if agent.hooks is not None:
+        agent.hooks.ngen_cal_iteration_start(iteration=i)
+
+def _report(i: int, agent: Agent, calibration_object: Evaluatable, timings: Mapping[str, float], runs: Sequence[RunResources]) -> None:
+    if agent.hooks is None:
+        return
+    agent.hooks.ngen_cal_iteration_timing(iteration=i, timings=timings)
+    for run in runs:
+        agent.hooks.ngen_cal_model_run(iteration=i, run=run)
+    agent.hooks.ngen_cal_iteration_finish(iteration=i, score=calibration_object.eval_params.score(i),
+                                          best_score=calibration_object.best_score, best_iteration=int(calibration_object.best_params))
+
+class _LowFidelity:
+    """
+        Multi-fidelity schedule for DDS search.
+
+        For the first `iterations` iterations, candidates are simulated over a shortened, leading
+        `window` of the simulation period and scored over that window only.  Candidates which
+        improve on the incumbent's score over the same window are re-simulated over the full
+        simulation period before they can become the incumbent best.
+
+        Configured with the `low_fidelity` search parameter, e.g.
+
+            strategy:
+                type: estimation
+                algorithm: dds
+                parameters:
+                    low_fidelity:
+                        iterations: 100
+                        window: 365 days
+    """
+
+    def __init__(self, calibration_object: Evaluatable, agent: Agent):
+        options = agent.parameters['low_fidelity']
+        self._iterations = options.get('iterations', 0)
+        self._full_window = agent.model.simulation_window
+        start, end = self._full_window
+        # the leading window is a prefix of the full simulation, so a full simulation scored over this
+        # window is equivalent to the shortened simulation, and the incumbent needs no extra run
+        low_end = min(end, (pd.Timestamp(start) + pd.Timedelta(options['window'])).to_pydatetime())
+        self._window = (start, low_end)
+        eval_start, eval_stop = calibration_object.evaluation_range or self._full_window
+        self._eval_range = (max(eval_start, start), min(eval_stop, low_end))
+        if self._eval_range[0] >= self._eval_range[1]:
+            raise ValueError(f"low fidelity window {self._window} does not overlap the evaluation range {(eval_start, eval_stop)}")
+        self._incumbent_score = None
+
+    def active(self, iteration: int) -> bool:
+        return iteration <= self._iterations
+
+    @contextmanager
+    def shortened(self, agent: Agent) -> Iterator[None]:
+        """Simulate the low fidelity window in model runs of the context, the full window afterwards"""
+        agent.model.set_simulation_window(*self._window)
+        try:
+            yield
+        finally:
+            agent.model.set_simulation_window(*self._full_window)
+
+    def screen(self, iteration: int, calibration_object: Evaluatable, adjustables: Sequence[Adjustable], agent: Agent) -> bool:
+        """
+            Score the low fidelity run of `iteration`.  If it is promising, re-run the model over the full
+            simulation window so it can be evaluated, otherwise record the iteration as complete.
+
+            Returns:
+                bool: True if the candidate was re-simulated and needs to be evaluated
+        """
+        with agent.timer.phase('output'):
+            output = calibration_object.get_output(agent.job.run_dir)
+        with agent.timer.phase('objective'):
+            score = _score(calibration_object, output, self._eval_range)
+        print(f"Low fidelity score {score}\nIncumbent low fidelity score {self._incumbent_score}")
+        if self._incumbent_score is not None and not calibration_object.eval_params.improves(score, self._incumbent_score):
+            #screened out, only record that the iteration has been completed
+            calibration_object.eval_params.write_param_log_file(iteration, agent.job.workdir)
+            return False
+        print(f"Running {agent.cmd} over the full simulation window for iteration {iteration}")
+        with agent.timer.phase('update_config'):
+            for adjustable in adjustables:
+                agent.update_config(iteration, adjustable.df[[str(iteration), 'param', 'model']], adjustable.id)
+        if not _execute(agent):
+            _penalize(iteration, calibration_object, agent)
+            return False
+        return True
+
+    def record(self, iteration: int, calibration_object: Evaluatable, agent: Agent) -> None:
+        """Track the low fidelity score of the incumbent after a full window evaluation of `iteration`"""
+        if calibration_object.best_params != str(iteration):
+            return
+        with agent.timer.phase('output'):
+            output = calibration_object.get_output(agent.job.run_dir)
+        with agent.timer.phase('objective'):
+            self._incumbent_score = _score(calibration_object, output, self._eval_range)
+
 def dds_update(iteration: int, inclusion_probability: float, calibration_object: Adjustable, agent: Agent):
     """_summary_
 
@@ -67,9 +385,9 @@ def dds_update(iteration: int, inclusion_probability: float, calibration_object:
     #select a random subset of variables to modify
     #TODO convince myself that grabbing a random selction of P fraction of items
     #is the same as selecting item with probability P
-    neighborhood = calibration_object.variables.sample(frac=inclusion_probability)
+    neighborhood = calibration_object.variables.sample(frac=inclusion_probability, random_state=agent.rng)
     if neighborhood.empty:
-        neighborhood = calibration_object.variables.sample(n=1)
+        neighborhood = calibration_object.variables.sample(n=1, random_state=agent.rng)
     print( f"neighborhood: {neighborhood}" )
     #Copy the best parameter values so far into the next iterations parameter list
     calibration_object.df[str(iteration)] = calibration_object.df[agent.best_params]
@@ -78,7 +396,7 @@ def dds_update(iteration: int, inclusion_probability: float, calibration_object:
         #permute the variables in neighborhood
         #using a random normal sample * sigma, sigma = 0.2*(max-min)
         #print(n, meta.best_params)
-        new = calibration_object.df.loc[n, agent.best_params] + calibration_object.df.loc[n, 'sigma']*np.random.normal(0,1)
+        new = calibration_object.df.loc[n, agent.best_params] + calibration_object.df.loc[n, 'sigma']*agent.rng.normal(0,1)
         lower =  calibration_object.df.loc[n, 'min']
         upper = calibration_object.df.loc[n, 'max']
         #print( new )
@@ -98,7 +416,8 @@ def dds_update(iteration: int, inclusion_probability: float, calibration_object:
     """
     #Update the meta info and prepare for next iteration
     #Pass the parameter and interation columns of the object we are calibrating to the update function
-    agent.update_config(iteration, calibration_object.df[[str(iteration), 'param', 'model']], calibration_object.id)
+    with agent.timer.phase('update_config'):
+        agent.update_config(iteration, calibration_object.df[[str(iteration), 'param', 'model']], calibration_object.id)
 
 
 def dds(start_iteration: int, iterations: int,  calibration_object: Evaluatable, agent: Agent):
@@ -111,6 +430,7 @@ def dds(start_iteration: int, iterations: int,  calibration_object: Evaluatable,
 
     init = start_iteration - 1 if start_iteration > 0 else start_iteration
     neighborhood_size = agent.parameters.get('neighborhood', 0.2)
+    fidelity = _LowFidelity(calibration_object, agent) if agent.parameters.get('low_fidelity') else None
 
     #precompute sigma for each variable based on neighborhood_size and bounds
     calibration_object.df['sigma'] = neighborhood_size*(calibration_object.df['max'] - calibration_object.df['min'])
@@ -118,27 +438,40 @@ def dds(start_iteration: int, iterations: int,  calibration_object: Evaluatable,
 
     #Produce the baseline simulation output
     if start_iteration == 0:
-        if calibration_object.output is None:
+        _start_iteration(0, agent)
+        completed = True
+        if calibration_object.get_output(agent.job.run_dir) is None:
             #We are starting a new calibration and do not have an initial output state to evaluate, compute it
             #Need initial states  (iteration 0) to start DDS loop
             print(f"Running {agent.cmd} to produce initial simulation")
             agent.update_config(start_iteration, calibration_object.df[[str(start_iteration), 'param', 'model']], calibration_object.id)
-            _execute(agent)
-        with pushd(agent.job.workdir):
-            _evaluate(0, calibration_object, info=True)
-        calibration_object.check_point(0, agent.job)
+            completed = _execute(agent)
+        if completed:
+            _evaluate(0, calibration_object, info=True, workdir=agent.job.workdir, timer=agent.timer, run_dir=agent.job.run_dir)
+            if fidelity is not None:
+                fidelity.record(0, calibration_object, agent)
+        else:
+            _penalize(0, calibration_object, agent)
+        _check_point(0, calibration_object, agent)
         start_iteration += 1
 
     for i in range(start_iteration, iterations+1):
         #Calculate probability of inclusion
+        _start_iteration(i, agent)
         inclusion_probability = 1 - log(i)/log(iterations)
-        dds_update(i, inclusion_probability, calibration_object, agent)
-        #Run cmd Again...
-        print(f"Running {agent.cmd} for iteration {i}")
-        _execute(agent)
-        with pushd(agent.job.workdir):
-            _evaluate(i, calibration_object, info=True)
-        calibration_object.check_point(i, agent.job)
+        screening = fidelity is not None and fidelity.active(i)
+        with fidelity.shortened(agent) if screening else nullcontext():
+            dds_update(i, inclusion_probability, calibration_object, agent)
+            #Run cmd Again...
+            #low fidelity runs simulate a shorter window than the saved outputs
+            completed = _execute_iteration(i, [calibration_object], agent, reuse=not screening)
+        if not completed:
+            _penalize(i, calibration_object, agent)
+        elif not screening or fidelity.screen(i, calibration_object, [calibration_object], agent):
+            _evaluate(i, calibration_object, info=True, workdir=agent.job.workdir, timer=agent.timer, run_dir=agent.job.run_dir)
+            if fidelity is not None:
+                fidelity.record(i, calibration_object, agent)
+        _check_point(i, calibration_object, agent)
 
 def dds_set(start_iteration: int, iterations: int, agent: Agent):
     """
@@ -166,46 +499,64 @@ def dds_set(start_iteration: int, iterations: int, agent: Agent):
             calibration_object.df['sigma'] = neighborhood_size*(calibration_object.df['max'] - calibration_object.df['min'])
             #TODO optimize by passing the set and iterating in update, then only have to write once to file
             agent.update_config(init, calibration_object.df[[str(init), 'param', 'model']], calibration_object.id)
+        fidelity = _LowFidelity(calibration_set, agent) if agent.parameters.get('low_fidelity') else None
 
         #Produce the baseline simulation output
         if start_iteration == 0:
-            if calibration_set.output is None:
+            _start_iteration(0, agent)
+            completed = True
+            if calibration_set.get_output(agent.job.run_dir) is None:
                 #We are starting a new calibration and do not have an initial output state to evaluate, compute it
                 #Need initial states  (iteration 0) to start DDS loop
                 print(f"Running {agent.cmd} to produce initial simulation")
-                _execute(agent)
-            with pushd(agent.job.workdir):
-                _evaluate(0, calibration_set, info=True)
-            calibration_set.check_point(0, agent.job)
+                completed = _execute(agent)
+            if completed:
+                _evaluate(0, calibration_set, info=True, workdir=agent.job.workdir, timer=agent.timer, run_dir=agent.job.run_dir)
+                if fidelity is not None:
+                    fidelity.record(0, calibration_set, agent)
+            else:
+                _penalize(0, calibration_set, agent)
+            _check_point(0, calibration_set, agent)
             start_iteration += 1
 
         for i in range(start_iteration, iterations+1):
             #Calculate probability of inclusion
+            _start_iteration(i, agent)
             inclusion_probability = 1 - log(i)/log(iterations)
-            for calibration_object in calibration_set.adjustables:
-                dds_update(i, inclusion_probability, calibration_object, agent)
-            #Run cmd Again...
-            print(f"Running {agent.cmd} for iteration {i}")
-            _execute(agent)
-            with pushd(agent.job.workdir):
-                _evaluate(i, calibration_set, info=True)
-            calibration_set.check_point(i, agent.job)
-
-def compute(calibration_object, iteration, input) -> float:
+            screening = fidelity is not None and fidelity.active(i)
+            with fidelity.shortened(agent) if screening else nullcontext():
+                for calibration_object in calibration_set.adjustables:
+                    dds_update(i, inclusion_probability, calibration_object, agent)
+                #Run cmd Again...
+                completed = _execute_iteration(i, calibration_set.adjustables, agent, reuse=not screening)
+            if not completed:
+                _penalize(i, calibration_set, agent)
+            elif not screening or fidelity.screen(i, calibration_set, calibration_set.adjustables, agent):
+                _evaluate(i, calibration_set, info=True, workdir=agent.job.workdir, timer=agent.timer, run_dir=agent.job.run_dir)
+                if fidelity is not None:
+                    fidelity.record(i, calibration_set, agent)
+            _check_point(i, calibration_set, agent)
+
+def compute(calibration_object, iteration, input) -> tuple[float, tuple[dict[str, float], list[RunResources]], list[float]]:
     params = input[0]
     agent = input[1]
+    completed = len(agent.run_durations)
 
     #Update the meta info and prepare for next iteration
     #Pass the parameter and interation columns of the object we are calibrating to the update function
     calibration_object.df[str(iteration)] = params
     #print(calibration_object.df[str(iteration)])
-    with pushd(agent.job.workdir):
+    with agent.timer.phase('update_config'):
         agent.update_config(iteration, calibration_object.df[[str(iteration), 'param', 'model']], calibration_object.id)
-        _execute(agent)
-        cost = _evaluate(iteration, calibration_object)
+    if _execute(agent):
+        cost = _evaluate(iteration, calibration_object, workdir=agent.job.workdir, timer=agent.timer, run_dir=agent.job.run_dir)
+    else:
+        cost = _penalize(iteration, calibration_object, agent)
+    with agent.timer.phase('check_point'):
         calibration_object.check_point(iteration, agent.job)
-        #cost = _objective_func(calibration_object.output, calibration_object.observed, calibration_object.objective, calibration_object.evaluation_range)
-    return cost
+    #cost = _objective_func(calibration_object.output, calibration_object.observed, calibration_object.objective, calibration_object.evaluation_range)
+    #compute may run in a worker process, so hand the instrumentation and run durations back with the cost
+    return cost, _finish_iteration(iteration, agent), agent.run_durations[completed:]
 
 def cost_func( calibration_object: Adjustable, agents: Agent, pool, params):
     """_summary_
@@ -216,9 +567,18 @@ def cost_func( calibration_object: Adjustable, agents: Agent, pool, params):
         params (_type_): _description_
     """
     global __iteration_counter
+    _start_iteration(__iteration_counter, agents[0])
     #TODO implement multi-processing here???
     func = partial(compute, calibration_object, __iteration_counter)
-    costs = np.fromiter(pool.imap(func, zip(params, agents)), dtype=float)
+    #particles are evaluated, and not profiled, in worker processes
+    with paused():
+        results = list(pool.imap(func, zip(params, agents)))
+    costs = np.array([cost for cost, _, _ in results], dtype=float)
+    finished = [f for _, f, _ in results]
+    #workers update copies of the agents, record their runs for the adaptive timeout of later iterations
+    for agent, (_, _, durations) in zip(agents, results):
+        agent.run_durations.extend(durations)
+    _report(__iteration_counter, agents[0], calibration_object, sum_timings(t for t, _ in finished), [run for _, runs in finished for run in runs])
     # for r in :
     #     costs.append(r)
     #Update global iteration counter
@@ -226,6 +586,45 @@ def cost_func( calibration_object: Adjustable, agents: Agent, pool, params):
 
     return costs
 
+def cost_func_async(calibration_object: Adjustable, agents: Sequence[Agent], executor: AsyncExecutor, params):
+    """
+        PSO cost function which runs each particle's model concurrently from this process, then
+        evaluates each particle in turn.
+
+    Args:
+        calibration_object (Adjustable): object being calibrated, shared by all particles
+        agents (Sequence[Agent]): one agent per particle, each with its own workdir
+        executor (AsyncExecutor): executor supervising the model runs
+        params (_type_): particle positions
+    """
+    global __iteration_counter
+    _start_iteration(__iteration_counter, agents[0])
+    iteration = str(__iteration_counter)
+    for position, agent in zip(params, agents):
+        #don't modify the shared parameter frame until each particle is evaluated
+        df = calibration_object.df[['param', 'model']].copy()
+        df[iteration] = position
+        with agent.timer.phase('update_config'):
+            agent.update_config(__iteration_counter, df[[iteration, 'param', 'model']], calibration_object.id)
+
+    completed = asyncio.run(_execute_all(agents, executor))
+
+    costs = []
+    for position, agent, ok in zip(params, agents, completed):
+        calibration_object.df[iteration] = position
+        if ok:
+            costs.append(_evaluate(__iteration_counter, calibration_object, workdir=agent.job.workdir, timer=agent.timer, run_dir=agent.job.run_dir))
+        else:
+            costs.append(_penalize(__iteration_counter, calibration_object, agent))
+        with agent.timer.phase('check_point'):
+            calibration_object.check_point(__iteration_counter, agent.job)
+    finished = [_finish_iteration(__iteration_counter, agent) for agent in agents]
+    _report(__iteration_counter, agents[0], calibration_object, sum_timings(t for t, _ in finished), [run for _, runs in finished for run in runs])
+    #Update global iteration counter
+    __iteration_counter = __iteration_counter + 1
+
+    return np.array(costs, dtype=float)
+
 def pso_search(start_iteration: int, iterations: int,  agent):
     """_summary_
 
@@ -245,9 +644,16 @@ def pso_search(start_iteration: int, iterations: int,  agent):
     #TODO run first iteration?
     num_particles = agent.parameters.get('particles', 4)
     pool_size = agent.parameters.get("pool", 1)
-    print(f"Running PSO with {num_particles} particles using {pool_size} processes")
-    #TODO warn about potential loss of data when particles > pool
-    _pool = pool.Pool(pool_size)
+    #`process` evaluates particles in a pool of worker processes
+    #`async` runs up to `pool` particle models concurrently from this process
+    executor = agent.parameters.get("executor", "process")
+    if executor == "async":
+        print(f"Running PSO with {num_particles} particles using {pool_size} concurrent model runs")
+        _executor = AsyncExecutor(pool_size)
+    else:
+        print(f"Running PSO with {num_particles} particles using {pool_size} processes")
+        #TODO warn about potential loss of data when particles > pool
+        _pool = pool.Pool(pool_size)
     agents = [agent] + [ agent.duplicate() for i in range(num_particles-1) ]
     default_options = {'c1': 0.5, 'c2': 0.3, 'w':0.9}
     options = agent.parameters.get("options", default_options)
@@ -272,7 +678,10 @@ def pso_search(start_iteration: int, iterations: int,  agent):
         #causes some issues with multiplrocessing if the calibration_object (e.g. CalibrationSet)
         #contains non-pickleable components, which with the new plugin system it does if the plugins are loaded
         #from a module. Using class scoped/namespaced plugins and registering the class seems to avoid this problem
-        cf = partial(cost_func, calibration_object, agents, _pool)
+        if executor == "async":
+            cf = partial(cost_func_async, calibration_object, agents, _executor)
+        else:
+            cf = partial(cost_func, calibration_object, agents, _pool)
         # Perform optimization
         #For pyswarm, DO NOT use the embedded multi-processing -- it is impossible to track the mapping of an agent to the params
         cost, pos = optimizer.optimize(cf, iters=iterations, n_processes=None)
@@ -280,3 +689,5 @@ def pso_search(start_iteration: int, iterations: int,  agent):
         calibration_object.check_point(iterations, agent.job)
         print(f"Best params with cost {cost}:")
         print(calibration_object.df[['param','global_best']].set_index('param'))
+    for particle in agents[1:]:
+        particle.job.close()
@@ -0,0 +1,222 @@
+"""
+    A synthetic stand-in for the ngen executable, used to exercise and benchmark the calibration loop
+    without an ngen build, hydrofabric, or forcing data.
+
+    The stand-in accepts ngen's command line, reads the realization config written by `update_config`,
+    and writes t-route compatible routing output with a cheap, deterministic hydrograph derived from the
+    calibrated parameters of each catchment.
+
+    Configure it as the model `binary`, e.g.
+
+        model:
+            type: ngen
+            binary: python -m ngen.cal.standin --segments 10000 --sleep 0.5
+
+    Running the module by path, i.e. `python /path/to/ngen/cal/standin.py`, avoids importing the
+    `ngen.cal` package in every model run.  This module intentionally depends only on numpy and pandas.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from typing import Any, Mapping, Sequence
+
+#supported routing output formats, see `ngen.cal.ngen_hooks.ngen_output.TrouteOutput`
+FORMATS = ("csv", "stream_v1", "stream_v2", "parquet", "netcdf")
+
+
+def _model_params(formulation: Mapping[str, Any]) -> dict[str, float]:
+    """Numeric `model_params` of a formulation, including each module of a multi-BMI formulation"""
+    params = formulation.get("params", {})
+    modules = [m.get("params", {}) for m in params.get("modules", [])] or [params]
+    values = {}
+    for module in modules:
+        for name, value in module.get("model_params", {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[name] = float(value)
+    return values
+
+
+def _catchment_params(realization: Mapping[str, Any]) -> dict[int, dict[str, float]]:
+    """Calibrated parameters of each `cat-` catchment, keyed by the integer id of the catchment"""
+    catchments = {}
+    for id, config in realization.get("catchments", {}).items():
+        if not id.startswith("cat-") or not id[4:].isdigit():
+            continue
+        formulations = config.get("formulations") or [{}]
+        catchments[int(id[4:])] = _model_params(formulations[0])
+    return catchments
+
+
+def _segments(catchments: Sequence[int], n: int | None) -> np.ndarray:
+    """The realization's catchments, padded with synthetic segments to `n` segments"""
+    ids = sorted(catchments)
+    if n is not None and n > len(ids):
+        start = max(ids, default=0) + 1
+        ids.extend(range(start, start + n - len(ids)))
+    return np.array(ids, dtype=np.int64)
+
+
+def hydrograph(params: Sequence[Mapping[str, float]], steps: int, interval: int) -> np.ndarray:
+    """Deterministic flow of each segment, in cubic meters per second, at each output step
+
+    The magnitude of a segment's hydrograph is driven by the mean of its parameter values
+    and the diurnal phase by their spread, so that changing any parameter changes the output.
+
+    Args:
+        params: parameters of each segment
+        steps: number of output steps
+        interval: seconds between output steps
+
+    Returns:
+        np.ndarray: (segments, steps) array of flow
+    """
+    means = np.array([np.mean(list(p.values())) if p else 0.0 for p in params])
+    spreads = np.array([np.std(list(p.values())) if p else 0.0 for p in params])
+    hours = np.arange(1, steps + 1) * interval / 3600
+    base = np.log1p(np.abs(means))[:, None] + 0.1
+    return base * (1.5 + np.sin(2*np.pi*hours[None, :]/24 + spreads[:, None]))
+
+
+def _times(start: pd.Timestamp, steps: int, interval: int) -> pd.DatetimeIndex:
+    # first output time is `start_time` + `output_interval`
+    return pd.date_range(start + pd.Timedelta(seconds=interval), periods=steps, freq=f"{interval}s")
+
+
+def write_output(path: Path, format: str, ids: np.ndarray, flow: np.ndarray, start: pd.Timestamp, interval: int, substeps: int = 1) -> None:
+    """Write `flow` of each segment in `ids` as t-route output in `format`
+
+    Args:
+        path: output file
+        format: one of `FORMATS`
+        ids: integer segment ids
+        flow: (segments, steps) array of flow
+        start: simulation start time
+        interval: seconds between output steps
+        substeps: routing steps per output step, only used by the `csv` (flowveldepth) format
+    """
+    steps = flow.shape[1]
+    times = _times(start, steps, interval)
+    if format == "csv":
+        # flowveldepth: one row per segment, `(step, variable)` columns for each routing step
+        q = np.repeat(flow, substeps, axis=1)
+        columns = [f"({k}, '{v}')" for k in range(q.shape[1]) for v in ("q", "v", "d")]
+        data = np.zeros((len(ids), len(columns)))
+        data[:, 0::3] = q
+        pd.DataFrame(data, index=pd.Index(ids, name=""), columns=columns).to_csv(path)
+        return
+
+    long = pd.DataFrame({
+        "feature_id": np.repeat(ids, steps),
+        "time": np.tile(times.values, len(ids)),
+        "flow": flow.ravel(),
+    })
+    if format in ("stream_v1", "stream_v2"):
+        df = pd.DataFrame({"": long["feature_id"], " ": "wb"})
+        # format times once per step rather than once per row
+        if format == "stream_v1":
+            df["t0"] = start.strftime("%Y-%m-%d %H:%M:%S")
+            df["time"] = np.tile((times - start).astype(str).values, len(ids))
+        else:
+            df["current_time"] = np.tile(times.strftime("%Y-%m-%d %H:%M:%S").values, len(ids))
+        df["flow"] = long["flow"]
+        df["velocity"] = 0.0
+        df["depth"] = 0.0
+        df["nudge"] = -9999.0
+        df.to_csv(path, index=False, header=["", ""] + list(df.columns[2:]))
+    elif format == "parquet":
+        pd.DataFrame({
+            "location_id": "wb-" + long["feature_id"].astype(str),
+            "value": long["flow"],
+            "value_time": long["time"],
+            "variable_name": "streamflow",
+            "units": "m3/s",
+            "reference_time": start,
+            "configuration": None,
+        }).to_parquet(path)
+    elif format == "netcdf":
+        # NOTE: guarded import this is optional feature
+        try:
+            import xarray as xr
+        except ImportError as e:
+            raise RuntimeError(
+                "`ngen.cal` not installed with `netcdf` support. Re-install with feature flag `[netcdf]`"
+            ) from e
+        zeros = np.zeros_like(flow)
+        xr.Dataset(
+            {
+                "flow": (("feature_id", "time"), flow),
+                "velocity": (("feature_id", "time"), zeros),
+                "depth": (("feature_id", "time"), zeros),
+            },
+            coords={"feature_id": ids, "time": times},
+        ).to_netcdf(path)
+    else:
+        raise ValueError(f"unsupported output format: {format}")
+
+
+def _write_feature_outputs(workdir: Path, ids: Sequence[int], flow: np.ndarray, times: pd.DatetimeIndex) -> None:
+    """Write ngen's per catchment and nexus csv outputs"""
+    for id, q in zip(ids, flow):
+        df = pd.DataFrame({"Time": times.strftime("%Y-%m-%d %H:%M:%S"), "Q_OUT": q})
+        df.to_csv(workdir/f"cat-{id}.csv")
+        df.to_csv(workdir/f"nex-{id}_output.csv", header=False)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Synthetic stand-in for the ngen executable.")
+    # ngen's positional arguments, catchment and nexus subsets are ignored
+    parser.add_argument("catchment_data", help="catchment hydrofabric (ignored)")
+    parser.add_argument("catchment_subset", help="catchment subset (ignored)")
+    parser.add_argument("nexus_data", help="nexus hydrofabric (ignored)")
+    parser.add_argument("nexus_subset", help="nexus subset (ignored)")
+    parser.add_argument("realization", type=Path, help="realization config")
+    parser.add_argument("partitions", nargs="?", help="partition config (ignored)")
+    parser.add_argument("--segments", type=int, default=None,
+                        help="number of routing segments to output, at least one per realization catchment")
+    parser.add_argument("--sleep", type=float, default=0.0, help="seconds to sleep, simulating model run time")
+    parser.add_argument("--output", type=Path, default=Path("flowveldepth_Ngen.csv"), help="routing output file")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="routing output format, defaults to the format implied by the output file suffix")
+    parser.add_argument("--substeps", type=int, default=12,
+                        help="routing steps per output interval of the `csv` format")
+    parser.add_argument("--feature-outputs", action="store_true",
+                        help="also write per catchment (cat-*.csv) and nexus (nex-*.csv) outputs")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = _parser().parse_args(argv)
+    format = args.format or {".parquet": "parquet", ".nc": "netcdf"}.get(args.output.suffix.lower(), "csv")
+
+    with open(args.realization) as fp:
+        realization = json.load(fp)
+    start = pd.Timestamp(realization["time"]["start_time"])
+    end = pd.Timestamp(realization["time"]["end_time"])
+    interval = int(realization["time"].get("output_interval", 3600))
+    # output steps end at, and exclude, the start time
+    steps = len(pd.date_range(start, end, freq=f"{interval}s")) - 1
+
+    catchments = _catchment_params(realization)
+    ids = _segments(list(catchments), args.segments)
+    # segments without catchment specific parameters use the global formulation
+    global_params = _model_params((realization.get("global", {}).get("formulations") or [{}])[0])
+    flow = hydrograph([catchments.get(id, global_params) for id in ids], steps, interval)
+
+    if args.sleep > 0:
+        time.sleep(args.sleep)
+    if args.feature_outputs:
+        _write_feature_outputs(args.output.parent, ids[:len(catchments)], flow, _times(start, steps, interval))
+    write_output(args.output, format, ids, flow, start, interval, args.substeps)
+
+
+if __name__ == "__main__":
+    main()
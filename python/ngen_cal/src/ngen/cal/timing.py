@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from ngen.cal import hookimpl
+
+if TYPE_CHECKING:
+    from typing import Iterable, Iterator, Mapping
+
+#phases of a calibration iteration, in the order they occur
+PHASES = ("update_config", "model_run", "output", "objective", "check_point")
+
+
+class PhaseTimer:
+    """
+        Accumulates the wall clock time, in seconds, spent in each phase of the current calibration iteration
+    """
+
+    def __init__(self):
+        self._timings: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as part of phase `name`"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._timings[name] = self._timings.get(name, 0.0) + perf_counter() - start
+
+    def pop(self) -> dict[str, float]:
+        """Return the phase timings of the current iteration and start timing the next one"""
+        timings, self._timings = self._timings, {}
+        return timings
+
+
+def sum_timings(timings: Iterable[Mapping[str, float]]) -> dict[str, float]:
+    """Total the phase timings of several runs, e.g. the particles of a PSO iteration"""
+    total: dict[str, float] = {}
+    for t in timings:
+        for phase, seconds in t.items():
+            total[phase] = total.get(phase, 0.0) + seconds
+    return total
+
+
+class TimingSummary:
+    """
+        Built-in plugin which collects the phase timings of each iteration and prints
+        a summary table when calibration finishes
+    """
+
+    def __init__(self):
+        self._timings: dict[int, Mapping[str, float]] = {}
+
+    @hookimpl
+    def ngen_cal_iteration_timing(self, iteration: int, timings: Mapping[str, float]) -> None:
+        self._timings[iteration] = dict(timings)
+
+    @hookimpl
+    def ngen_cal_finish(self, exception: Exception | None) -> None:
+        if self._timings:
+            print(f"Iteration phase timings (seconds) over {len(self._timings)} iterations")
+            print(self.summary().to_string(float_format="{:.3f}".format))
+
+    def summary(self) -> pd.DataFrame:
+        """
+            Total, mean and max time spent in each phase, and each phase's percentage of the total time
+        """
+        df = pd.DataFrame.from_dict(self._timings, orient="index")
+        order = [p for p in PHASES if p in df.columns] + [p for p in df.columns if p not in PHASES]
+        summary = df[order].agg(["sum", "mean", "max"]).T
+        summary.columns = ["total", "mean", "max"]
+        summary.index.name = "phase"
+        summary["percent"] = 100 * summary["total"] / summary["total"].sum()
+        return summary
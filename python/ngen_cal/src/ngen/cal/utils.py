@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import errno
+import os
+import shutil
 from contextlib import contextmanager
+from fnmatch import fnmatchcase
 from os import getcwd, chdir
 from typing import Callable, TYPE_CHECKING
 from types import ModuleType
@@ -8,7 +12,7 @@ from pydantic import errors as pydantic_errors
 from pydantic.validators import str_validator
 if TYPE_CHECKING:
     from pathlib import Path
-    from typing import Any
+    from typing import Any, Iterable, Mapping
     from pydantic.typing import CallableGenerator
 
 @contextmanager
@@ -28,6 +32,55 @@ def pushd(path: Path) -> None:
         #when finished, return to original working dir
         chdir(cwd)
 
+def scan_files(path: Path, patterns: Mapping[str, str]) -> dict[str, list[str]]:
+    """Classify the files directly in `path` by the first of `patterns` they match, with a single directory scan
+
+    Args:
+        path (Path): directory to scan
+        patterns (Mapping[str, str]): glob pattern of each class of files
+
+    Returns:
+        dict[str, list[str]]: names of the files matching each pattern, keyed like `patterns`
+    """
+    names = {key: [] for key in patterns}
+    with os.scandir(path) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            for key, pattern in patterns.items():
+                if fnmatchcase(entry.name, pattern):
+                    names[key].append(entry.name)
+                    break
+    return names
+
+def move_files(names: Iterable[str], src: Path, dst: Path) -> None:
+    """Move the files `names` from directory `src` to directory `dst`
+
+    Where supported, names are resolved relative to open descriptors of both directories
+    rather than looking up the full path of every file.  Files are copied if the
+    directories are on different file systems, e.g. from a node local scratch directory.
+    """
+    if os.rename not in os.supports_dir_fd:
+        for name in names:
+            shutil.move(src/name, dst/name)
+        return
+    flags = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+    src_fd = os.open(src, flags)
+    try:
+        dst_fd = os.open(dst, flags)
+        try:
+            for name in names:
+                try:
+                    os.rename(name, name, src_dir_fd=src_fd, dst_dir_fd=dst_fd)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(src/name, dst/name)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
 def import_from_string(path: str) -> Any:
     """Import an object or module from a string."""
     from importlib import import_module
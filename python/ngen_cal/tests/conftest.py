@@ -156,6 +156,9 @@ def catchment(nexus, fabric, workdir, mocker) -> Generator[CalibrationCatchment,
                 new_callable=mocker.PropertyMock,
                 return_value = output
                 )
+    mocker.patch('ngen.cal.calibration_cathment.EvaluatableCatchment.get_output',
+                return_value = output
+                )
     #Disable output saving for testing purpose
     mocker.patch('ngen.cal.calibration_cathment.AdjustableCatchment.save_output',
                 return_value=None)
@@ -27,3 +27,37 @@ def test_update_config(agent: 'Agent', realization_config: str) -> None:
 
 #FIXME expand update unit tests...specifically that optmizing min/max and values
 #is consistent, for example
+
+def test_job_scratch_dir(tmp_path: Path) -> None:
+    """
+        Ensure jobs with a scratch directory run there and move what is left to the workdir when closed
+    """
+    from ngen.cal.meta import JobMeta
+
+    scratch = tmp_path/"scratch"
+    scratch.mkdir()
+    job = JobMeta("ngen", tmp_path, scratch_dir=scratch)
+    assert job.run_dir.parent == scratch
+    assert job.workdir.parent == tmp_path.resolve()
+    (job.run_dir/"cat-1.csv").write_text("output")
+
+    job.close()
+    assert job.run_dir == job.workdir
+    assert list(scratch.iterdir()) == []
+    assert (job.workdir/"cat-1.csv").read_text() == "output"
+
+@pytest.mark.usefixtures("agent")
+def test_rng_state(agent: 'Agent') -> None:
+    """
+        Ensure duplicated agents draw from independent streams and a saved stream resumes where it left off
+    """
+    duplicate = agent.duplicate()
+    first = duplicate.rng.random()
+    assert agent.rng.random() != first
+
+    agent.save_rng_state()
+    expected = agent.rng.random(3)
+    agent._load_rng_state()
+    assert (agent.rng.random(3) == expected).all()
+    # agents duplicated after restoring the state draw from new child streams
+    assert agent.duplicate().rng.random() != first
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from ngen.cal.async_execution import AsyncExecutor
+
+
+def test_concurrent_runs(tmp_path: Path):
+    """
+    Test runs execute concurrently in their own working directories and stream output to their logs
+    """
+    workdirs = [tmp_path / "a", tmp_path / "b"]
+    for workdir in workdirs:
+        workdir.mkdir()
+    executor = AsyncExecutor(max_concurrent=2)
+
+    async def run_all():
+        return await asyncio.gather(
+            *(executor.run("sh -c 'pwd; sleep 0.5'", workdir, workdir / "run.log") for workdir in workdirs)
+        )
+
+    results = asyncio.run(run_all())
+    for workdir, result in zip(workdirs, results):
+        assert result.returncode == 0
+        assert not result.timed_out
+        assert (workdir / "run.log").read_text().strip() == str(workdir)
+    assert Path.cwd() not in workdirs
+
+
+def test_run_timeout(tmp_path: Path):
+    """
+    Test runs exceeding their time limit are killed and reported
+    """
+    executor = AsyncExecutor()
+    result = asyncio.run(executor.run("sleep 10", tmp_path, timeout=0.1))
+    assert result.timed_out
+    assert result.returncode is None
+    assert result.duration < 5
+
+
+def test_runs_across_event_loops(tmp_path: Path):
+    """
+    Test an executor limiting concurrency is reusable from successive event loops, e.g. PSO generations
+    """
+    executor = AsyncExecutor(max_concurrent=1)
+
+    async def run_all():
+        return await asyncio.gather(*(executor.run("true", tmp_path) for _ in range(3)))
+
+    for _ in range(2):
+        results = asyncio.run(run_all())
+        assert [r.returncode for r in results] == [0, 0, 0]
+
+
+def test_shell_command(tmp_path: Path):
+    """
+    Test commands are run through a shell, like model runs of DDS search, e.g. with environment assignments and redirection
+    """
+    executor = AsyncExecutor()
+    result = asyncio.run(executor.run("MODEL=ngen sh -c 'echo $MODEL' > out.txt && echo done", tmp_path, tmp_path / "run.log"))
+    assert result.returncode == 0
+    assert (tmp_path / "out.txt").read_text().strip() == "ngen"
+    assert (tmp_path / "run.log").read_text().strip() == "done"
+
+
+def test_shell_timeout_kills_children(tmp_path: Path):
+    """
+    Test the shell's children are killed along with it when the run exceeds its time limit
+    """
+    executor = AsyncExecutor()
+    result = asyncio.run(executor.run("sleep 10; touch late.txt", tmp_path, timeout=0.1))
+    assert result.timed_out
+    assert result.duration < 5
+    assert not (tmp_path / "late.txt").exists()
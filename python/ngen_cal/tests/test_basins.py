@@ -0,0 +1,89 @@
+import threading
+
+import pandas as pd
+import pytest
+from ngen.cal.basins import Basin, best_params, gage_basins, schedule, upstream_catchments
+
+#      cat-1   cat-2
+#         \    /
+#  cat-3  cat-4*   cat-5*
+#     \    /        /
+#      cat-6      /
+#         \      /
+#          cat-7*
+#             |
+#           cat-8
+downstream = {
+    "cat-1": "cat-4",
+    "cat-2": "cat-4",
+    "cat-3": "cat-6",
+    "cat-4": "cat-6",
+    "cat-5": "cat-7",
+    "cat-6": "cat-7",
+    "cat-7": "cat-8",
+    "cat-8": None,
+}
+gaged = ["cat-4", "cat-5", "cat-7"]
+
+
+def test_gage_basins():
+    basins = gage_basins(downstream, gaged)
+    assert set(basins) == set(gaged)
+    assert sorted(basins["cat-4"].catchments) == ["cat-1", "cat-2", "cat-4"]
+    assert basins["cat-5"].catchments == ["cat-5"]
+    assert sorted(basins["cat-7"].catchments) == ["cat-3", "cat-6", "cat-7"]
+    assert basins["cat-4"].upstream == []
+    assert sorted(basins["cat-7"].upstream) == ["cat-4", "cat-5"]
+    # cat-8 does not drain to a gage
+    assert not any("cat-8" in b.catchments for b in basins.values())
+    assert sorted(upstream_catchments(basins, "cat-7")) == ["cat-1", "cat-2", "cat-4", "cat-5"]
+
+
+def test_gage_basins_cycle():
+    with pytest.raises(ValueError):
+        gage_basins({"cat-1": "cat-2", "cat-2": "cat-1"}, ["cat-3"])
+
+
+def test_schedule():
+    basins = gage_basins(downstream, gaged)
+    order = []
+    headwaters = threading.Barrier(2, timeout=10)
+
+    def run(basin: Basin) -> None:
+        if not basin.upstream:
+            # both headwater basins run concurrently
+            headwaters.wait()
+        order.append(basin.id)
+
+    schedule(basins, run, workers=2)
+    assert sorted(order[:2]) == ["cat-4", "cat-5"]
+    assert order[2] == "cat-7"
+
+
+def test_schedule_failure():
+    basins = gage_basins(downstream, gaged)
+    order = []
+
+    def run(basin: Basin) -> None:
+        if basin.id == "cat-4":
+            raise RuntimeError("calibration failed")
+        order.append(basin.id)
+
+    with pytest.raises(RuntimeError):
+        schedule(basins, run, workers=1)
+    assert "cat-7" not in order
+
+
+def test_best_params(tmp_path):
+    job = tmp_path / "202401010000_ngen_abc_worker"
+    job.mkdir()
+    (job / "best_params.txt").write_text("3\n2\n0.5\n")
+    for id, value in [("cat-1", 1.0), ("cat-2", 2.0)]:
+        df = pd.DataFrame({"param": ["b", "satdk"], "model": "CFE", "0": [0.0, 0.0], "2": [value, value * 10]})
+        df.to_parquet(job / f"{id}_parameter_df_state.parquet")
+
+    params = best_params(tmp_path, ["cat-1", "cat-2"])
+    assert params == {
+        "cat-1": {"CFE": {"b": 1.0, "satdk": 10.0}},
+        "cat-2": {"CFE": {"b": 2.0, "satdk": 20.0}},
+    }
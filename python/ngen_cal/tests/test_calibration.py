@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+import pytest
+
+from ngen.cal import hookimpl
+from ngen.cal._hookspec import ModelHooks
+from ngen.cal._plugin_system import setup_scoped_plugin_manager
+from ngen.cal.calibration import Calibration, Domain, ObservationCache
+from ngen.cal.configuration import Model
+
+from .utils import model_params
+
+if TYPE_CHECKING:
+    from hypy.nexus import Nexus
+
+    from ngen.cal.configuration import General
+
+data_dir = Path(__file__).parent/"data"
+
+
+@pytest.fixture
+def domain(realization_config, workdir) -> Domain:
+    model = {"type": "ngen",
+             "strategy": "explicit",
+             "realization": str(realization_config),
+             "catchments": str(data_dir/"catchment_data.geojson"),
+             "nexus": str(data_dir/"nexus_data.geojson"),
+             "crosswalk": str(data_dir/"crosswalk.json"),
+             "binary": "echo ngen",
+             **model_params}
+    return Domain(model, Path(workdir))
+
+
+class CountingObservations:
+    calls = 0
+
+    @hookimpl
+    def ngen_cal_model_observations(self, nexus, start_time, end_time, simulation_interval) -> pd.Series:
+        CountingObservations.calls += 1
+        return pd.Series([1.0, 2.0, 3.0], name="value")
+
+
+def test_observation_cache(nexus: Nexus) -> None:
+    """
+        Ensure models sharing an observation cache only retrieve the observations of a gage once
+    """
+    observations = {}
+    start, end = pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-02")
+    interval = pd.Timedelta(3600, unit="s")
+    for _ in range(3):
+        pm = setup_scoped_plugin_manager(ModelHooks, [CountingObservations])
+        pm.register(ObservationCache(observations, pm))
+        obs = pm.hook.ngen_cal_model_observations(nexus=nexus, start_time=start, end_time=end, simulation_interval=interval)
+        obs.rename("obs_flow", inplace=True)
+        assert obs.tolist() == [1.0, 2.0, 3.0]
+    assert CountingObservations.calls == 1
+    assert next(iter(observations.values())).name == "value"
+
+
+def test_domain_model(domain: Domain) -> None:
+    """
+        Ensure models built from a domain share its hydrofabric and observations, and copy its realization
+    """
+    models = [Model(model={**domain.model, "domain": domain}).model.unwrap() for _ in range(2)]
+    assert models[0]._catchment_hydro_fabric is models[1]._catchment_hydro_fabric
+    assert models[0]._x_walk is models[1]._x_walk
+    assert models[0].ngen_realization == domain.realization
+    assert models[0].ngen_realization is not models[1].ngen_realization
+    caches = [[p for p in m._plugin_manager.get_plugins() if isinstance(p, ObservationCache)] for m in models]
+    assert [len(c) for c in caches] == [1, 1]
+    assert caches[0][0]._observations is caches[1][0]._observations
+
+
+def test_calibration_overrides(domain: Domain, general_config: General) -> None:
+    """
+        Ensure calibrations can override the domain's model configuration, but not the keys defining the domain
+    """
+    for key in ("realization", "catchments", "workdir"):
+        with pytest.raises(ValueError, match=key):
+            Calibration(domain, general_config, {key: "other"})
+    calibration = Calibration(domain, general_config, {"eval_params": {"objective": "nnse"}})
+    assert calibration._model["eval_params"] == {"objective": "nnse"}
+    assert calibration._model["realization"] == domain.model["realization"]
+    assert calibration.general.workdir.is_absolute()
+
+
+def test_calibration_run(domain: Domain, general_config: General, tmp_path: Path, monkeypatch, mocker) -> None:
+    """
+        Ensure a calibration runs from a working directory other than its workdir, without writing to it
+    """
+    from hypy.hydrolocation import NWISLocation
+
+    times = pd.date_range("2015-12-01 00:00:00", "2015-12-30 23:00:00", freq="H")
+    mocker.patch.object(NWISLocation, "get_data", return_value=pd.DataFrame({"value": 1.0, "value_time": times}))
+    # the "model" copies a fixed output to its run directory, the model's arguments are ignored
+    output = tmp_path/"tst-1.csv"
+    pd.DataFrame({"Time": times, "Q_OUT": 0.001}).to_csv(output, index=False)
+    workdir = tmp_path/"workdir"
+    workdir.mkdir()
+    cwd = tmp_path/"cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+
+    general = general_config.copy(update={"workdir": workdir, "iterations": 2, "restart": False})
+    agent = Calibration(domain, general, {"binary": f"sh -c 'cp \"{output}\" .'"}).run()
+
+    assert list(cwd.iterdir()) == []
+    assert agent.job.workdir.parent == workdir
+    catchment = agent.model.adjustables[0]
+    assert [catchment.eval_params.score(i) is not None for i in range(3)] == [True]*3
+    assert (agent.job.workdir/catchment.eval_params.objective_log_file).exists()
+    assert (agent.job.workdir/catchment.eval_params.param_log_file).exists()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ngen.cal.estimate import extrapolate, run_logs, tree_size
+from ngen.cal.resources import RUN_LOG
+from ngen.cal.strategy import Algorithm
+
+
+def _runs(jobs: int, iterations: int) -> pd.DataFrame:
+    return pd.DataFrame([
+        {"iteration": i, "wall_time": 10.0, "user_time": 15.0, "system_time": 5.0, "max_rss": 1024,
+         "bytes_written": 100, "timed_out": False, "kind": "model", "job": f"{j}_worker"}
+        for j in range(jobs) for i in range(iterations)
+    ])
+
+
+def test_extrapolate_dds() -> None:
+    """
+        Ensure DDS estimates one model run per iteration, including the initial iteration
+    """
+    estimate = extrapolate(_runs(1, 3), 3000, 99, Algorithm.dds, {}, 2.0, "sample", cpus=8, memory=2**30)
+    assert estimate.iterations == 100
+    assert estimate.runs == 100
+    assert estimate.pool == 1
+    assert estimate.cores == pytest.approx(2.0)
+    assert estimate.wall_time == pytest.approx(100*12.0)
+    assert estimate.disk == 100*1000
+
+
+def test_extrapolate_pso_pool() -> None:
+    """
+        Ensure the PSO pool is limited by the particles, the cores and the memory used by model runs
+    """
+    runs = _runs(4, 2)
+    # 2 cores per run
+    assert extrapolate(runs, 0, 10, Algorithm.pso, {"particles": 4}, None, "history", cpus=6, memory=2**30).pool == 3
+    assert extrapolate(runs, 0, 10, Algorithm.pso, {"particles": 2}, None, "history", cpus=64, memory=2**30).pool == 2
+    estimate = extrapolate(runs, 8000, 10, Algorithm.pso, {"particles": 4}, None, "history", cpus=64, memory=2048)
+    assert estimate.pool == 2
+    assert estimate.runs == 40
+    # 2 rounds of concurrent runs per iteration
+    assert estimate.wall_time == pytest.approx(10*2*10.0)
+    assert estimate.disk == 40*1000
+    assert "unknown per iteration" in str(estimate)
+
+
+def test_run_logs(tmp_path: Path) -> None:
+    """
+        Ensure the run logs of the jobs in a workdir are read, tagged by job
+    """
+    assert run_logs(tmp_path) is None
+    for job in ("a_worker", "b_worker"):
+        (tmp_path/job).mkdir()
+        _runs(1, 2).drop(columns="job").to_csv(tmp_path/job/RUN_LOG, index=False)
+    runs = run_logs(tmp_path)
+    assert len(runs) == 4
+    assert set(runs["job"]) == {"a_worker", "b_worker"}
+    assert tree_size(tmp_path) == sum((tmp_path/job/RUN_LOG).stat().st_size for job in ("a_worker", "b_worker"))
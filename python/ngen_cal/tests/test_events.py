@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import socket
+from pathlib import Path
+from types import SimpleNamespace
+
+from ngen.cal.events import EventStream
+from ngen.cal.resources import RunResources
+
+
+def _run(plugin: EventStream) -> None:
+    plugin.ngen_cal_start()
+    plugin.ngen_cal_iteration_start(iteration=1)
+    plugin.ngen_cal_iteration_timing(iteration=1, timings={"model_run": 2.0})
+    plugin.ngen_cal_model_run(iteration=1, run=RunResources(2.0, 1.0, 0.5, 1024, 10, False))
+    plugin.ngen_cal_iteration_finish(iteration=1, score=float("inf"), best_score=0.5, best_iteration=0)
+    plugin.ngen_cal_finish(exception=None)
+
+
+def test_event_stream_file(tmp_path: Path) -> None:
+    """
+        Ensure progress events are written to the configured file as JSON lines
+    """
+    plugin = EventStream()
+    config = SimpleNamespace(name="test", workdir=tmp_path, plugin_settings={"event_stream": {"path": "events.jsonl"}})
+    plugin.ngen_cal_configure(config=config)
+    _run(plugin)
+
+    events = [json.loads(line) for line in (tmp_path/"events.jsonl").read_text().splitlines()]
+    assert [e["event"] for e in events] == ["start", "iteration_start", "iteration_finish", "finish"]
+    assert all(e["name"] == "test" for e in events)
+    finish = events[2]
+    assert finish["score"] is None
+    assert finish["best_score"] == 0.5
+    assert finish["timings"] == {"model_run": 2.0}
+    assert finish["model_runs"][0]["max_rss"] == 1024
+    assert events[3]["status"] == "ok"
+
+
+def test_event_stream_socket(tmp_path: Path) -> None:
+    """
+        Ensure progress events are sent to the configured unix socket
+    """
+    path = tmp_path/"events.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(1)
+    plugin = EventStream()
+    config = SimpleNamespace(name="test", workdir=tmp_path, plugin_settings={"event_stream": {"socket": str(path)}})
+    plugin.ngen_cal_configure(config=config)
+    connection, _ = server.accept()
+    _run(plugin)
+
+    with connection, server, connection.makefile() as stream:
+        events = [json.loads(line) for line in stream]
+    assert [e["event"] for e in events] == ["start", "iteration_start", "iteration_finish", "finish"]
+
+
+def test_event_stream_disabled(tmp_path: Path) -> None:
+    """
+        Ensure nothing is written without settings
+    """
+    plugin = EventStream()
+    plugin.ngen_cal_configure(config=SimpleNamespace(name="test", workdir=tmp_path, plugin_settings={}))
+    _run(plugin)
+    assert list(tmp_path.iterdir()) == []
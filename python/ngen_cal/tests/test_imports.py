@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+"""
+    Test importing ngen.cal does not import heavy dependencies, which are instead imported on first use.
+    Uses `python -X importtime` in a fresh interpreter.
+"""
+
+#top level packages only needed by some code paths
+LAZY = ("geopandas", "matplotlib", "pyswarms", "hydrotools.metrics")
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Cumulative import time, in microseconds, of each module imported by `statement`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    # lines look like: "import time:       123 |       4567 |   module.name"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("statement", ["import ngen.cal", "import ngen.cal.search", "import ngen.cal.configuration"])
+def test_lazy_imports(statement: str):
+    times = import_times(statement)
+    assert "ngen.cal" in times
+    imported = [name for name in times if name.startswith(LAZY)]
+    assert imported == [], f"`{statement}` imported {imported}"
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from ngen.cal.metrics import Histogram, PrometheusExporter
+from ngen.cal.resources import RunResources
+
+
+def test_histogram() -> None:
+    h = Histogram([1, 10])
+    for value in (0.5, 1, 5, 20):
+        h.observe(value)
+    assert list(h.samples("d", {"name": "x"})) == [
+        'd_bucket{name="x",le="1.0"} 2',
+        'd_bucket{name="x",le="10.0"} 3',
+        'd_bucket{name="x",le="+Inf"} 4',
+        'd_sum{name="x"} 26.5',
+        'd_count{name="x"} 4',
+    ]
+
+
+def test_prometheus_exporter(tmp_path: Path) -> None:
+    """
+        Ensure calibration metrics are written in the prometheus text format
+    """
+    plugin = PrometheusExporter()
+    settings = {"prometheus": {"path": "ngen_cal.prom", "labels": {"basin": 'a"b'}}}
+    plugin.ngen_cal_configure(config=SimpleNamespace(name="test", workdir=tmp_path, plugin_settings=settings))
+    plugin.ngen_cal_iteration_timing(iteration=1, timings={"output": 0.2, "model_run": 2.0})
+    plugin.ngen_cal_model_run(iteration=1, run=RunResources(2.0, 1.0, 0.5, 1024, 10, False))
+    plugin.ngen_cal_model_run(iteration=1, run=RunResources(1.0, 0.5, 0.1, 1024, 10, False, "partial"))
+    plugin.ngen_cal_iteration_finish(iteration=1, score=float("inf"), best_score=0.5, best_iteration=0)
+
+    lines = (tmp_path/"ngen_cal.prom").read_text().splitlines()
+    labels = 'name="test",basin="a\\"b"'
+    assert f"ngen_cal_iterations_total{{{labels}}} 1" in lines
+    assert f'ngen_cal_model_runs_total{{{labels},kind="partial"}} 1' in lines
+    assert f'ngen_cal_model_run_duration_seconds_count{{{labels}}} 2' in lines
+    assert f'ngen_cal_phase_duration_seconds_sum{{{labels},phase="output"}} 0.2' in lines
+    assert f"ngen_cal_score{{{labels}}} +Inf" in lines
+    assert f"ngen_cal_best_score{{{labels}}} 0.5" in lines
+    assert "# TYPE ngen_cal_model_run_duration_seconds histogram" in lines
+    assert [p.name for p in tmp_path.iterdir()] == ["ngen_cal.prom"]
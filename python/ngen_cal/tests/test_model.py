@@ -33,6 +33,44 @@ def test_update_1(eval: 'EvaluationOptions') -> None:
     assert eval.best_score == 0.1
     assert eval.best_params == '1'
 
+def test_improves(eval: 'EvaluationOptions') -> None:
+    """
+        Test score comparison honors the objective target
+    """
+    assert eval.improves(0.1, 0.5)
+    assert not eval.improves(0.5, 0.1)
+    eval.target = 'max'
+    assert eval.improves(0.5, 0.1)
+    eval.target = 1.0
+    assert eval.improves(0.9, 0.5)
+
+def test_aggregate(eval: 'EvaluationOptions') -> None:
+    """
+        Test aggregation of the scores of several gages
+    """
+    scores = {'wb-1': 1.0, 'wb-2': 2.0, 'wb-3': 6.0}
+    assert eval.aggregate(scores) == 3.0
+    eval.weights = {'wb-3': 0.0}
+    assert eval.aggregate(scores) == 1.5
+    eval.aggregation = 'min'
+    assert eval.aggregate(scores) == 1.0
+    eval.aggregation = 'max'
+    assert eval.aggregate(scores) == 6.0
+    eval.aggregation = 'median'
+    assert eval.aggregate(scores) == 2.0
+
+def test_timeout_for() -> None:
+    """
+        Test the adaptive model run time limit
+    """
+    from ngen.cal.model import ExecutionOptions
+    options = ExecutionOptions(timeout=100, timeout_factor=2, timeout_samples=3)
+    assert options.timeout_for([]) == 100
+    assert options.timeout_for([10, 20, 30]) == 40
+    assert options.timeout_for([100, 200, 300]) == 100
+    assert ExecutionOptions().timeout_for([10, 20, 30]) is None
+    assert ExecutionOptions().penalty_score('max') == float('-inf')
+
 def test_restart(ngen_config: 'Ngen') -> None:
     """
         Test restarting from minimal meta, no logs available
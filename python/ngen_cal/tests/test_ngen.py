@@ -9,6 +9,9 @@ from ngen.cal.ngen import (
     NgenIndependent,
     NgenStrategy,
     NgenUniform,
+    _forcing_index,
+    _ngen_args,
+    _write_routing_config,
 )
 
 
@@ -40,3 +43,140 @@ def test_NgenBase_verify_realization(ngen_config: Ngen):
 
     with pytest.raises(pydantic.ValidationError):
         Ngen.parse_obj(dict(config))
+
+
+def test_forcing_index(tmp_path: pathlib.Path):
+    for name in ["cat-1_forcing.csv", "cat-12_forcing.csv", "cat-3_forcing.nc", "README"]:
+        (tmp_path / name).touch()
+
+    index = _forcing_index(tmp_path, "{{id}}_.*.csv", ["cat-1", "cat-12", "cat-3", "cat-4"])
+    assert index == {
+        "cat-1": (tmp_path / "cat-1_forcing.csv").resolve(),
+        "cat-12": (tmp_path / "cat-12_forcing.csv").resolve(),
+    }
+
+
+def test_forcing_index_without_id(tmp_path: pathlib.Path):
+    (tmp_path / "forcing.csv").touch()
+
+    index = _forcing_index(tmp_path, "forcing.csv", ["cat-1", "cat-2"])
+    assert index == {id: (tmp_path / "forcing.csv").resolve() for id in ["cat-1", "cat-2"]}
+
+
+def test_catchment_gages():
+    import pandas as pd
+
+    o = NgenUniform.construct()
+    o._catchment_hydro_fabric = pd.DataFrame({"toid": ["nex-2", "nex-3", "nex-3"]}, index=["cat-1", "cat-2", "cat-3"])
+    o._nexus_hydro_fabric = pd.DataFrame(index=["nex-2", "nex-3"])
+    # crosswalk keyed by waterbody id and by catchment id
+    o._x_walk = pd.Series({"wb-1": "01000000", "cat-3": "03000000"})
+    o._flowpath_hydro_fabric = pd.DataFrame({"toid": ["nex-2", "nex-3", "nex-3"]}, index=["wb-1", "wb-2", "wb-3"])
+
+    gages = o._catchment_gages()
+    assert gages["toid"].to_dict() == {"cat-1": "nex-2", "cat-2": "nex-3", "cat-3": "nex-3"}
+    assert gages["gage"].dropna().to_dict() == {"cat-1": "01000000", "cat-3": "03000000"}
+
+    o.eval_feature = None
+    assert list(o._eval_gages(gages).index) == ["cat-1", "cat-3"]
+    # wb-2 is the first flowpath flowing into nex-3
+    o.eval_feature = "wb-2"
+    assert list(o._eval_gages(gages).index) == ["cat-3"]
+    o.eval_feature = ["wb-1", "wb-2"]
+    assert list(o._eval_gages(gages).index) == ["cat-1", "cat-3"]
+    # the gaged catchment's own waterbody
+    o.eval_feature = "wb-3"
+    assert list(o._eval_gages(gages).index) == ["cat-3"]
+    o.eval_feature = "wb-9"
+    with pytest.raises(RuntimeError):
+        o._eval_gages(gages)
+
+
+def test_catchment_gages_missing_nexus():
+    import pandas as pd
+
+    o = NgenUniform.construct()
+    o._catchment_hydro_fabric = pd.DataFrame({"toid": ["nex-2"]}, index=["cat-1"])
+    o._nexus_hydro_fabric = pd.DataFrame(index=["nex-3"])
+    o._x_walk = pd.Series(dtype=object)
+
+    with pytest.raises(RuntimeError, match="cat-1"):
+        o._catchment_gages()
+
+
+def test_write_routing_config(tmp_path: pathlib.Path):
+    import pandas as pd
+    import yaml
+
+    config = tmp_path / "troute.yaml"
+    config.write_text(yaml.safe_dump({"compute_parameters": {"cpu_pool": 1, "data_assimilation_parameters": {"qc_threshold": 1}}}))
+    params = pd.DataFrame({
+        "param": ["compute_parameters.data_assimilation_parameters.qc_threshold", "Kn"],
+        "model": ["t-route", "CFE"],
+        "1": [0.5, 0.1],
+    })
+
+    path = _write_routing_config(config, params, "1", tmp_path / "calibrated.yaml")
+    data = yaml.safe_load(path.read_text())
+    assert data == {"compute_parameters": {"cpu_pool": 1, "data_assimilation_parameters": {"qc_threshold": 0.5}}}
+    # the original configuration is unchanged
+    assert yaml.safe_load(config.read_text())["compute_parameters"]["data_assimilation_parameters"]["qc_threshold"] == 1
+
+
+def test_write_routing_config_scale(tmp_path: pathlib.Path):
+    import yaml
+
+    config = tmp_path / "troute.yaml"
+    config.write_text(yaml.safe_dump({"compute_parameters": {"forcing_parameters": {"dt": 300, "nts": 288}}}))
+
+    path = _write_routing_config(config, None, "1", tmp_path / "calibrated.yaml", scale=0.25)
+    assert yaml.safe_load(path.read_text()) == {"compute_parameters": {"forcing_parameters": {"dt": 300, "nts": 72}}}
+
+
+def test_routing_simulation_window(tmp_path: pathlib.Path):
+    from copy import deepcopy
+    from datetime import datetime
+
+    import pandas as pd
+    import yaml
+    from ngen.config.realization import NgenRealization
+
+    from .utils import config as realization
+
+    troute = tmp_path / "troute.yaml"
+    troute.write_text(yaml.safe_dump({"compute_parameters": {"forcing_parameters": {"dt": 3600, "nts": 720}}}))
+    o = NgenUniform.construct(realization=tmp_path / "realization.json")
+    o.ngen_realization = NgenRealization(**deepcopy(realization), routing={"t_route_config_file_with_path": troute})
+    params = pd.DataFrame({"param": ["some_param"], "model": ["CFE"], "1": [0.5]})
+    start, end = o.simulation_window
+
+    # a leading window routes a proportional number of time steps
+    o.set_simulation_window(start, start + (end - start) / 4)
+    o.update_config(1, params, path=tmp_path)
+    assert o.ngen_realization.routing.config == tmp_path / "troute_config.yaml"
+    assert yaml.safe_load(o.ngen_realization.routing.config.read_text())["compute_parameters"]["forcing_parameters"]["nts"] == 180
+    # and the full window every time step
+    o.set_simulation_window(start, end)
+    o.update_config(1, params, path=tmp_path)
+    assert yaml.safe_load(o.ngen_realization.routing.config.read_text())["compute_parameters"]["forcing_parameters"]["nts"] == 720
+    # t-route simulations start at the configured start time
+    with pytest.raises(ValueError):
+        o.set_simulation_window(datetime(2015, 12, 2), end)
+
+
+def test_partial_run(tmp_path: pathlib.Path):
+    import pandas as pd
+
+    o = NgenIndependent.construct(incremental=True, binary="ngen", hydrofabric=tmp_path / "fabric.gpkg", realization=tmp_path / "realization.json")
+    o.args = _ngen_args(o.hydrofabric, o.hydrofabric, o.realization)
+    o._catchment_hydro_fabric = pd.DataFrame({"toid": ["nex-1", "nex-1", "nex-2"]}, index=["cat-1", "cat-2", "cat-3"])
+
+    # catchments sharing the nexus of a changed catchment are re-simulated with it
+    cmd, simulated = o.partial_run(["cat-2"])
+    assert cmd == f'ngen {o.hydrofabric.resolve()} "cat-1,cat-2" {o.hydrofabric.resolve()} "nex-1" realization.json'
+    assert simulated == {"cat-1", "cat-2", "nex-1"}
+    # the whole domain
+    assert o.partial_run(["cat-1", "cat-3"]) is None
+    # custom args
+    o.args = "custom"
+    assert o.partial_run(["cat-2"]) is None
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import os
 import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import pandas as pd
 import pytest
+from ngen.cal import hookimpl
 from ngen.cal.ngen import NgenBase
 from ngen.cal.ngen_hooks.ngen_output import TrouteOutput
 from ngen.config.realization import NgenRealization
@@ -39,7 +44,7 @@ def test_ngen_cal_model_output(file: pathlib.Path, ngen_cal_model_config: NgenBa
     output.ngen_cal_model_configure(config=ngen_cal_model_config)
 
     feature = "wb-2420800"
-    df = output.get_output(id=feature)
+    df = output.get_output(id=feature, workdir=None)
     assert df is not None, "expect to receive pd.Series"
 
     dt = datetime.fromisoformat("2023-04-02 01:00:00")
@@ -47,3 +52,263 @@ def test_ngen_cal_model_output(file: pathlib.Path, ngen_cal_model_config: NgenBa
 
     # testing data is for a single day
     assert len(df) == 24
+
+
+class _ConstantObservations:
+    """observation plugin providing a constant hourly 1.0 series over the test data period"""
+
+    @hookimpl
+    def ngen_cal_model_observations(self, nexus, start_time, end_time, simulation_interval) -> pd.Series:
+        index = pd.date_range("2023-04-02 01:00:00", periods=24, freq="H")
+        return pd.Series(1.0, index=index)
+
+
+class _Barrier:
+    """output plugin which holds each caller until both concurrent evaluations are reading output"""
+
+    def __init__(self, parties: int) -> None:
+        self._barrier = threading.Barrier(parties, timeout=10)
+
+    @hookimpl(tryfirst=True)
+    def ngen_cal_model_output(self, id: str) -> None:
+        self._barrier.wait()
+        return None
+
+
+def test_concurrent_evaluation(tmp_path: pathlib.Path, ngen_cal_model_config: NgenBase):
+    """
+    Test calibration sets can be evaluated concurrently from different workdirs
+    without changing the process working directory
+    """
+    from hypy.catchment import Catchment
+    from hypy.nexus import Nexus
+    from ngen.cal._hookspec import ModelHooks
+    from ngen.cal._plugin_system import setup_scoped_plugin_manager
+    from ngen.cal.calibration_set import CalibrationSet
+    from ngen.cal.model import EvaluationOptions
+    from ngen.cal.search import _evaluate
+
+    output_file = pathlib.Path("troute_output.csv")
+    data = (data_dir / output_file).read_text()
+    # simulated flow of 1.0 matches observations, 0.0 does not
+    workdirs = {"exact": tmp_path / "exact", "zero": tmp_path / "zero"}
+    for name, workdir in workdirs.items():
+        workdir.mkdir()
+        text = data if name == "zero" else data.replace(",0.0,0.0,0.0,", ",1.0,0.0,0.0,")
+        (workdir / output_file).write_text(text)
+
+    output = TrouteOutput(output_file)
+    output.ngen_cal_model_configure(config=ngen_cal_model_config)
+    pm = setup_scoped_plugin_manager(ModelHooks, [_ConstantObservations])
+    pm.register(output)
+    pm.register(_Barrier(len(workdirs)))
+
+    def objective(obs, sim) -> float:
+        return float((obs - sim).abs().sum())
+
+    nexus = Nexus("nex-2420801", None, (), Catchment("cat-2420800", {}))
+    start = datetime.fromisoformat("2023-04-02 00:00:00")
+    end = datetime.fromisoformat("2023-04-03 00:00:00")
+    sets = {
+        name: CalibrationSet([], nexus, pm.hook, start, end, EvaluationOptions(objective=objective))
+        for name in workdirs
+    }
+
+    cwd = os.getcwd()
+    with ThreadPoolExecutor(max_workers=len(workdirs)) as pool:
+        futures = {name: pool.submit(_evaluate, 1, sets[name], workdir=workdirs[name]) for name in workdirs}
+        scores = {name: future.result() for name, future in futures.items()}
+
+    assert os.getcwd() == cwd
+    assert scores == {"exact": 0.0, "zero": 24.0}
+    for workdir in workdirs.values():
+        assert (workdir / "objective_log.txt").exists()
+
+
+def test_multi_gage_evaluation(tmp_path: pathlib.Path, ngen_cal_model_config: NgenBase, mocker):
+    """
+    Test a calibration set evaluates several gages from a single parse of the routing output
+    """
+    from hypy.catchment import Catchment
+    from hypy.nexus import Nexus
+    from ngen.cal._hookspec import ModelHooks
+    from ngen.cal._plugin_system import setup_scoped_plugin_manager
+    from ngen.cal.calibration_set import CalibrationSet
+    from ngen.cal.model import EvaluationOptions
+    from ngen.cal.search import _evaluate
+
+    output_file = pathlib.Path("troute_output.csv")
+    data = (data_dir / output_file).read_text()
+    header, rows = data.split("\n", 1)
+    # second feature with a simulated flow of 1.0, matching the observations
+    exact = rows.replace("2420800,", "2420801,").replace(",0.0,0.0,0.0,", ",1.0,0.0,0.0,")
+    (tmp_path / output_file).write_text(f"{header}\n{rows.rstrip()}\n{exact}")
+
+    output = TrouteOutput(output_file)
+    output.ngen_cal_model_configure(config=ngen_cal_model_config)
+    pm = setup_scoped_plugin_manager(ModelHooks, [_ConstantObservations])
+    pm.register(output)
+    parse = mocker.spy(output, "_factory_handler_csv")
+
+    def objective(obs, sim) -> float:
+        return float((obs - sim).abs().sum())
+
+    nexus = [
+        Nexus("nex-2420802", None, (), Catchment("cat-2420800", {})),
+        Nexus("nex-2420803", None, (), Catchment("cat-2420801", {})),
+    ]
+    start = datetime.fromisoformat("2023-04-02 00:00:00")
+    end = datetime.fromisoformat("2023-04-03 00:00:00")
+    eval_params = EvaluationOptions(objective=objective, weights={"wb-2420800": 3.0})
+    calibration_set = CalibrationSet([], nexus, pm.hook, start, end, eval_params)
+
+    # the relative output file is only found in the workdir passed to the output hook
+    assert not (pathlib.Path.cwd() / output_file).exists()
+    # weighted mean of 24.0 (wb-2420800) and 0.0 (wb-2420801)
+    assert _evaluate(1, calibration_set, workdir=tmp_path) == 18.0
+    assert parse.call_count == 1
+
+    eval_params.aggregation = "min"
+    assert _evaluate(2, calibration_set, workdir=tmp_path) == 0.0
+    assert parse.call_count == 1
+
+
+def test_scratch_evaluation(tmp_path: pathlib.Path, ngen_config, ngen_cal_model_config: NgenBase):
+    """
+    Test an iteration run in a scratch directory is scored from the outputs left in its run directory
+    """
+    from hypy.catchment import Catchment
+    from hypy.nexus import Nexus
+    from ngen.cal._hookspec import ModelHooks
+    from ngen.cal._plugin_system import setup_scoped_plugin_manager
+    from ngen.cal.agent import Agent
+    from ngen.cal.calibration_set import CalibrationSet
+    from ngen.cal.configuration import Model
+    from ngen.cal.model import EvaluationOptions
+    from ngen.cal.search import _evaluate, _execute
+
+    output_file = pathlib.Path("troute_output.csv")
+    model = Model(model=ngen_config.copy(deep=True))
+    # the "model" writes the routing output to its run directory, the model's arguments are ignored
+    model.model.unwrap().binary = f"sh -c 'cp \"{data_dir / output_file}\" .'"
+    agent = Agent(model, tmp_path, scratch_dir=tmp_path / "scratch")
+    assert agent.job.run_dir != agent.job.workdir
+
+    output = TrouteOutput(output_file)
+    output.ngen_cal_model_configure(config=ngen_cal_model_config)
+    pm = setup_scoped_plugin_manager(ModelHooks, [_ConstantObservations])
+    pm.register(output)
+
+    def objective(obs, sim) -> float:
+        return float((obs - sim).abs().sum())
+
+    nexus = Nexus("nex-2420801", None, (), Catchment("cat-2420800", {}))
+    start = datetime.fromisoformat("2023-04-02 00:00:00")
+    end = datetime.fromisoformat("2023-04-03 00:00:00")
+    calibration_set = CalibrationSet([], nexus, pm.hook, start, end, EvaluationOptions(objective=objective))
+
+    assert _execute(agent)
+    assert (agent.job.run_dir / output_file).exists()
+    assert not (agent.job.workdir / output_file).exists()
+    assert _evaluate(0, calibration_set, workdir=agent.job.workdir, timer=agent.timer, run_dir=agent.job.run_dir) == 24.0
+    assert calibration_set.eval_params.score(0) == 24.0
+    assert (agent.job.workdir / "objective_log.txt").exists()
+    agent.job.close()
+
+
+def test_archive_output(tmp_path: pathlib.Path):
+    """
+    Test an iteration's outputs are consolidated into one archive and read back by feature id
+    """
+    from types import SimpleNamespace
+    from ngen.cal.ngen_hooks.ngen_output import NgenArchiveOutput, read_archived_output
+
+    (tmp_path / "cat-1.csv").write_text("Time Step,Time,RAIN_RATE,Q_OUT\n0,2023-04-02 00:00:00,0.5,1.0\n1,2023-04-02 01:00:00,0.25,2.0\n")
+    (tmp_path / "nex-2_output.csv").write_text("0, 2023-04-02 00:00:00, 3.0\n1, 2023-04-02 01:00:00, 4.0\n")
+    (tmp_path / "flowveldepth_Ngen.csv").write_text("routing")
+
+    NgenArchiveOutput().ngen_cal_model_iteration_finish(1, SimpleNamespace(workdir=tmp_path, run_dir=tmp_path), None)
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["output_archive"]
+    assert (tmp_path / "output_archive/iteration=1/flowveldepth_Ngen.csv").exists()
+
+    df = read_archived_output(tmp_path, 1, ["nex-2"])
+    assert df["id"].unique().tolist() == ["nex-2"]
+    assert df["value"].tolist() == [3.0, 4.0]
+    df = read_archived_output(tmp_path, 1, ["cat-1"])
+    assert df.groupby("variable")["value"].sum().to_dict() == {"Q_OUT": 3.0, "RAIN_RATE": 0.75}
+
+
+def test_archive_output_iterations(tmp_path: pathlib.Path):
+    """
+    Test the archived outputs of every iteration are read back, alongside the saved routing outputs
+    """
+    from types import SimpleNamespace
+    from ngen.cal.ngen_hooks.ngen_output import NgenArchiveOutput, read_archived_output
+
+    plugin = NgenArchiveOutput()
+    for i in range(2):
+        (tmp_path / "cat-1.csv").write_text(f"Time Step,Time,Q_OUT\n0,2023-04-02 00:00:00,{i}.0\n")
+        (tmp_path / "nex-2_output.csv").write_text(f"0, 2023-04-02 00:00:00, {i + 10}.0\n")
+        (tmp_path / "flowveldepth_Ngen.csv").write_text("routing")
+        plugin.ngen_cal_model_iteration_finish(i, SimpleNamespace(workdir=tmp_path, run_dir=tmp_path), None)
+
+    df = read_archived_output(tmp_path)
+    assert df[["iteration", "id", "value"]].values.tolist() == [[0, "cat-1", 0.0], [0, "nex-2", 10.0], [1, "cat-1", 1.0], [1, "nex-2", 11.0]]
+    df = read_archived_output(tmp_path, ids=["nex-2"])
+    assert df["value"].tolist() == [10.0, 11.0]
+
+
+def test_output_retention(tmp_path: pathlib.Path):
+    """
+    Test saved outputs of iterations outside the retention policy are deleted or never saved
+    """
+    from types import SimpleNamespace
+    from ngen.cal.model import EvaluationOptions
+    from ngen.cal.ngen_hooks.ngen_output import NgenSaveOutput, OutputRetention
+
+    eval_params = EvaluationOptions()
+    plugin = NgenSaveOutput()
+    plugin.ngen_cal_model_configure(
+        SimpleNamespace(plugin_settings={"ngen_save_output": {"keep_best": 1, "keep_every": 4, "keep_last": 1}}, eval_params=eval_params)
+    )
+    assert plugin._retention == OutputRetention(keep_best=1, keep_every=4, keep_last=1)
+
+    scores = [5.0, 3.0, 4.0, 6.0, 7.0, 8.0]
+    for i, score in enumerate(scores):
+        (tmp_path / "cat-1.csv").write_text("cat")
+        (tmp_path / "nex-1_output.csv").write_text("nex")
+        (tmp_path / "flowveldepth_Ngen.csv").write_text("routing")
+        eval_params.update(i, score, log=False)
+        plugin.ngen_cal_model_iteration_finish(i, SimpleNamespace(workdir=tmp_path, run_dir=tmp_path), eval_params.score(i))
+
+    # 0 and 4 are every 4th iteration, 1 the best and 5 the last
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["output_0", "output_1", "output_4", "output_5"]
+    assert sorted(f.name for f in (tmp_path / "output_5").iterdir()) == ["cat-1.csv", "flowveldepth_Ngen.csv", "nex-1_output.csv"]
+
+
+def test_output_retention_restart(tmp_path: pathlib.Path):
+    """
+    Test outputs saved before a restart are deleted once the retention policy no longer keeps them
+    """
+    from types import SimpleNamespace
+    from ngen.cal.model import EvaluationOptions
+    from ngen.cal.ngen_hooks.ngen_output import NgenSaveOutput
+
+    eval_params = EvaluationOptions()
+    scores = [5.0, 3.0, 4.0, 6.0]
+    for i, score in enumerate(scores):
+        (tmp_path / f"output_{i}").mkdir()
+        eval_params.update(i, score, log=True, workdir=tmp_path)
+
+    plugin = NgenSaveOutput()
+    plugin.ngen_cal_model_configure(
+        SimpleNamespace(workdir=tmp_path, plugin_settings={"ngen_save_output": {"keep_best": 1, "keep_last": 1}}, eval_params=eval_params)
+    )
+    assert plugin._saved == dict(enumerate(scores))
+
+    (tmp_path / "cat-1.csv").write_text("cat")
+    eval_params.update(4, 7.0, log=True, workdir=tmp_path)
+    plugin.ngen_cal_model_iteration_finish(4, SimpleNamespace(workdir=tmp_path, run_dir=tmp_path), eval_params.score(4))
+
+    # 1 is the best and 4 the last
+    assert sorted(f.name for f in tmp_path.iterdir() if f.is_dir()) == ["output_1", "output_4"]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pstats
+from pathlib import Path
+from types import SimpleNamespace
+
+from ngen.cal.profiling import Profiler, ProfileOptions, paused
+
+
+def _work() -> int:
+    return sum(range(1000))
+
+
+def _model_run() -> int:
+    return sum(range(1000))
+
+
+def test_profiler(tmp_path: Path, capsys) -> None:
+    """
+        Ensure the calibration loop is profiled per window of iterations, excluding paused model runs
+    """
+    plugin = Profiler()
+    plugin.ngen_cal_configure(config=SimpleNamespace(workdir=tmp_path, profile=ProfileOptions(every=2, top=5)))
+    plugin.ngen_cal_start()
+    for i in range(3):
+        plugin.ngen_cal_iteration_start(iteration=i)
+        _work()
+        with paused():
+            _model_run()
+        plugin.ngen_cal_iteration_finish(iteration=i, score=1.0, best_score=1.0, best_iteration=0)
+    plugin.ngen_cal_finish(exception=None)
+
+    profile = tmp_path/"profile"
+    assert sorted(p.name for p in profile.iterdir()) == ["iterations_00000-00001.pstats", "iterations_00002-end.pstats", "total.pstats"]
+    functions = {name for _, _, name in pstats.Stats(str(profile/"total.pstats")).stats}
+    assert "_work" in functions
+    assert "_model_run" not in functions
+    assert "Calibration profile" in capsys.readouterr().out
+
+
+def test_profiler_disabled(tmp_path: Path) -> None:
+    plugin = Profiler()
+    plugin.ngen_cal_configure(config=SimpleNamespace(workdir=tmp_path, profile=None))
+    plugin.ngen_cal_start()
+    plugin.ngen_cal_iteration_start(iteration=0)
+    with paused():
+        _model_run()
+    plugin.ngen_cal_iteration_finish(iteration=0, score=1.0, best_score=1.0, best_iteration=0)
+    plugin.ngen_cal_finish(exception=None)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import csv
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from ngen.cal.resources import RUN_LOG, ResourceSummary, RunResources, dir_size, wait, write_run_log
+
+
+def test_wait(tmp_path: Path):
+    process = subprocess.Popen("echo data > out.txt; exit 3", shell=True, cwd=tmp_path)
+    rusage = wait(process, None)
+    assert process.returncode == 3
+    run = RunResources.from_rusage(1.0, rusage, dir_size(tmp_path))
+    assert run.max_rss > 0
+    assert run.bytes_written == len("data\n")
+    assert not run.timed_out
+
+    process = subprocess.Popen(["sleep", "10"])
+    with pytest.raises(subprocess.TimeoutExpired):
+        wait(process, 0.1)
+    process.kill()
+    process.wait()
+
+
+def test_run_log(tmp_path: Path):
+    path = tmp_path / RUN_LOG
+    runs = [RunResources(1.0, 0.5, 0.1, 1024, 10, False), RunResources.from_rusage(2.0, None, 0)]
+    write_run_log(path, 1, runs)
+    write_run_log(path, 2, runs[:1])
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert [row["iteration"] for row in rows] == ["1", "1", "2"]
+    assert rows[1]["max_rss"] == ""
+    assert rows[1]["timed_out"] == "True"
+
+    plugin = ResourceSummary()
+    for run in runs:
+        plugin.ngen_cal_model_run(iteration=1, run=run)
+    summary = plugin.summary()
+    assert summary.loc["wall_time", "total"] == 3.0
+    assert summary.loc["max_rss", "max"] == 1024
@@ -19,3 +19,155 @@ def test_dds(catchment: 'CalibrationCatchment', agent: 'Agent') -> None:
     ret = dds(1, 2, catchment, agent)
     assert catchment.best_score == 0.0
     assert catchment.best_params == '2'
+
+@pytest.mark.usefixtures("catchment", "agent")
+def test_low_fidelity_window(catchment: 'CalibrationCatchment', agent: 'Agent') -> None:
+    """
+        Test the low fidelity schedule shortens the leading simulation window
+    """
+    from datetime import timedelta
+    from ngen.cal.search import _LowFidelity
+
+    start, end = agent.model.simulation_window
+    agent._params = {'low_fidelity': {'iterations': 5, 'window': '10 days'}}
+    fidelity = _LowFidelity(catchment, agent)
+    assert fidelity.active(5)
+    assert not fidelity.active(6)
+    with fidelity.shortened(agent):
+        assert agent.model.simulation_window == (start, start + timedelta(days=10))
+    assert agent.model.simulation_window == (start, end)
+    # the full window is restored if the shortened run raises
+    with pytest.raises(RuntimeError):
+        with fidelity.shortened(agent):
+            raise RuntimeError()
+    assert agent.model.simulation_window == (start, end)
+
+@pytest.mark.usefixtures("catchment", "agent")
+def test_low_fidelity_screen(catchment: 'CalibrationCatchment', agent: 'Agent', mocker) -> None:
+    """
+        Test low fidelity runs improving on the incumbent are re-simulated, and others are screened out
+    """
+    from ngen.cal.search import _LowFidelity
+
+    agent._params = {'low_fidelity': {'iterations': 5, 'window': '10 days'}}
+    fidelity = _LowFidelity(catchment, agent)
+    mocker.patch('ngen.cal.search._score', return_value=1.0)
+    execute = mocker.patch('ngen.cal.search._execute', return_value=True)
+    for i in range(1, 4):
+        catchment.df[str(i)] = catchment.df['0']
+
+    # without an incumbent every candidate is re-simulated
+    assert fidelity.screen(1, catchment, [catchment], agent)
+    assert execute.call_count == 1
+    # the default `min` target improves on a larger incumbent score
+    fidelity._incumbent_score = 2.0
+    assert fidelity.screen(2, catchment, [catchment], agent)
+    assert execute.call_count == 2
+    # but not on a smaller one, the candidate is only logged as completed
+    fidelity._incumbent_score = 0.5
+    assert not fidelity.screen(3, catchment, [catchment], agent)
+    assert execute.call_count == 2
+    assert (agent.job.workdir/catchment.eval_params.param_log_file).read_text().startswith("3\n")
+    assert catchment.eval_params.score(3) is None
+
+@pytest.mark.usefixtures("catchment", "agent")
+def test_low_fidelity_record(catchment: 'CalibrationCatchment', agent: 'Agent', mocker) -> None:
+    """
+        Test the incumbent low fidelity score only tracks the best iteration
+    """
+    from ngen.cal.search import _LowFidelity
+
+    agent._params = {'low_fidelity': {'iterations': 5, 'window': '10 days'}}
+    fidelity = _LowFidelity(catchment, agent)
+    mocker.patch('ngen.cal.search._score', return_value=1.0)
+
+    catchment.update(1, 1.0, log=False)
+    fidelity.record(1, catchment, agent)
+    assert fidelity._incumbent_score == 1.0
+    # iteration 2 does not improve on iteration 1
+    catchment.update(2, 2.0, log=False)
+    fidelity._incumbent_score = None
+    fidelity.record(2, catchment, agent)
+    assert fidelity._incumbent_score is None
+
+@pytest.mark.usefixtures("catchment", "agent")
+def test_low_fidelity_penalized(catchment: 'CalibrationCatchment', agent: 'Agent', mocker) -> None:
+    """
+        Test failed low fidelity runs are penalized, and later runs simulate the full window
+    """
+    start, end = agent.model.simulation_window
+    agent._params = {'low_fidelity': {'iterations': 1, 'window': '10 days'}}
+    windows = []
+    def fail(*args, **kwargs):
+        windows.append(agent.model.simulation_window)
+        return False
+    mocker.patch('ngen.cal.search._execute_iteration', side_effect=fail)
+
+    dds(1, 2, catchment, agent)
+    assert windows[0][1] < end
+    assert windows[1] == (start, end)
+    assert agent.model.simulation_window == (start, end)
+    penalty = agent.model.exec_params.penalty_score(catchment.eval_params.target)
+    assert catchment.eval_params.score(1) == penalty
+
+@pytest.mark.usefixtures("catchment", "agent")
+def test_compute_run_durations(catchment: 'CalibrationCatchment', agent: 'Agent', mocker) -> None:
+    """
+        Test PSO particle evaluations return the durations of their model runs, to be recorded by the parent agent
+    """
+    from ngen.cal.search import compute
+
+    mocker.patch('ngen.cal.search._evaluate', return_value=1.0)
+    agent.run_durations.append(60.0)
+    cost, _, durations = compute(catchment, 1, (catchment.df['0'], agent))
+    assert cost == 1.0
+    assert len(durations) == 1
+    assert durations[0] < 60.0
+
+def test_run_timeout(tmp_path) -> None:
+    """
+        Test model runs are killed and reported when they exceed the time limit
+    """
+    import subprocess
+    from time import perf_counter
+    from ngen.cal.search import _run
+
+    assert _run("true", tmp_path, None, None)
+    start = perf_counter()
+    assert not _run("sleep 10", tmp_path, None, 0.1)
+    assert perf_counter() - start < 5
+    with pytest.raises(subprocess.CalledProcessError):
+        _run("false", tmp_path, None, None)
+
+def test_reuse_outputs(tmp_path) -> None:
+    """
+        Test the saved outputs of an iteration are linked back into the workdir for routing only runs
+    """
+    from ngen.cal.search import _reuse_outputs
+
+    assert not _reuse_outputs("1", tmp_path)
+    saved = tmp_path/"output_1"
+    saved.mkdir()
+    for name in ("cat-1.csv", "nex-1_output.csv", "flowveldepth_Ngen.csv"):
+        (saved/name).write_text(name)
+    (tmp_path/"nex-1_output.csv").write_text("stale")
+
+    assert _reuse_outputs("1", tmp_path)
+    assert (tmp_path/"cat-1.csv").read_text() == "cat-1.csv"
+    assert (tmp_path/"nex-1_output.csv").read_text() == "nex-1_output.csv"
+    # routing output is produced by the routing run
+    assert not (tmp_path/"flowveldepth_Ngen.csv").exists()
+
+def test_reuse_outputs_exclude(tmp_path) -> None:
+    """
+        Test the saved outputs of re-simulated features are not reused
+    """
+    from ngen.cal.search import _reuse_outputs
+
+    saved = tmp_path/"output_1"
+    saved.mkdir()
+    for name in ("cat-1.csv", "cat-2.csv", "nex-1_output.csv", "nex-2_output.csv"):
+        (saved/name).write_text(name)
+
+    assert _reuse_outputs("1", tmp_path, exclude={"cat-2", "nex-2"})
+    assert sorted(f.name for f in tmp_path.glob("*.csv")) == ["cat-1.csv", "nex-1_output.csv"]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
+from ngen.cal.ngen import NgenBase
+from ngen.cal.ngen_hooks.ngen_output import TrouteOutput
+from ngen.cal.standin import FORMATS, main
+from ngen.config.realization import NgenRealization
+
+from .utils import global_config
+
+data_dir = Path(__file__).parent / "data/troute_output/"
+SUFFIXES = {"csv": "csv", "stream_v1": "csv", "stream_v2": "csv", "parquet": "parquet", "netcdf": "nc"}
+
+
+def _realization(path: Path, a: float) -> Path:
+    with open(data_dir / "example_realization_config.json") as fp:
+        data = json.load(fp)
+    formulation = deepcopy(global_config["global"]["formulations"][0])
+    formulation["params"]["model_params"] = {"a": a, "b": 2.0}
+    data["catchments"] = {"cat-2420800": {"formulations": [formulation]}}
+    with open(path, "w") as fp:
+        json.dump(data, fp)
+    return path
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_standin_output(tmp_path: Path, format: str):
+    """
+    Test each output format of the stand-in is readable by `TrouteOutput`
+    and the output depends on the calibrated parameters
+    """
+    realization = _realization(tmp_path / "realization.json", 1.0)
+    base = NgenBase.construct()
+    base.ngen_realization = NgenRealization.parse_file(realization)
+
+    outputs = []
+    for i, a in enumerate((1.0, 4.0)):
+        _realization(realization, a)
+        # `TrouteOutput` reads the output by its suffix
+        output = tmp_path / f"output_{i}.{SUFFIXES[format]}"
+        main(["hf.gpkg", "all", "hf.gpkg", "all", str(realization), "--segments", "10",
+              "--format", format, "--output", str(output)])
+        troute = TrouteOutput(output)
+        troute.ngen_cal_model_configure(config=base)
+        df = troute.get_output(id="wb-2420800", workdir=None)
+        assert df is not None
+        # testing data is for a single day
+        assert len(df) == 24
+        outputs.append(df)
+    assert (outputs[0] != outputs[1]).all()
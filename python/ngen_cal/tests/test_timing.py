@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pytest
+
+from ngen.cal.timing import PhaseTimer, TimingSummary, sum_timings
+
+
+def test_phase_timer():
+    timer = PhaseTimer()
+    with timer.phase("model_run"):
+        pass
+    with timer.phase("model_run"):
+        pass
+    with pytest.raises(ValueError):
+        with timer.phase("objective"):
+            raise ValueError
+    timings = timer.pop()
+    assert set(timings) == {"model_run", "objective"}
+    assert timer.pop() == {}
+
+
+def test_sum_timings():
+    total = sum_timings([{"model_run": 1.0}, {"model_run": 2.0, "output": 0.5}])
+    assert total == {"model_run": 3.0, "output": 0.5}
+
+
+def test_timing_summary():
+    plugin = TimingSummary()
+    plugin.ngen_cal_iteration_timing(iteration=1, timings={"objective": 1.0, "model_run": 3.0})
+    plugin.ngen_cal_iteration_timing(iteration=2, timings={"model_run": 5.0})
+    summary = plugin.summary()
+    # phases are ordered as they occur in an iteration
+    assert list(summary.index) == ["model_run", "objective"]
+    assert summary.loc["model_run", "total"] == 8.0
+    assert summary.loc["model_run", "max"] == 5.0
+    assert summary.loc["objective", "mean"] == 1.0
+    assert summary["percent"].sum() == pytest.approx(100.0)
@@ -1,6 +1,6 @@
 from types import ModuleType, FunctionType
 
-from ngen.cal.utils import PyObjectOrModule, type_as_import_string
+from ngen.cal.utils import PyObjectOrModule, move_files, scan_files, type_as_import_string
 from pydantic import BaseModel
 
 
@@ -49,3 +49,22 @@ def test_serialize():
 
 def test_schema():
     assert Foo.schema()["properties"]["mod"]["type"] == "string"
+
+
+def test_scan_and_move_files(tmp_path):
+    for name in ["cat-1.csv", "nex-1_output.csv", "nex-2_output.csv", "troute_NEXOUT.parquet", "other.txt"]:
+        (tmp_path / name).touch()
+    (tmp_path / "nex-3.csv").mkdir()
+
+    names = scan_files(tmp_path, {"runoff": "cat-*.csv", "lateral": "nex-*.csv", "nexout": "*NEXOUT.parquet"})
+    assert {key: sorted(v) for key, v in names.items()} == {
+        "runoff": ["cat-1.csv"],
+        "lateral": ["nex-1_output.csv", "nex-2_output.csv"],
+        "nexout": ["troute_NEXOUT.parquet"],
+    }
+
+    dst = tmp_path / "output_1"
+    dst.mkdir()
+    move_files(names["lateral"], tmp_path, dst)
+    assert sorted(f.name for f in dst.iterdir()) == ["nex-1_output.csv", "nex-2_output.csv"]
+    assert not (tmp_path / "nex-1_output.csv").exists()